@@ -0,0 +1,24 @@
+"""
+Agent classes are resolved on first attribute access, so importing the
+package (or a light sibling module) does not pull in agno, cv2 or Gemini.
+"""
+import importlib
+
+_LAZY_EXPORTS = {
+    "MainAnalysisAgent": "agents.mainAgent",
+    "ImageAnalysisAgent": "agents.imageAgent",
+    "VideoAnalysisAgent": "agents.videoAgent",
+    "TextAnalysisAgent": "agents.textAgent",
+    "PropertySearchAgent": "agents.searchAgent",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -1,14 +1,54 @@
 from agno.agent import Agent
+from agno.media import Image
 import os
 import sys
-import time
-import shutil
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # from tools.imagesTool import load_images_from_directory
-from prompts.imagePrompts import Image_prompt
+from prompts.imagePrompts import Image_prompt, Mosaic_note
 from models.gemini import model
+from models.schemas import ImageAnalysis
+from components.utils.imageUtil import prepare_image, estimate_image_tokens, image_size, pack_mosaics
+from components.utils.traceUtil import span, current_span
+from components.utils.structuredUtil import run_structured
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+# Longest side (px) and JPEG quality of the copies sent to Gemini
+IMAGE_LONG_EDGE = int(os.getenv("IMAGE_LONG_EDGE", "1024"))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+IMAGE_PREP_WORKERS = int(os.getenv("IMAGE_PREP_WORKERS", "4"))
+# Tile photos/frames into labeled MOSAIC_GRID x MOSAIC_GRID mosaics of MOSAIC_CELL px tiles
+VISION_PACKING = os.getenv("VISION_PACKING", "false").lower() == "true"
+MOSAIC_GRID = int(os.getenv("MOSAIC_GRID", "3"))
+MOSAIC_CELL = int(os.getenv("MOSAIC_CELL", "384"))
+
+
+def vision_inputs(images, kind, packing=None):
+    """
+    agno images and a prompt note for a vision call over encoded images.
+    With packing (default VISION_PACKING) two or more images are tiled into
+    labeled mosaics, so the call carries fewer, denser images.
+    """
+    packing = VISION_PACKING if packing is None else packing
+    s = current_span()
+    if not packing or len(images) < 2:
+        sizes = [image_size(data) for data in images]
+        if s is not None:
+            s.set(images_sent=len(images), image_tokens=sum(estimate_image_tokens(*size) for size in sizes))
+        return [Image(content=data, format="jpeg") for data in images], ""
+
+    labels = [f"{kind} {i + 1}" for i in range(len(images))]
+    mosaics = pack_mosaics(images, labels, MOSAIC_GRID, MOSAIC_CELL, IMAGE_QUALITY)
+    if s is not None:
+        s.set(
+            images_sent=len(mosaics),
+            mosaics=len(mosaics),
+            image_tokens=sum(estimate_image_tokens(*image_size(data)) for data, _ in mosaics),
+        )
+    note = Mosaic_note.format(count=len(images), kind=kind, mosaics=len(mosaics))
+    return [Image(content=data, format="jpeg") for data, _ in mosaics], note
+
 
 class ImageAnalysisAgent:
     def __init__(self):
@@ -17,44 +57,66 @@ class ImageAnalysisAgent:
             model=model,
             markdown=False,
             description=Image_prompt,
+            response_model=ImageAnalysis,
         )
-        self.temp_dir = None
 
-    def create_temp_directory(self):
-        """Create a temporary directory for image processing"""
-        if self.temp_dir:
-            shutil.rmtree(self.temp_dir)
-        self.temp_dir = tempfile.mkdtemp()
-        return self.temp_dir
-
-    def copy_images_to_temp(self, image_directory):
-        """Copy images from source directory to temp directory"""
-        temp_dir = self.create_temp_directory()
+    def list_images(self, image_directory):
+        """Image files of a directory, or the single image given"""
         if os.path.isfile(image_directory):
-            # Single image case
-            shutil.copy2(image_directory, temp_dir)
-        else:
-            # Directory case
-            for file in os.listdir(image_directory):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                    shutil.copy2(os.path.join(image_directory, file), temp_dir)
-        return temp_dir
+            return [image_directory]
+        return sorted(
+            os.path.join(image_directory, file)
+            for file in os.listdir(image_directory)
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+        )
 
-    def analyze_images(self, image_path):
-        """Analyze images and return the results"""
-        temp_dir = self.copy_images_to_temp(image_path)
-        try:
-            response = self.agent.run(
-                Image_prompt,
-                tools_input={"load_images_from_directory": {"directory_path": temp_dir}}
+    def prepare_images(self, image_paths, long_edge=IMAGE_LONG_EDGE, quality=IMAGE_QUALITY):
+        """
+        Downsize and re-encode the images on a thread pool. Returns
+        [(jpeg bytes, report)], where report has the image's name, original
+        and prepared byte counts, size and estimated Gemini input tokens.
+        """
+        def prepare(path):
+            with open(path, "rb") as f:
+                original = f.read()
+            try:
+                data, width, height = prepare_image(original, long_edge, quality)
+            except Exception as e:
+                print(f"⚠️  Skipping unreadable image {path}: {e}")
+                return None
+            return data, {
+                "name": Path(path).name,
+                "original_bytes": len(original),
+                "bytes": len(data),
+                "width": width,
+                "height": height,
+                "tokens": estimate_image_tokens(width, height),
+            }
+
+        with span("prepare_images", images=len(image_paths), long_edge=long_edge, quality=quality) as s:
+            with ThreadPoolExecutor(max_workers=IMAGE_PREP_WORKERS, thread_name_prefix="image-prep") as pool:
+                prepared = [item for item in pool.map(prepare, image_paths) if item is not None]
+            if not prepared:
+                raise ValueError("No readable images")
+            reports = [report for _, report in prepared]
+            s.set(
+                original_bytes=sum(r["original_bytes"] for r in reports),
+                bytes=sum(r["bytes"] for r in reports),
+                image_tokens=sum(r["tokens"] for r in reports),
             )
-            return response.content
-        finally:
-            # Cleanup
-            if self.temp_dir:
-                shutil.rmtree(self.temp_dir)
-                self.temp_dir = None
+            for r in reports:
+                print(f"🖼️  {r['name']}: {r['original_bytes'] // 1024} KB -> {r['bytes'] // 1024} KB, "
+                      f"{r['width']}x{r['height']}, ~{r['tokens']} tokens")
+            return prepared
 
+    def analyze_images(self, image_path):
+        """Analyze images and return the ImageAnalysis as a dict"""
+        with span("analyze_images") as s:
+            prepared = self.prepare_images(self.list_images(image_path))
+            s.set(images=len(prepared))
+            images, note = vision_inputs([data for data, _ in prepared], "photo")
+            analysis = run_structured(self.agent, Image_prompt + note, ImageAnalysis, images=images)
+            return analysis.to_analysis()
 
 
 if __name__ == "__main__":
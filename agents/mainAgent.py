@@ -2,24 +2,23 @@ from agno.agent import Agent
 import os
 import sys
 import json
-import re
+import contextvars
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from prompts.mainPrompts import Main_prompt
+from prompts.mainPrompts import Polish_prompt
 from models.gemini import model
 from agents.imageAgent import ImageAnalysisAgent
 from agents.videoAgent import VideoAnalysisAgent
 from agents.textAgent import TextAnalysisAgent
+from models.schemas import ProfilePolish
+from components.utils.traceUtil import span, traced
+from components.utils.structuredUtil import run_structured
+from components.utils.profileUtil import build_profile, normalize_appliance
+from components.utils.documentUtil import EXTRACTORS
 
-
-def clean_json_string(s: str) -> str:
-    """
-    Remove markdown code fences and extraneous backticks from a JSON string.
-    """
-    s = re.sub(r"```(?:json)?\n", "", s)
-    s = s.replace("```", "")
-    return s.strip()
+TEXT_EXTENSIONS = tuple(EXTRACTORS)
 
 
 class MainAnalysisAgent:
@@ -28,12 +27,14 @@ class MainAnalysisAgent:
             name="MainAgent",
             model=model,
             markdown=False,
-            description=Main_prompt,
+            description=Polish_prompt,
+            response_model=ProfilePolish,
         )
         self.image_agent = ImageAnalysisAgent()
         self.video_agent = VideoAnalysisAgent()
         self.text_agent = TextAnalysisAgent()
 
+    @traced("merge_analyses")
     def merge_analyses(self, analyses):
         """
         Merge JSON outputs from image, video, and text analyses into a single cohesive dict.
@@ -85,7 +86,7 @@ class MainAnalysisAgent:
                 merged["Contact information for inquiries"] = src["Contact information for inquiries"]
             # appliances: accumulate counts
             for k, v in src.get("appliances", {}).items():
-                appliance_counts.setdefault(k, []).append(v)
+                appliance_counts.setdefault(normalize_appliance(k), []).append(v)
         # Apply counting rule: min if appears in all three analyses, else sum
         total_sources = len([src for src in analyses if isinstance(src, dict)])
         for appliance, counts in appliance_counts.items():
@@ -101,29 +102,28 @@ class MainAnalysisAgent:
         merged["location_details"] = list(merged["location_details"])
         return merged
 
-    def analyze_property(self, property_path):
-        """Analyze a property using all available data sources (images, video, text)."""
-        raw_results = []
-        p = Path(property_path)
+    def analyze_property(self, property_path, progress=None):
+        """
+        Analyze a property using all available data sources (images, video, text)
+        and return the PropertyProfile as a dict, built from the merged analyses
+        by rules (components/utils/profileUtil.py) rather than another LLM call.
+
+        Args:
+            property_path: Directory holding images/, videos/ and text/ (or loose files)
+            progress: Optional callback progress(stage, status) called as each of the
+                "images", "video", "text" and "merge" stages runs, finishes
+                ("done"), is skipped or fails
+        """
+        with span("analyze_property", property_path=str(property_path)):
+            return self._analyze_property(property_path, progress)
 
-        def process_raw(raw):
-            if isinstance(raw, str):
-                cleaned = clean_json_string(raw)
-                try:
-                    return json.loads(cleaned)
-                except json.JSONDecodeError as e:
-                    print(f"JSON decode error: {e}\nRaw content:\n{cleaned}")
-                    return {}
-            return raw if isinstance(raw, dict) else {}
+    def _analyze_property(self, property_path, progress):
+        report = progress or (lambda stage, status: None)
+        p = Path(property_path)
 
         # Images
         imgs = list((p / "images").glob("**/*.*")) if (p / "images").exists() else list(p.glob("*.jp*g")) + list(p.glob("*.png"))
-        if imgs:
-            try:
-                raw = self.image_agent.analyze_images(str(p / "images")) if (p / "images").exists() else self.image_agent.analyze_images(property_path)
-                raw_results.append(process_raw(raw))
-            except Exception as e:
-                print(f"Error in image analysis: {e}")
+        image_source = str(p / "images") if (p / "images").exists() else property_path
         # Video
         vid_dir = p / "videos"
         video_files = []
@@ -131,31 +131,68 @@ class MainAnalysisAgent:
             video_files = [f for f in vid_dir.iterdir() if f.suffix.lower() in ('.mp4', '.avi', '.mov')]
         else:
             video_files = [f for f in p.glob('*.mp4')] + [f for f in p.glob('*.mov')] + [f for f in p.glob('*.avi')]
-        if video_files:
-            try:
-                raw = self.video_agent.analyze_video(str(video_files[0]))
-                raw_results.append(process_raw(raw))
-            except Exception as e:
-                print(f"Error in video analysis: {e}")
         # Text
         txt_dir = p / "text"
         text_files = []
+        text_source = txt_dir if txt_dir.exists() else p
+        text_files = [f for f in text_source.iterdir() if f.is_file() and f.suffix.lower() in TEXT_EXTENSIONS]
         if txt_dir.exists():
-            text_files = [f for f in txt_dir.iterdir() if f.suffix.lower() in ('.txt', '.doc', '.docx', '.pdf')]
-        else:
-            text_files = [f for f in p.glob('*.txt')] + [f for f in p.glob('*.pdf')]
-        if text_files:
+            for f in sorted(set(txt_dir.iterdir()) - set(text_files)):
+                print(f"⚠️  Skipping {f.name}: text files must be {', '.join(TEXT_EXTENSIONS)}")
+
+        # Every file of a modality goes into one call; the modalities run concurrently
+        stages = [
+            ("images", imgs, lambda: self.image_agent.analyze_images(image_source)),
+            ("video", video_files, lambda: self.video_agent.analyze_videos([str(f) for f in sorted(video_files)])),
+            ("text", text_files, lambda: self.text_agent.analyze_texts([str(f) for f in sorted(text_files)])),
+        ]
+
+        def run_stage(stage, analyze):
+            report(stage, "running")
             try:
-                raw = self.text_agent.analyze_text(str(text_files[0]))
-                raw_results.append(process_raw(raw))
+                analysis = analyze()
             except Exception as e:
-                print(f"Error in text analysis: {e}")
-        # Merge and generate
+                print(f"Error in {stage} analysis: {e}")
+                report(stage, "failed")
+                return None
+            report(stage, "done")
+            return analysis
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="analyze") as pool:
+            for stage, files, analyze in stages:
+                if files:
+                    # Each stage runs in a copy of this context so its spans nest under analyze_property
+                    futures.append(pool.submit(contextvars.copy_context().run, run_stage, stage, analyze))
+                else:
+                    report(stage, "skipped")
+        raw_results = [f.result() for f in futures if f.result() is not None]
+
+        # Merge and build the profile
+        report("merge", "running")
         merged = self.merge_analyses(raw_results)
-        profile = self.agent.run(
-            f"Create a comprehensive property profile based on this merged data: {json.dumps(merged)}"
-        )
-        return profile.content.strip()
+        with span("build_profile"):
+            profile = build_profile(merged)
+        report("merge", "done")
+        return profile
+
+    def polish_profile(self, profile):
+        """
+        Optional LLM pass over a built profile: returns a copy with the name,
+        summary, layout and location prose rewritten; facts are left as built.
+        """
+        with span("polish_profile"):
+            polished = run_structured(
+                self.agent,
+                f"Polish the prose of this property profile: {json.dumps(profile, ensure_ascii=False)}",
+                ProfilePolish,
+            )
+        updated = dict(profile)
+        for key, value in polished.model_dump().items():
+            # Fields the rules left empty stay empty rather than gaining filler prose
+            if value.strip() and profile.get(key):
+                updated[key] = value.strip()
+        return updated
 
 
 if __name__ == "__main__":
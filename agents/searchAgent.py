@@ -8,7 +8,7 @@ import json
 import logging
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import sys
 import json
 import re
@@ -20,73 +20,130 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 import re
+import asyncio
 from agno.agent import Agent
 from models.gemini import model
 from prompts.searchPrompt import Search_prompt
 from models.vectorStore import QdrantVectorStoreClient
+from models.schemas import SearchRanking, StructuredOutputError
+from components.utils.traceUtil import span
+from components.utils.structuredUtil import run_structured, arun_structured
 
 class PropertySearchAgent:
-    def __init__(self, vector_store_client: QdrantVectorStoreClient):
+    def __init__(self, vector_store_client: QdrantVectorStoreClient, async_vector_store=None):
+        """
+        Args:
+            vector_store_client: Synchronous vector store used by search()
+            async_vector_store: Optional AsyncQdrantVectorStoreClient for asearch();
+                without it asearch() runs the synchronous retrieval in a thread
+        """
         self.logger = logger  # Add logger attribute
         self.model = model
         self.vector_store = vector_store_client
+        self.async_vector_store = async_vector_store
         self.agent = Agent(
             name="PropertySearchAgent",
             model=self.model,
             markdown=False,
-            description=Search_prompt
+            description=Search_prompt,
+            response_model=SearchRanking,
         )
         
         # Define the prompt as a separate method or attribute
         self.system_prompt = Search_prompt
 
-    def search(self, user_query: str, k: int = 5) -> List[Dict[str, Any]]:
-        # Step 1: retrieve top-k candidates
-        candidates = self.vector_store.similarity_search(user_query, k)
-        
+    def search(self, user_query: str, k: int = 5, timings: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the top-k candidates and re-rank them with the LLM.
+        `timings`, if given, is filled with retrieve_ms, rerank_ms and total_ms.
+        """
+        with span("search", k=k) as s:
+            start = time.perf_counter()
+            candidates = self.retrieve(user_query, k)
+            retrieved = time.perf_counter()
+            results = self.rerank(user_query, candidates)
+            self._record_timings(s, timings, start, retrieved, time.perf_counter())
+            s.set(results=len(results))
+            return results
+
+    async def asearch(self, user_query: str, k: int = 5, timings: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Awaitable search(): retrieval and re-ranking never block the event loop"""
+        with span("search", k=k) as s:
+            start = time.perf_counter()
+            candidates = await self.aretrieve(user_query, k)
+            retrieved = time.perf_counter()
+            results = await self.arerank(user_query, candidates)
+            self._record_timings(s, timings, start, retrieved, time.perf_counter())
+            s.set(results=len(results))
+            return results
+
+    def _record_timings(self, s, timings, start, retrieved, done):
+        stage_ms = {
+            "retrieve_ms": round((retrieved - start) * 1000, 3),
+            "rerank_ms": round((done - retrieved) * 1000, 3),
+            "total_ms": round((done - start) * 1000, 3),
+        }
+        s.set(**stage_ms)
+        if timings is not None:
+            timings.update(stage_ms)
+
+    def retrieve(self, user_query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Step 1: top-k candidates from the vector store"""
+        return self.vector_store.similarity_search(user_query, k)
+
+    async def aretrieve(self, user_query: str, k: int = 5) -> List[Dict[str, Any]]:
+        if self.async_vector_store is not None:
+            return await self.async_vector_store.similarity_search(user_query, k)
+        return await asyncio.to_thread(self.vector_store.similarity_search, user_query, k)
+
+    def find_similar(self, property_id: str, k: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Properties like a registered one, from its stored vectors (no embedding or re-ranking)"""
+        return self.vector_store.find_similar(property_id, k, filters)
+
+    def rerank(self, user_query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Step 2: filter and order the candidates with the search prompt"""
         if not candidates:
             return []
-        
-        # Step 2: run filtering prompt
-        prompt = self.system_prompt.format(
-            user_query=user_query,
-            vector_db_result=json.dumps(candidates, indent=2)
-        )
-        
         try:
-            response = self.agent.run(prompt)
-            # Handle different response formats
-            response_content = response.content if hasattr(response, 'content') else str(response)
-            
-            # Clean the response content to extract JSON
-            response_content = response_content.strip()
-            
-            # Look for JSON array in the response
-            json_start = response_content.find('[')
-            json_end = response_content.rfind(']') + 1
-            
-            if json_start != -1 and json_end > json_start:
-                json_str = response_content[json_start:json_end]
-                return json.loads(json_str)
-            elif "No matching properties found" in response_content:
-                return []
-            else:
-                # Try to parse as complete JSON object for no-results case
-                if response_content.startswith('{') and response_content.endswith('}'):
-                    result = json.loads(response_content)
-                    if "message" in result:
-                        return []
-                
-                # Fallback: return original candidates if parsing fails
-                self.logger.warning(f"Could not parse agent response: {response_content}")
-                return [{"property_id": c.get("id"), "score": c.get("score", 0.0)} for c in candidates]
-                
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON decode error: {e}")
+            ranking = run_structured(self.agent, self._rerank_prompt(user_query, candidates), SearchRanking)
+        except StructuredOutputError as e:
+            self.logger.warning(f"Unparseable ranking, keeping vector order: {e}")
+            return self._vector_order(candidates)
+        except Exception as e:
+            self.logger.error(f"Error in agent search: {e}")
+            return []
+        return self._parse_ranking(ranking, candidates)
+
+    async def arerank(self, user_query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not candidates:
             return []
+        try:
+            ranking = await arun_structured(self.agent, self._rerank_prompt(user_query, candidates), SearchRanking)
+        except StructuredOutputError as e:
+            self.logger.warning(f"Unparseable ranking, keeping vector order: {e}")
+            return self._vector_order(candidates)
         except Exception as e:
             self.logger.error(f"Error in agent search: {e}")
             return []
+        return self._parse_ranking(ranking, candidates)
+
+    def _rerank_prompt(self, user_query: str, candidates: List[Dict[str, Any]]) -> str:
+        return self.system_prompt.format(
+            user_query=user_query,
+            vector_db_result=json.dumps(candidates, indent=2)
+        )
+
+    def _vector_order(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [{"property_id": c.get("property_id"), "score": c.get("score", 0.0)} for c in candidates]
+
+    def _parse_ranking(self, ranking: SearchRanking, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ranked matches, keeping only property ids that were among the candidates"""
+        candidate_ids = {c.get("property_id") for c in candidates}
+        matches = [m.model_dump() for m in ranking.matches if m.property_id in candidate_ids]
+        dropped = len(ranking.matches) - len(matches)
+        if dropped:
+            self.logger.warning(f"Dropped {dropped} ranked ids that were not among the candidates")
+        return matches
 
 
 if __name__ == "__main__":
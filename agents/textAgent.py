@@ -2,10 +2,23 @@ from agno.agent import Agent
 import os
 import sys
 import time
+import itertools
+import contextvars
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from prompts.textPrompts import Text_prompt
 from models.gemini import model
+from models.schemas import TextAnalysis
+from components.utils.traceUtil import span
+from components.utils.structuredUtil import run_structured
+from components.utils.documentUtil import iter_document, pack_chunks
+
+# Approximate input tokens per Gemini call; longer text is map-reduced
+TEXT_TOKEN_BUDGET = int(os.getenv("TEXT_TOKEN_BUDGET", "30000"))
+# Chunks analyzed at most per listing, and concurrently
+TEXT_MAX_CHUNKS = int(os.getenv("TEXT_MAX_CHUNKS", "16"))
+TEXT_MAP_WORKERS = int(os.getenv("TEXT_MAP_WORKERS", "4"))
 
 class TextAnalysisAgent:
     def __init__(self):
@@ -14,50 +27,94 @@ class TextAnalysisAgent:
             model=model,
             markdown=False,
             description=Text_prompt,
+            response_model=TextAnalysis,
         )
 
     def analyze_text(self, text_path):
-        """Analyze text content and extract relevant property information"""
+        """Analyze one text file and return the TextAnalysis as a dict"""
+        return self.analyze_texts([text_path])
+
+    def analyze_texts(self, text_paths, token_budget=TEXT_TOKEN_BUDGET):
+        """
+        Analyze all of a listing's text files and return the TextAnalysis as a dict.
+
+        The files are extracted page by page and packed into chunks of
+        token_budget tokens. A listing that fits one chunk takes one call;
+        longer ones are map-reduced: up to TEXT_MAX_CHUNKS chunks are analyzed
+        TEXT_MAP_WORKERS at a time and the results merged by TextAnalysis.merge.
+        """
+        with span("analyze_text", files=len(text_paths), token_budget=token_budget) as s:
+            chunks = pack_chunks(((Path(path).name, self._pages(path)) for path in text_paths), token_budget)
+            first = next(chunks, None)
+            if first is None:
+                raise ValueError("No readable text files")
+            second = next(chunks, None)
+            if second is None:
+                s.set(chunks=1)
+                return self._analyze_chunk(first, False, s).to_analysis()
+            parts = self._map_chunks(itertools.chain([first, second], chunks), s)
+            return TextAnalysis.merge(parts).to_analysis()
+
+    def _pages(self, text_path):
+        """The pages of one file; an unreadable file is skipped with a warning"""
         try:
-            # Read the text file
-            with open(text_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
+            yield from iter_document(text_path)
+        except Exception as e:
+            print(f"⚠️  Skipping unreadable text file {text_path}: {e}")
 
-            # Use a single prompt to extract all information
-            combined_prompt = f"""Analyze this property description and provide a detailed analysis in plain text format.
-            Text: {text_content}
-            
-            Include the following information in your analysis:
-            • Property details (type, size, location, price)
-            • Available amenities and facilities
-            • Property rules and restrictions
-            • Additional relevant information
-            • Contact information for inquiries
-            
-            Format your response in clear, well-structured paragraphs."""
+    def _map_chunks(self, chunks, s):
+        """Analyze chunks concurrently, holding at most TEXT_MAP_WORKERS of them at a time"""
+        results, pending = {}, {}
 
-            # Add retry logic for rate limits
-            max_retries = 3
-            retry_delay = 5  # seconds
-            
-            for attempt in range(max_retries):
+        def collect(futures):
+            for future in futures:
+                index = pending.pop(future)
                 try:
-                    response = self.agent.run(combined_prompt)
-                    return response.content.strip()
-                    
+                    results[index] = future.result()
                 except Exception as e:
-                    if "429" in str(e) and attempt < max_retries - 1:
-                        print(f"Rate limit hit, retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                        continue
-                    raise
+                    print(f"⚠️  Text chunk {index} failed: {e}")
+                    s.incr("failed_chunks")
+
+        with ThreadPoolExecutor(max_workers=TEXT_MAP_WORKERS, thread_name_prefix="text-map") as pool:
+            for index, chunk in enumerate(chunks):
+                if index >= TEXT_MAX_CHUNKS:
+                    print(f"⚠️  Text exceeds {TEXT_MAX_CHUNKS} chunks, the rest is not analyzed")
+                    s.set(truncated=True)
+                    break
+                if len(pending) >= TEXT_MAP_WORKERS:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                future = pool.submit(contextvars.copy_context().run, self._analyze_chunk, chunk, True, s)
+                pending[future] = index
+            collect(list(pending))
+        s.set(chunks=len(results) + s.attrs.get("failed_chunks", 0))
+        if not results:
+            raise ValueError("Every text chunk failed")
+        return [results[index] for index in sorted(results)]
+
+    def _analyze_chunk(self, chunk, partial, s):
+        text_content = "\n\n".join(f"### {name}\n{text}" for name, text in chunk) if len(chunk) > 1 else chunk[0][1]
+        prompt = f"Analyze this property description.\nText: {text_content}"
+        if partial:
+            prompt = "This is one part of a longer set of documents; report only what this part states.\n" + prompt
+
+        # Add retry logic for rate limits
+        max_retries = 3
+        retry_delay = 5  # seconds
+
+        for attempt in range(max_retries):
+            try:
+                return run_structured(self.agent, prompt, TextAnalysis)
+
+            except Exception as e:
+                if "429" in str(e) and attempt < max_retries - 1:
+                    print(f"Rate limit hit, retrying in {retry_delay} seconds...")
+                    s.incr("retries")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                raise
+
 
-        except Exception as e:
-            print(f"Error in text analysis: {str(e)}")
-            return "Error analyzing text. Please try again later."
-        
-        
 if __name__ == "__main__":
     agent = TextAnalysisAgent()
     text_path = "/Users/jayanth/Documents/GitHub/DemonSeller/Flats/flat7/flat7.txt"
@@ -1,13 +1,27 @@
 from agno.agent import Agent
 import os
 import sys
-import cv2
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # from tools.imagesTool import load_images_from_directory
 from prompts.videoPrompts import Video_prompt
 from models.gemini import model
+from models.schemas import VideoAnalysis
+from components.utils.imageUtil import dhash, prepare_image
+from agents.imageAgent import IMAGE_LONG_EDGE, IMAGE_QUALITY, vision_inputs
+from components.utils.traceUtil import span
+from components.utils.structuredUtil import run_structured
+
+# Frames sent to Gemini for all of a listing's videos together
+VIDEO_FRAME_BUDGET = int(os.getenv("VIDEO_FRAME_BUDGET", "40"))
+# Frames whose dHashes are at most this many bits apart count as the same shot
+FRAME_DEDUPE_HAMMING = int(os.getenv("FRAME_DEDUPE_HAMMING", "4"))
+# Candidate frames sampled per budgeted frame, before near-duplicates are dropped
+FRAME_OVERSAMPLING = 2
+
 
 class VideoAnalysisAgent:
     def __init__(self):
@@ -16,71 +30,141 @@ class VideoAnalysisAgent:
             model=model,
             markdown=False,
             description=Video_prompt,
+            response_model=VideoAnalysis,
         )
-        self.temp_dir = None
 
     def create_temp_directory(self):
         """Create a temporary directory for video frame extraction"""
-        if self.temp_dir:
-            self.cleanup()
-        self.temp_dir = tempfile.mkdtemp()
-        return self.temp_dir
+        # Kept local to each call: one agent instance is shared by every session
+        return tempfile.mkdtemp()
 
-    def extract_frames(self, video_path, frame_interval=30):
-        """Extract frames from video at specified intervals"""
-        temp_dir = self.create_temp_directory()
-        frames_dir = os.path.join(temp_dir, "frames")
-        os.makedirs(frames_dir, exist_ok=True)
+    def extract_frames(self, video_paths, frame_budget=VIDEO_FRAME_BUDGET):
+        """
+        Sample up to frame_budget distinct frames across all videos.
 
-        try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video file: {video_path}")
+        Each video gets a share of the budget proportional to its length;
+        candidates are decoded concurrently, near-identical frames (also
+        across clips) are dropped, and the rest are thinned evenly to the
+        budget. Returns (frames_dir, [frame paths]).
+        """
+        with span("extract_frames", videos=len(video_paths), frame_budget=frame_budget) as s:
+            temp_dir = self.create_temp_directory()
+            frames_dir = os.path.join(temp_dir, "frames")
+            os.makedirs(frames_dir, exist_ok=True)
+            try:
+                # Unreadable clips are skipped; the budget is shared among the rest
+                counted = [(path, self._frame_count(path)) for path in video_paths]
+                readable = [(path, length) for path, length in counted if length is not None]
+                if not readable:
+                    raise ValueError("None of the video files could be opened")
+                video_paths = [path for path, _ in readable]
+                lengths = [length for _, length in readable]
+                total = sum(lengths) or len(video_paths)
+                shares = [
+                    max(1, round(FRAME_OVERSAMPLING * frame_budget * (length or 1) / total))
+                    for length in lengths
+                ]
+                with ThreadPoolExecutor(max_workers=min(4, len(video_paths))) as pool:
+                    sampled = list(pool.map(self._sample_frames, video_paths, lengths, shares))
 
-            frame_count = 0
-            saved_count = 0
+                candidates = [frame for frames in sampled for frame in frames]
+                kept = self._drop_near_duplicates(candidates)
+                if len(kept) > frame_budget:
+                    step = len(kept) / frame_budget
+                    kept = [kept[int(i * step)] for i in range(frame_budget)]
 
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+                frame_paths = []
+                for index, (_, jpeg) in enumerate(kept):
+                    frame_path = os.path.join(frames_dir, f"frame_{index:04d}.jpg")
+                    with open(frame_path, "wb") as f:
+                        f.write(prepare_image(jpeg, IMAGE_LONG_EDGE, IMAGE_QUALITY)[0])
+                    frame_paths.append(frame_path)
+                s.set(candidates=len(candidates), frames=len(frame_paths),
+                      skipped_videos=len(counted) - len(readable))
+                return frames_dir, frame_paths
+            except Exception as e:
+                self.cleanup(temp_dir)
+                raise Exception(f"Error processing video: {str(e)}")
 
-                if frame_count % frame_interval == 0:
-                    frame_path = os.path.join(frames_dir, f"frame_{saved_count:04d}.jpg")
-                    cv2.imwrite(frame_path, frame)
-                    saved_count += 1
+    def _frame_count(self, video_path):
+        """Frame count of a video (0 when the container does not say), None if it cannot be opened"""
+        import cv2  # only the video path needs OpenCV
 
-                frame_count += 1
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            print(f"⚠️  Skipping unreadable video {video_path}")
+            return None
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        return max(count, 0)
 
+    def _sample_frames(self, video_path, length, count):
+        """`count` evenly spaced frames of one video as [(dhash, jpeg bytes)]"""
+        import cv2
+
+        cap = cv2.VideoCapture(str(video_path))
+        frames = []
+        try:
+            if length > 0:
+                positions = [int((i + 0.5) * length / count) for i in range(count)]
+                for position in positions:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+                    ret, frame = cap.read()
+                    if ret:
+                        frames.append(self._encode(frame))
+            else:
+                # Frame count unknown (some containers): decode everything, keep every 30th
+                frame_index = 0
+                while len(frames) < count:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    if frame_index % 30 == 0:
+                        frames.append(self._encode(frame))
+                    frame_index += 1
+        finally:
             cap.release()
-            return frames_dir
+        return frames
 
-        except Exception as e:
-            self.cleanup()
-            raise Exception(f"Error processing video: {str(e)}")
+    def _encode(self, frame):
+        import cv2
+
+        ok, buffer = cv2.imencode(".jpg", frame)
+        if not ok:
+            raise ValueError("Could not encode video frame")
+        jpeg = buffer.tobytes()
+        return dhash(jpeg), jpeg
+
+    def _drop_near_duplicates(self, frames):
+        kept = []
+        for value, jpeg in frames:
+            if all(bin(value ^ other).count("1") > FRAME_DEDUPE_HAMMING for other, _ in kept):
+                kept.append((value, jpeg))
+        return kept
+
+    def analyze_videos(self, video_paths, frame_budget=VIDEO_FRAME_BUDGET):
+        """Analyze all of a listing's videos in one call and return the VideoAnalysis as a dict"""
+        with span("analyze_video", videos=len(video_paths)):
+            frames_dir, frame_paths = self.extract_frames(video_paths, frame_budget)
+            try:
+                images, note = vision_inputs([Path(path).read_bytes() for path in frame_paths], "frame")
+                analysis = run_structured(self.agent, Video_prompt + note, VideoAnalysis, images=images)
+                return analysis.to_analysis()
+            finally:
+                self.cleanup(os.path.dirname(frames_dir))
 
     def analyze_video(self, video_path):
-        """Analyze video and return the results"""
-        frames_dir = self.extract_frames(video_path)
-        try:
-            response = self.agent.run(
-                Video_prompt,
-                tools_input={"load_images_from_directory": {"directory_path": frames_dir}}
-            )
-            return response.content
-        finally:
-            self.cleanup()
+        """Analyze one video and return the VideoAnalysis as a dict"""
+        return self.analyze_videos([video_path])
 
-    def cleanup(self):
+    def cleanup(self, temp_dir):
         """Clean up temporary directory"""
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            import shutil
-            shutil.rmtree(self.temp_dir)
-            self.temp_dir = None
+        if temp_dir and os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
 
 
 if __name__ == "__main__":
     agent = VideoAnalysisAgent()
     video_path = "/Users/jayanth/Documents/GitHub/DemonSeller/Flats/flat7/WhatsApp Video 2025-02-19 at 11.04.42 PM.mp4"
     result = agent.analyze_video(video_path)
-    print(result)
\ No newline at end of file
+    print(result)
@@ -1,19 +1,57 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Request, Header
+from fastapi.responses import JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
-import tempfile
+from starlette.datastructures import Headers
+from contextlib import asynccontextmanager
+from functools import lru_cache, wraps
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
 import os
+import time
 import shutil
-from PIL import Image
-import json
-from datetime import datetime
+import threading
+import hashlib
+import tempfile
+import dotenv
+
+dotenv.load_dotenv()
+
+from components.database.dbmanager import init_db
+from components.database.dbman import DB_NAME
+from components.database.jobdb import get_job, COMPLETED
+from components.utils.folderUtil import generate_unique_property_id
+from components.utils.jobUtil import (
+    submit_analysis_job, create_job_directory, register_completed_job, JobNotRegistrable,
+)
+from components.utils.dedupeUtil import find_duplicates
+from components.utils.documentUtil import EXTRACTORS
+from components.utils.searchLogUtil import log_search, flush_search_log
+from components.utils.auth import get_session
+from components.utils.emailUtil import start_email_sender
+from components.utils.resourceUtil import (
+    build_main_agent, build_vector_store, build_async_vector_store, build_search_agent,
+)
+from components.utils.metricsUtil import HTTP_SECONDS, render_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(init_db, DB_NAME)
+    # Deliver emails queued or due for a retry before this process started
+    await run_in_threadpool(start_email_sender)
+    yield
+    await run_in_threadpool(flush_search_log)
+    if get_async_vector_store.cache_info().currsize:
+        async_store = get_async_vector_store()
+        if async_store is not None:
+            await async_store.close()
+    if get_vector_store.cache_info().currsize:
+        # Unlocks the local index directory for the next process
+        await run_in_threadpool(get_vector_store().close)
 
-# Import your agent (adjust the import path as needed)
-from agents.mainAgent import flat_seller_team
-from models.vectorStore import PropertyVectorStore
 
-app = FastAPI(title="FlatSeller AI API", version="1.0.0")
+app = FastAPI(title="FlatSeller AI API", version="2.0.0", lifespan=lifespan)
 
 # Add CORS middleware for Streamlit communication
 app.add_middleware(
@@ -24,156 +62,379 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Shared resources, built on first use and reused by every request.
+# Handlers take them through Depends so they can be overridden (see
+# benchmarks/apiLoadTest.py). Sync dependencies run on the threadpool, so
+# the first requests can race; building under one lock means each resource
+# (and the local index directory) is opened once.
+_resource_lock = threading.RLock()
+
+
+def _built_once(build):
+    cached = lru_cache(maxsize=None)(build)
+
+    @wraps(build)
+    def getter():
+        with _resource_lock:
+            return cached()
+
+    getter.cache_info = cached.cache_info
+    return getter
+
+
+@_built_once
+def get_main_agent():
+    return build_main_agent()
+
+
+@_built_once
+def get_vector_store():
+    return build_vector_store()
+
+
+@_built_once
+def get_async_vector_store():
+    return build_async_vector_store(get_vector_store())
+
+
+@_built_once
+def get_search_agent():
+    return build_search_agent(get_vector_store(), get_async_vector_store())
+
+
+def get_session_user(authorization: Optional[str] = Header(None)):
+    """
+    The user of an `Authorization: Bearer <session token>` header (the token
+    the app gets at sign-in), None without one; 401 if it is not a live session.
+    """
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    session = get_session(token.strip()) if scheme.lower() == "bearer" and token.strip() else None
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired session token")
+    return session[0]
+
+
+def require_session_user(user=Depends(get_session_user)):
+    """get_session_user, but 401 when no session token is sent"""
+    if user is None:
+        raise HTTPException(status_code=401, detail="Sign in first: send Authorization: Bearer <session token>")
+    return user
+
+
+# Upload limits (bytes). Starlette spools multipart parts to temporary files,
+# and _spool_upload copies them in fixed-size chunks, so memory per upload
+# stays constant whatever the file size. MAX_REQUEST_BYTES is enforced while
+# the body is received; the per-type limits when a part is copied out of
+# Starlette's temporary file.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(25 * 1024 * 1024)))
+MAX_VIDEO_BYTES = int(os.getenv("MAX_VIDEO_BYTES", str(1024 * 1024 * 1024)))
+MAX_TEXT_BYTES = int(os.getenv("MAX_TEXT_BYTES", str(50 * 1024 * 1024)))
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(2 * 1024 * 1024 * 1024)))
+ALLOWED_VIDEO_TYPES = ['video/mp4', 'video/quicktime', 'video/x-msvideo']
+
+
+class RequestSizeLimit:
+    """
+    Reject bodies over max_bytes with 413: from Content-Length before any of
+    it is read, and by counting the bytes as they are received, which also
+    covers chunked requests that send no Content-Length.
+    """
+
+    def __init__(self, app, max_bytes):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside the form parser; FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+app.add_middleware(RequestSizeLimit, max_bytes=MAX_REQUEST_BYTES)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Observe request duration labelled by route template, not raw path"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_SECONDS.labels(
+        request.method, route.path if route else "unmatched", str(response.status_code)
+    ).observe(time.perf_counter() - start)
+    return response
+
+
 class TextInput(BaseModel):
     text_content: str
+    force: bool = False
+
+class UploadInfo(BaseModel):
+    filename: str
+    stored_as: str
+    sha256: str
+    size: int
+    duplicate: bool = False
+
+class JobResponse(BaseModel):
+    job_id: str
+    property_id: str
+    status: str
+    stages: Dict[str, str] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    uploads: List[UploadInfo] = []
+
+class SearchRequest(BaseModel):
+    query: str
+    k: int = Field(5, ge=1, le=50)
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[Dict[str, Any]]
+
+
+def _job_response(job, uploads=()):
+    return JobResponse(
+        job_id=job['job_id'],
+        property_id=job['property_id'],
+        status=job['status'],
+        stages=job['stages'],
+        result=job['result'],
+        error=job['error'],
+        uploads=list(uploads),
+    )
+
+
+def _write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _spool_upload(upload, dest_dir, max_bytes):
+    """
+    Copy one upload into dest_dir in UPLOAD_CHUNK_SIZE chunks, hashing in the
+    same pass. The file is stored under its content hash, so a file uploaded
+    twice for the same property is kept once.
+    """
+    filename = os.path.basename(upload.filename or "upload")
+    ext = os.path.splitext(filename)[1].lower()
+    digest = hashlib.sha256()
+    size = 0
+    fd, part_path = tempfile.mkstemp(dir=dest_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = upload.file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{filename} exceeds the upload limit of {max_bytes} bytes"
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+        sha256 = digest.hexdigest()
+        stored_as = f"{sha256[:16]}{ext}"
+        final_path = os.path.join(dest_dir, stored_as)
+        duplicate = os.path.exists(final_path)
+        if duplicate:
+            os.remove(part_path)
+        else:
+            os.replace(part_path, final_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return UploadInfo(filename=filename, stored_as=stored_as, sha256=sha256, size=size, duplicate=duplicate)
+
+
+async def _save_uploads(files, dest_dir, max_bytes):
+    saved = []
+    for upload in files:
+        saved.append(await run_in_threadpool(_spool_upload, upload, dest_dir, max_bytes))
+    return saved
+
 
-class AnalysisResponse(BaseModel):
-    success: bool
-    message: str
-    analysis: Optional[str] = None
+def _image_paths(img_dir):
+    return [os.path.join(img_dir, name) for name in sorted(os.listdir(img_dir))]
+
+
+async def _reject_duplicates(images, description, vector_store):
+    """409 with the matches when the listing looks like a registered property"""
+    duplicates = await run_in_threadpool(find_duplicates, images, description, vector_store)
+    if duplicates:
+        raise HTTPException(status_code=409, detail={
+            "message": "Possible duplicate of a registered property; resend with force=true to analyze anyway",
+            "duplicates": duplicates,
+        })
+
+
+async def _submit(main_agent, property_id, prop_dir, user_id, description, uploads=()):
+    job_id = await run_in_threadpool(
+        submit_analysis_job, main_agent, property_id, prop_dir, user_id, description
+    )
+    return _job_response(await run_in_threadpool(get_job, job_id), uploads)
 
-# Initialize vector store
-vector_store = PropertyVectorStore()
 
 @app.get("/")
 async def root():
     return {"message": "FlatSeller AI API is running!"}
 
-@app.post("/analyze-text", response_model=AnalysisResponse)
-async def analyze_text(text_input: TextInput):
-    """Analyze flat data from text description only"""
-    try:
-        full_message = f"""
-        Text Description: {text_input.text_content}
-        
-        Please provide a comprehensive analysis of this flat/property including:
-        1. Key features and highlights
-        2. Market positioning
-        3. Target audience
-        4. Selling points
-        5. Pricing recommendations (if applicable)
-        
-        Generate a compelling sales pitch based on the provided data.
-        """
-        
-        response = flat_seller_team.run(full_message)
-        
-        # Handle different response types
-        if hasattr(response, 'content'):
-            analysis_result = response.content
-        else:
-            analysis_result = str(response)
-            
-        return AnalysisResponse(
-            success=True,
-            message="Analysis completed successfully",
-            analysis=analysis_result
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+@app.post("/analyze-text", response_model=JobResponse, status_code=202)
+async def analyze_text(
+    text_input: TextInput,
+    main_agent=Depends(get_main_agent),
+    vector_store=Depends(get_vector_store),
+    user=Depends(get_session_user),
+):
+    """Queue analysis of a property from its text description only, owned by the session's user if any"""
+    if not text_input.force:
+        await _reject_duplicates([], text_input.text_content, vector_store)
+    property_id = generate_unique_property_id()
+    prop_dir = await run_in_threadpool(create_job_directory, property_id)
+    await run_in_threadpool(
+        _write_file, os.path.join(prop_dir, "text", "description.txt"), text_input.text_content.encode("utf-8")
+    )
+    return await _submit(main_agent, property_id, prop_dir, user['id'] if user else None, text_input.text_content)
 
-@app.post("/analyze-multimodal", response_model=AnalysisResponse)
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+@app.post("/analyze-multimodal", response_model=JobResponse, status_code=202)
 async def analyze_multimodal(
+    description: str = Form(""),
+    images: List[UploadFile] = File([]),
+    videos: List[UploadFile] = File([]),
+    text_files: List[UploadFile] = File([]),
     text_file: Optional[UploadFile] = File(None),
     image_file: Optional[UploadFile] = File(None),
-    video_file: Optional[UploadFile] = File(None)
+    video_file: Optional[UploadFile] = File(None),
+    force: bool = Form(False),
+    main_agent=Depends(get_main_agent),
+    vector_store=Depends(get_vector_store),
+    user=Depends(get_session_user),
 ):
-    """Analyze flat data from multiple input types (text, image, video)"""
-    
-    if not any([text_file, image_file, video_file]):
-        raise HTTPException(status_code=400, detail="At least one file must be provided")
-    
-    temp_dir = None
-    user_message = ""
-    
+    """
+    Queue analysis of a property from text, image and video uploads.
+
+    Accepts any number of `images`, `videos` and `text_files` parts; the single
+    `image_file`/`video_file`/`text_file` fields are still accepted. Listings
+    that look like a registered property are rejected with 409 unless
+    `force` is set. The job belongs to the session's user, if a session
+    token is sent.
+    """
+    images = images + ([image_file] if image_file else [])
+    videos = videos + ([video_file] if video_file else [])
+    text_files = text_files + ([text_file] if text_file else [])
+    if not any([description.strip(), images, videos, text_files]):
+        raise HTTPException(status_code=400, detail="At least one file or a description must be provided")
+    for image in images:
+        if not (image.content_type or "").startswith('image/'):
+            raise HTTPException(status_code=400, detail=f"Invalid image file type: {image.filename}")
+    for video in videos:
+        if video.content_type not in ALLOWED_VIDEO_TYPES:
+            raise HTTPException(status_code=400, detail=f"Invalid video file type: {video.filename}")
+    for text in text_files:
+        if os.path.splitext(text.filename or "")[1].lower() not in EXTRACTORS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported text file type: {text.filename} (use {', '.join(EXTRACTORS)})"
+            )
+
+    property_id = generate_unique_property_id()
+    prop_dir = await run_in_threadpool(create_job_directory, property_id)
     try:
-        # Create temporary directory for files
-        temp_dir = tempfile.mkdtemp()
-        
-        # Process text file
-        if text_file:
-            text_content = (await text_file.read()).decode("utf-8", errors="ignore")
-            user_message += f"Text Description: {text_content}\n\n"
-        
-        # Process image file
-        if image_file:
-            # Validate image file
-            if not image_file.content_type.startswith('image/'):
-                raise HTTPException(status_code=400, detail="Invalid image file type")
-            
-            # Save image to temp directory
-            image_path = os.path.join(temp_dir, f"uploaded_image.{image_file.filename.split('.')[-1]}")
-            
-            with open(image_path, "wb") as buffer:
-                content = await image_file.read()
-                buffer.write(content)
-            
-            # Validate image can be opened
-            try:
-                img = Image.open(image_path)
-                img.verify()  # Verify it's a valid image
-            except Exception:
-                raise HTTPException(status_code=400, detail="Invalid or corrupted image file")
-            
-            user_message += f"Please analyze the image located at: {image_path}\n\n"
-        
-        # Process video file
-        if video_file:
-            # Validate video file type
-            allowed_video_types = ['video/mp4', 'video/quicktime', 'video/x-msvideo']
-            if video_file.content_type not in allowed_video_types:
-                raise HTTPException(status_code=400, detail="Invalid video file type")
-            
-            # Save video to temp directory
-            video_path = os.path.join(temp_dir, f"uploaded_video.{video_file.filename.split('.')[-1]}")
-            
-            with open(video_path, "wb") as buffer:
-                content = await video_file.read()
-                buffer.write(content)
-            
-            user_message += f"Please analyze the video located at: {video_path}\n\n"
-        
-        # Create full analysis message
-        full_message = f"""
-        {user_message}
-        
-        Please provide a comprehensive analysis of this flat/property including:
-        1. Key features and highlights
-        2. Market positioning
-        3. Target audience
-        4. Selling points
-        5. Pricing recommendations (if applicable)
-        
-        Generate a compelling sales pitch based on the provided data.
-        """
-        
-        # Run the team analysis
-        response = flat_seller_team.run(full_message)
-        
-        # Handle different response types
-        if hasattr(response, 'content'):
-            analysis_result = response.content
-        else:
-            analysis_result = str(response)
-            
-        return AnalysisResponse(
-            success=True,
-            message="Multimodal analysis completed successfully",
-            analysis=analysis_result
-        )
-        
-    except HTTPException:
+        if description.strip():
+            await run_in_threadpool(
+                _write_file, os.path.join(prop_dir, "text", "description.txt"), description.encode("utf-8")
+            )
+        uploads = []
+        uploads += await _save_uploads(text_files, os.path.join(prop_dir, "text"), MAX_TEXT_BYTES)
+        uploads += await _save_uploads(images, os.path.join(prop_dir, "images"), MAX_IMAGE_BYTES)
+        uploads += await _save_uploads(videos, os.path.join(prop_dir, "videos"), MAX_VIDEO_BYTES)
+        if not force:
+            # The spooled files are hashed one at a time rather than read into memory
+            image_paths = await run_in_threadpool(_image_paths, os.path.join(prop_dir, "images"))
+            await _reject_duplicates(image_paths, description, vector_store)
+    except BaseException:
+        await run_in_threadpool(shutil.rmtree, os.path.dirname(prop_dir), True)
         raise
+
+    return await _submit(main_agent, property_id, prop_dir, user['id'] if user else None, description, uploads)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def job_status(job_id: str):
+    """Poll an ingestion job's status, per-stage progress and result"""
+    job = await run_in_threadpool(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@app.post("/jobs/{job_id}/register", response_model=JobResponse)
+async def register_job(
+    job_id: str,
+    main_agent=Depends(get_main_agent),
+    vector_store=Depends(get_vector_store),
+    user=Depends(require_session_user),
+):
+    """Save a completed job's property to the database and the vector store, as the session's user"""
+    job = await run_in_threadpool(get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['user_id'] is not None and job['user_id'] != user['id']:
+        raise HTTPException(status_code=403, detail="Job belongs to another user")
+    if job['status'] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}, not {COMPLETED}")
+    try:
+        await run_in_threadpool(register_completed_job, job, vector_store, user['id'], main_agent)
+    except JobNotRegistrable as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
-    
-    finally:
-        # Cleanup temporary directory
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
+    return _job_response(await run_in_threadpool(get_job, job_id))
+
+@app.post("/search", response_model=SearchResponse)
+async def search(request: SearchRequest, search_agent=Depends(get_search_agent), user=Depends(get_session_user)):
+    """
+    Vector search plus LLM re-ranking of registered properties. The search is
+    logged under the session's user, or with no user when anonymous.
+    """
+    if not request.query.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    timings = {}
+    results = await search_agent.asearch(request.query.strip(), request.k, timings=timings)
+    log_search(user['id'] if user else None, request.query.strip(), results, k=request.k, timings=timings, source="api")
+    return SearchResponse(query=request.query, results=results)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "FlatSeller AI API"} 
\ No newline at end of file
+    return {"status": "healthy", "service": "FlatSeller AI API"}
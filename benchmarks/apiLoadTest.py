@@ -0,0 +1,186 @@
+"""
+Load test for the FastAPI service (app.py) against local stand-ins.
+
+The real MainAnalysisAgent and PropertySearchAgent are used, but every
+agno Agent they own is replaced by a stand-in whose run() sleeps for
+--llm-latency seconds and returns canned JSON (Gemini), and the vector store
+is a stand-in whose calls sleep for --vector-latency seconds (Qdrant).
+Both sleeps block their thread exactly like the real HTTP clients, so the
+numbers show whether blocking work is kept off the event loop.
+
+Usage:
+    python benchmarks/apiLoadTest.py [--requests 200] [--concurrency 20]
+                                     [--llm-latency 0.2] [--vector-latency 0.05]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CANNED_ANALYSIS = {
+    "rooms": ["living room", "kitchen", "bedroom"],
+    "appliances": {"fridge": 1, "fan": 2},
+    "features": ["balcony"],
+}
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+
+
+class StandInAgent:
+    """Replaces an agno Agent: sleeps like a Gemini round-trip, returns canned JSON"""
+
+    def __init__(self, latency, content):
+        self.latency = latency
+        self.content = content
+
+    def run(self, message=None, **kwargs):
+        time.sleep(self.latency)
+        return _Response(self.content)
+
+    async def arun(self, message=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _Response(self.content)
+
+
+class StandInVectorStore:
+    """Replaces QdrantVectorStoreClient: sleeps like a Qdrant round-trip"""
+
+    def __init__(self, latency, n_properties=50):
+        self.latency = latency
+        self.ids = [f"prop-{i:04d}" for i in range(n_properties)]
+
+    def similarity_search(self, query, k=5, filters=None):
+        time.sleep(self.latency)
+        if filters:
+            return []  # the pre-upload duplicate check: no registered description matches
+        return [
+            {"id": pid, "property_id": pid, "score": 1.0 - i / 100, "metadata": {}, "content": "rooms: kitchen"}
+            for i, pid in enumerate(self.ids[:k])
+        ]
+
+    def add_documents(self, items):
+        time.sleep(self.latency)
+        return [item["id"] for item in items]
+
+    def health_check(self, max_age=0):
+        return True
+
+
+def build_stand_ins(llm_latency, vector_latency):
+    from agents.mainAgent import MainAnalysisAgent
+    from agents.searchAgent import PropertySearchAgent
+
+    main_agent = MainAnalysisAgent()
+    canned = json.dumps(CANNED_ANALYSIS)
+    for sub in (main_agent, main_agent.image_agent, main_agent.video_agent, main_agent.text_agent):
+        sub.agent = StandInAgent(llm_latency, canned)
+
+    vector_store = StandInVectorStore(vector_latency)
+    search_agent = PropertySearchAgent(vector_store)
+    ranked = [{"property_id": pid, "score": 0.2, "matched_features": [], "missing_features": [],
+               "feature_match_percentage": 100} for pid in vector_store.ids[:5]]
+    search_agent.agent = StandInAgent(llm_latency, json.dumps(ranked))
+    return main_agent, vector_store, search_agent
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _drive(client, n_requests, concurrency, make_request):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": n_requests,
+        "errors": errors,
+        "rps": n_requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+async def _search(client, i):
+    return await client.post("/search", json={"query": f"2 BHK with balcony #{i}", "k": 5})
+
+
+async def _submit_job(client, i):
+    return await client.post(
+        "/jobs",
+        data={"description": f"Spacious 2 BHK flat #{i} with balcony and lift"},
+        files=[("images", (f"img_{i}.jpg", b"\xff\xd8\xff\xe0fake", "image/jpeg"))],
+    )
+
+
+async def _health(client, i):
+    return await client.get("/health")
+
+
+async def run(args):
+    import logging
+    import httpx
+    import app as api
+    from components.database.dbmanager import init_db
+    from components.database.dbman import DB_NAME
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    init_db(DB_NAME)
+    main_agent, vector_store, search_agent = build_stand_ins(args.llm_latency, args.vector_latency)
+    api.app.dependency_overrides[api.get_main_agent] = lambda: main_agent
+    api.app.dependency_overrides[api.get_vector_store] = lambda: vector_store
+    api.app.dependency_overrides[api.get_search_agent] = lambda: search_agent
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=120) as client:
+        results = {}
+        for name, make_request in [("POST /search", _search), ("POST /jobs", _submit_job), ("GET /health", _health)]:
+            results[name] = await _drive(client, args.requests, args.concurrency, make_request)
+
+        # A health probe issued while searches are in flight must not queue behind them
+        search_load = asyncio.create_task(_drive(client, args.requests, args.concurrency, _search))
+        await asyncio.sleep(args.llm_latency / 2)
+        results["GET /health under search load"] = await _drive(client, 20, 5, _health)
+        await search_load
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--vector-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Keep the benchmark's SQLite file and job directories out of the repository
+    workdir = tempfile.mkdtemp(prefix="demonseller_load_")
+    os.environ.setdefault("INGEST_DIR", os.path.join(workdir, "jobs"))
+    os.chdir(workdir)
+
+    results = asyncio.run(run(args))
+    print(f"{'endpoint':<32}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<32}{r['rps']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['errors']:>8}")
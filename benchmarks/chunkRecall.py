@@ -0,0 +1,172 @@
+"""
+Recall and index-size comparison of single-chunk vs section-chunked
+property documents.
+
+Builds a synthetic corpus of property profiles (the MainAnalysisAgent JSON
+shape plus a free-text description), indexes it once per configuration in
+an on-disk local Qdrant collection, and runs two query sets:
+  * multi-aspect  - "2BHK in Kondapur with gym, pets allowed"
+  * single-aspect - "flat with gym and swimming pool"
+A property is relevant when it has every attribute in the query; recall@k
+is |relevant in top-k| / min(k, |relevant|).
+
+Configurations: single/max (the previous layout), sections/max and
+sections/weighted. Index size is the number of points and the on-disk size
+of the collection directory.
+
+Embeddings default to the offline HashEmbeddings (bag of words); pass
+--gemini to use text-embedding-004 with google_api_key from the environment.
+
+Usage:
+    python benchmarks/chunkRecall.py [--properties 500] [--queries 200] [--k 5] [--gemini]
+"""
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LOCALITIES = ["Hitech City", "Gachibowli", "Madhapur", "Kondapur", "Banjara Hills", "Kukatpally",
+              "Jubilee Hills", "Manikonda", "Miyapur", "Begumpet"]
+AMENITIES = ["gym", "swimming pool", "clubhouse", "power backup", "covered parking", "elevator",
+             "children play area", "24x7 security", "garden", "wifi ready", "intercom", "rainwater harvesting"]
+FEATURES = ["modular kitchen", "wooden flooring", "marble flooring", "natural light", "cross ventilation",
+            "high ceilings", "premium fittings", "false ceiling"]
+RULES = ["pets allowed", "no pets", "bachelors allowed", "family only", "vegetarians only", "no smoking"]
+FILLER = (
+    "The apartment offers a comfortable living experience with thoughtfully designed interiors. "
+    "Residents enjoy a peaceful environment, good maintenance and responsive management. "
+    "The property is close to everyday conveniences and is suitable for working professionals. "
+)
+CONFIGS = [("single", "max"), ("sections", "max"), ("sections", "weighted")]
+
+
+def make_property(rng, i):
+    bhk = rng.choice([1, 2, 3])
+    locality = rng.choice(LOCALITIES)
+    amenities = rng.sample(AMENITIES, rng.randint(2, 4))
+    rules = rng.sample(RULES, 2)
+    profile = {
+        "property_name": f"{bhk}BHK Apartment {i} in {locality}",
+        "property_location": f"{locality}, Hyderabad, Telangana",
+        "property_summary": f"{bhk}BHK apartment in {locality}. " + FILLER,
+        "rooms": ["living room", "kitchen"] + [f"bedroom {b + 1}" for b in range(bhk)],
+        "appliances": {"fan": bhk + 1, "ac": rng.randint(0, bhk), "fridge": 1},
+        "key_features": rng.sample(FEATURES, 3),
+        "amenities": amenities,
+        "layout_and_condition": "Well-planned layout with good room connectivity. " + FILLER,
+        "location_insights": f"Located in {locality} with access to schools, hospitals and IT parks. " + FILLER,
+        "rules_and_restrictions": ", ".join(rules),
+        "contact_info": "Broker: +91 90000 00000",
+        "additional_info": FILLER,
+        "rent": str(rng.randint(10, 60) * 1000),
+    }
+    attrs = {"bhk": bhk, "locality": locality, "amenities": set(amenities), "rules": set(rules)}
+    item = {
+        "id": f"prop-{i:05d}",
+        "property_id": f"prop-{i:05d}",
+        "text_description": json.dumps(profile),
+        "description": f"Spacious {bhk}BHK flat for rent in {locality}. " + FILLER * 2,
+    }
+    return item, attrs
+
+
+def make_multi_aspect_query(rng, attrs):
+    amenity = rng.choice(sorted(attrs["amenities"]))
+    rule = rng.choice(sorted(attrs["rules"]))
+    text = f"{attrs['bhk']}BHK in {attrs['locality']} with {amenity}, {rule}"
+    want = {"bhk": attrs["bhk"], "locality": attrs["locality"], "amenities": {amenity}, "rules": {rule}}
+    return text, want
+
+
+def make_single_aspect_query(rng, attrs):
+    first, second = rng.sample(sorted(attrs["amenities"]), 2)
+    return f"flat with {first} and {second}", {"amenities": {first, second}}
+
+
+def is_relevant(attrs, want):
+    for key, value in want.items():
+        if isinstance(value, set):
+            if not value <= attrs[key]:
+                return False
+        elif attrs[key] != value:
+            return False
+    return True
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def evaluate(items, corpus_attrs, query_sets, k, chunking, aggregate, embeddings):
+    from models.vectorStore import QdrantVectorStoreClient
+
+    path = tempfile.mkdtemp(prefix="demonseller_chunks_")
+    try:
+        store = QdrantVectorStoreClient(
+            url=None, api_key=None, collection="recall", google_api_key=None,
+            backend="local", location=path, embeddings=embeddings,
+            chunking=chunking, aggregate=aggregate,
+        )
+        for start in range(0, len(items), 64):
+            store.add_documents(items[start:start + 64])
+        points = store.client.count("recall").count
+
+        result = {"chunking": chunking, "aggregate": aggregate}
+        for name, queries in query_sets.items():
+            recalls = []
+            for text, want in queries:
+                relevant = {item["property_id"] for item, attrs in zip(items, corpus_attrs) if is_relevant(attrs, want)}
+                top = [r["property_id"] for r in store.similarity_search(text, k)]
+                recalls.append(len(relevant.intersection(top)) / min(k, len(relevant)))
+            result[name] = sum(recalls) / len(recalls)
+        store.client.close()
+        result["points"] = points
+        result["disk_mb"] = dir_size(path) / (1024 * 1024)
+        return result
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main(args):
+    from benchmarks.fakes import HashEmbeddings
+
+    if args.gemini:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004",
+                                                  google_api_key=os.getenv("google_api_key"))
+    else:
+        embeddings = HashEmbeddings()
+
+    rng = random.Random(args.seed)
+    corpus = [make_property(rng, i) for i in range(args.properties)]
+    items = [item for item, _ in corpus]
+    corpus_attrs = [attrs for _, attrs in corpus]
+    query_sets = {
+        "multi_aspect": [make_multi_aspect_query(rng, rng.choice(corpus_attrs)) for _ in range(args.queries)],
+        "single_aspect": [make_single_aspect_query(rng, rng.choice(corpus_attrs)) for _ in range(args.queries)],
+    }
+
+    return [evaluate(items, corpus_attrs, query_sets, args.k, c, a, embeddings) for c, a in CONFIGS]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--gemini", action="store_true", help="use Gemini text-embedding-004 (needs google_api_key)")
+    args = parser.parse_args()
+
+    results = main(args)
+    print(f"{'chunking':<10}{'aggregate':<10}{'multi-aspect':>14}{'single-aspect':>15}{'points':>9}{'disk MB':>9}")
+    print(f"{'':<20}{f'recall@{args.k}':>14}{f'recall@{args.k}':>15}")
+    for r in results:
+        print(f"{r['chunking']:<10}{r['aggregate']:<10}{r['multi_aspect']:>14.3f}{r['single_aspect']:>15.3f}"
+              f"{r['points']:>9}{r['disk_mb']:>9.2f}")
@@ -0,0 +1,135 @@
+"""
+Memory and latency of broker-document text analysis.
+
+Generates a synthetic brochure (a --pages page PDF, or a DOCX with
+--docx) and measures:
+  extract     - streaming the text page by page and packing it into
+                TEXT_TOKEN_BUDGET chunks (peak traced Python memory)
+  map-reduce  - TextAnalysisAgent.analyze_texts on the file, with every
+                chunk call answered by FakeGeminiModel after --llm-latency
+                seconds, at --workers concurrent chunk calls
+The "whole read" row is the previous approach for reference: the full
+text held in memory as one prompt.
+
+Usage:
+    python benchmarks/documentBench.py [--pages 200] [--docx] [--token-budget 30000]
+        [--workers 4] [--llm-latency 0.5]
+"""
+import os
+import sys
+import json
+import time
+import zipfile
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+PARAGRAPH = (
+    "Spacious 3BHK apartment with modular kitchen, covered parking and a private balcony. "
+    "The gated community offers a gym, swimming pool and 24x7 security. "
+    "Monthly rent 45000, maintenance extra. Family preferred, no pets. "
+)
+LINES_PER_PAGE = 40
+
+
+def page_lines(number):
+    return [f"Page {number} line {line}: {PARAGRAPH[:90]}" for line in range(LINES_PER_PAGE)]
+
+
+def write_pdf(path, pages):
+    """A minimal text PDF, written object by object"""
+    offsets = []
+    with open(path, "wb") as f:
+        def obj(number, body):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        page_ids = [4 + 2 * i for i in range(pages)]
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode()
+        obj(2, b"<< /Type /Pages /Kids [" + kids + b"] /Count " + str(pages).encode() + b" >>")
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for i, pid in enumerate(page_ids):
+            text = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(
+                f"({line}) '" for line in page_lines(i + 1)
+            ) + " ET"
+            obj(pid, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+                     f"/Contents {pid + 1} 0 R >>".encode())
+            stream = text.encode()
+            obj(pid + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def write_docx(path, pages):
+    """A minimal DOCX: one paragraph per line"""
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(
+        f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for page in range(pages) for line in page_lines(page + 1)
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", '<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types"/>')
+        archive.writestr("word/document.xml", f'<?xml version="1.0"?><w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>')
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def main(args):
+    from components.utils.documentUtil import iter_document, pack_chunks
+    from agents.textAgent import TextAnalysisAgent
+    import agents.textAgent as text_agent_module
+    from benchmarks.fakes import FakeGeminiModel, CANNED_TEXT_ANALYSIS
+
+    workdir = tempfile.mkdtemp(prefix="document_bench_")
+    path = os.path.join(workdir, "brochure.docx" if args.docx else "brochure.pdf")
+    (write_docx if args.docx else write_pdf)(path, args.pages)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    def whole_read():
+        return len("".join(iter_document(path)))
+
+    def extract():
+        return sum(1 for _ in pack_chunks([("brochure", iter_document(path))], args.token_budget))
+
+    text_agent_module.TEXT_MAP_WORKERS = args.workers
+    agent = TextAnalysisAgent()
+    agent.agent.model = FakeGeminiModel(latency=args.llm_latency, reply=json.dumps(CANNED_TEXT_ANALYSIS))
+
+    rows = []
+    chars, seconds, peak = measure(whole_read)
+    rows.append(("whole read", f"{chars} chars", seconds, peak))
+    chunks, seconds, peak = measure(extract)
+    rows.append(("extract", f"{chunks} chunks", seconds, peak))
+    _, seconds, peak = measure(lambda: agent.analyze_texts([path], args.token_budget))
+    rows.append(("map-reduce", f"{agent.agent.model.calls} calls", seconds, peak))
+
+    print(f"{os.path.basename(path)}: {args.pages} pages, {size_mb:.1f} MB, token budget {args.token_budget}")
+    print(f"{'stage':<14}{'output':>16}{'seconds':>10}{'peak MB':>10}")
+    for stage, output, seconds, peak in rows:
+        print(f"{stage:<14}{output:>16}{seconds:>10.2f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--docx", action="store_true", help="generate a DOCX instead of a PDF")
+    parser.add_argument("--token-budget", type=int, default=30000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""
+End-to-end check of the email outbox against a local aiosmtpd server.
+
+Registers a property with image variants in a scratch database, queues
+--emails shares (one to a mailbox the stand-in rejects), runs the sender
+and checks that every accepted email arrived over a single SMTP session,
+carries the property's thumbs as inline cid: images and that the outbox
+rows end up sent / failed. Prints the queue and delivery timings.
+
+Needs `pip install aiosmtpd` (a test-only dependency).
+
+Usage:
+    python benchmarks/emailOutboxSmoke.py [--emails 10] [--port 8025]
+"""
+import os
+import io
+import sys
+import time
+import email
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+REJECTED = "nobody@example.invalid"
+
+
+class Inbox:
+    """aiosmtpd handler keeping accepted messages and the SMTP sessions they came over"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(email.message_from_bytes(envelope.content))
+        return "250 Message accepted for delivery"
+
+
+def seed_property(property_id):
+    from PIL import Image
+    from components.database.propdb import save_property_to_db, save_image_to_db
+    from components.utils.imageUtil import make_variants
+
+    save_property_to_db(property_id, "Bright 2BHK near the metro", {
+        "property_name": "Metro 2BHK", "rent": "₹25,000 per month", "key_features": ["balcony", "parking"],
+    }, created_by=1)
+    for i in range(4):
+        buffered = io.BytesIO()
+        Image.new("RGB", (1600, 1200), (40 * i, 120, 200)).save(buffered, "JPEG")
+        variants = make_variants(buffered.getvalue())
+        save_image_to_db(property_id, f"photo_{i}.jpg", variants["full"], variants["card"], variants["thumb"])
+
+
+def main(args):
+    from aiosmtpd.controller import Controller
+
+    os.environ.update({
+        "SMTP_SERVER": "127.0.0.1", "SMTP_PORT": str(args.port), "SMTP_STARTTLS": "false",
+        "SMTP_USERNAME": "", "SMTP_SENDER": "listings@example.com",
+        "EMAIL_BATCH_SIZE": str(args.emails + 1), "EMAIL_MAX_ATTEMPTS": "1",
+        "TRACING_ENABLED": "false",
+    })
+    os.chdir(tempfile.mkdtemp(prefix="email_outbox_smoke_"))  # scratch property_manager.db
+    from components.database.dbmanager import init_db, DB_NAME
+    from components.database.outboxdb import enqueue_email, get_user_emails
+    from components.utils.emailUtil import send_pending_emails
+
+    init_db(DB_NAME)
+    seed_property("smoke-property")
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        payload = {"query": "2bhk with balcony", "include_images": True, "results": [{
+            "property_id": "smoke-property", "score": 0.91, "matched_features": ["balcony"],
+            "missing_features": [], "feature_match_percentage": 100,
+        }]}
+        recipients = [f"buyer{i}@example.com" for i in range(args.emails)] + [REJECTED]
+        start = time.perf_counter()
+        for recipient in recipients:
+            enqueue_email(1, recipient, "Property Search Results: 2bhk with balcony", payload)
+        queued = time.perf_counter() - start
+        start = time.perf_counter()
+        send_pending_emails()
+        delivered = time.perf_counter() - start
+    finally:
+        controller.stop()
+
+    statuses = {e['recipient']: e['status'] for e in get_user_emails(1, limit=len(recipients))}
+    message = inbox.messages[0]
+    html = next(p for p in message.walk() if p.get_content_type() == "text/html").get_payload(decode=True).decode()
+    cids = [p["Content-ID"].strip("<>") for p in message.walk() if p.get("Content-ID")]
+
+    checks = {
+        "all accepted emails delivered": len(inbox.messages) == args.emails,
+        "one SMTP session for the batch": len(inbox.sessions) == 1,
+        "thumbs inline and referenced": len(cids) == 3 and all(f"cid:{cid}" in html for cid in cids),
+        "outbox statuses recorded": statuses[REJECTED] == "failed"
+            and all(statuses[r] == "sent" for r in recipients[:-1]),
+    }
+    print(f"queued {len(recipients)} emails in {queued * 1000:.1f} ms, delivered in {delivered * 1000:.1f} ms "
+          f"({len(inbox.sessions)} SMTP session(s), {len(message.as_bytes()) // 1024} KB per email)")
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8025)
+    main(parser.parse_args())
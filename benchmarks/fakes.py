@@ -0,0 +1,191 @@
+"""
+Deterministic offline stand-ins for the Gemini model and embeddings.
+
+FakeGeminiModel is a real agno Model, so Agent.run, message building and
+token metrics all run unchanged; only the provider call is replaced by a
+configurable sleep and a canned (or computed) JSON reply.
+
+HashEmbeddings is a LangChain Embeddings that feature-hashes word tokens
+into a fixed-size L2-normalised vector, so texts that share words score as
+similar and every run is reproducible.
+"""
+import re
+import json
+import time
+import math
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from agno.models.base import Model
+from agno.models.response import ModelResponse
+from langchain_core.embeddings import Embeddings
+
+CANNED_IMAGE_ANALYSIS = {
+    "rooms": ["living room", "kitchen", "bedroom", "bathroom"],
+    "appliances": {"fridge": 1, "fan": 3, "air conditioner": 2, "tv": 1},
+    "features": ["balcony", "wooden floor", "modular kitchen"],
+}
+
+CANNED_VIDEO_ANALYSIS = {
+    "appliances": {"fridge": 1, "fan": 3, "washing machine": 1},
+    "rooms": ["living room", "kitchen", "bedroom"],
+    "layout": "2BHK with open kitchen",
+    "condition": "newly renovated",
+    "features": ["balcony", "lift"],
+    "space_quality": "bright and airy",
+}
+
+CANNED_TEXT_ANALYSIS = {
+    "rooms": ["living room", "kitchen", "bedroom"],
+    "appliances": {"fridge": 1, "air conditioner": 2},
+    "features": ["parking", "24x7 security"],
+    "property_details": {"type": "apartment", "size": "1100 sqft", "location": "Hitech City", "price": "25000"},
+    "amenities": ["gym", "swimming pool"],
+    "rules_and_restrictions": "No pets",
+    "additional_info": ["close to metro"],
+    "nearby_landmarks": ["Hitech City metro"],
+    "contact_info": "Broker: +91 90000 00000",
+    "rent": "25000",
+}
+
+CANNED_PROFILE = {
+    "property_name": "Hitech City 2BHK",
+    "property_location": "Hitech City",
+    "property_summary": "Renovated 2BHK apartment with balcony and parking.",
+    "rooms": ["living room", "kitchen", "bedroom"],
+    "appliances": {"fridge": 1, "fan": 3},
+    "key_features": ["balcony", "parking"],
+    "amenities": ["gym", "swimming pool"],
+    "layout_and_condition": "2BHK, newly renovated",
+    "location_insights": "close to metro",
+    "rules_and_restrictions": "No pets",
+    "contact_info": "Broker: +91 90000 00000",
+    "additional_info": "",
+    "rent": "25000",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini-style token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+PROPERTY_ID_PATTERN = r'"property_id":\s*"([^"]+)"'
+
+
+def rank_search_candidates(prompt: str) -> str:
+    """Search reply: rank the candidate property ids found in the prompt in their given order"""
+    from prompts.searchPrompt import Search_prompt
+
+    example_ids = set(re.findall(PROPERTY_ID_PATTERN, Search_prompt))
+    ids = [pid for pid in dict.fromkeys(re.findall(PROPERTY_ID_PATTERN, prompt)) if pid not in example_ids]
+    if not ids:
+        return json.dumps({"matches": [], "message": "No properties found matching your requirements."})
+    weights = [1.0 / (rank + 1) for rank in range(len(ids))]
+    total = sum(weights)
+    return json.dumps({"matches": [
+        {
+            "property_id": pid,
+            "score": round(w / total, 4),
+            "matched_features": ["balcony"],
+            "missing_features": [],
+            "feature_match_percentage": 100,
+        }
+        for pid, w in zip(ids, weights)
+    ]})
+
+
+@dataclass
+class FakeGeminiModel(Model):
+    """agno Model whose provider call sleeps `latency` seconds and replies with `reply`"""
+
+    id: str = "fake-gemini"
+    name: str = "FakeGemini"
+    provider: str = "Fake"
+
+    latency: float = 0.0
+    reply: Union[str, Callable[[str], str]] = "{}"
+    calls: int = field(default=0, repr=False)
+
+    def _reply_to(self, messages) -> Dict[str, Any]:
+        prompt = "\n".join(m.get_content_string() for m in messages if m.content is not None)
+        text = self.reply(prompt) if callable(self.reply) else self.reply
+        self.calls += 1
+        return {
+            "text": text,
+            "usage": {"input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)},
+        }
+
+    def invoke(self, messages, **kwargs) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        return self._reply_to(messages)
+
+    async def ainvoke(self, messages, **kwargs) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        return self._reply_to(messages)
+
+    def invoke_stream(self, messages, **kwargs) -> Iterator[Dict[str, Any]]:
+        yield self.invoke(messages, **kwargs)
+
+    async def ainvoke_stream(self, messages, **kwargs):
+        yield await self.ainvoke(messages, **kwargs)
+
+    def parse_provider_response(self, response: Dict[str, Any], **kwargs) -> ModelResponse:
+        return ModelResponse(role="assistant", content=response["text"], response_usage=response["usage"])
+
+    def parse_provider_response_delta(self, response: Dict[str, Any]) -> ModelResponse:
+        return self.parse_provider_response(response)
+
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or the this to with".split()
+)
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings via the hashing trick (stopwords ignored)"""
+
+    def __init__(self, size: int = 768, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for token in re.findall(r"[a-z0-9]+", text.lower()):
+            if token in STOPWORDS:
+                continue
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
+
+
+def install_fake_models(main_agent=None, search_agent=None, latency: float = 0.0):
+    """Point every agno Agent owned by the given agents at a FakeGeminiModel"""
+    replies = []
+    if main_agent is not None:
+        replies += [
+            (main_agent.agent, json.dumps(CANNED_PROFILE)),
+            (main_agent.image_agent.agent, json.dumps(CANNED_IMAGE_ANALYSIS)),
+            (main_agent.video_agent.agent, json.dumps(CANNED_VIDEO_ANALYSIS)),
+            (main_agent.text_agent.agent, json.dumps(CANNED_TEXT_ANALYSIS)),
+        ]
+    if search_agent is not None:
+        replies.append((search_agent.agent, rank_search_candidates))
+    models = []
+    for agent, reply in replies:
+        agent.model = FakeGeminiModel(latency=latency, reply=reply)
+        models.append(agent.model)
+    return models
@@ -0,0 +1,88 @@
+"""
+Bytes, estimated Gemini tokens and preprocessing time per image for
+IMAGE_LONG_EDGE / IMAGE_QUALITY settings.
+
+Runs ImageAnalysisAgent.prepare_images (EXIF orientation, downsize,
+JPEG re-encode on a thread pool) over a folder of listing photos, or over
+synthetic 12MP phone-like photos when --images is not given, and prints
+one row per (long edge, quality) pair next to the untouched originals.
+The model-accuracy side of the trade-off needs real photos and a Gemini
+key; run the pipeline on a sample at the chosen settings to check it.
+
+Usage:
+    python benchmarks/imagePrepBench.py [--images DIR] [--count 8]
+        [--long-edges 512 768 1024 1536] [--qualities 70 85]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+
+def make_photos(directory, count, size=(4032, 3024)):
+    """Phone-sized JPEGs with smooth gradients, noise and an EXIF rotation tag"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(3)
+    paths = []
+    for i in range(count):
+        y, x = np.mgrid[0:size[1], 0:size[0]]
+        base = np.stack([(x * (i + 1)) % 256, (y * 2) % 256, (x + y) % 256], axis=-1).astype(np.float32)
+        pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+        img = Image.fromarray(pixels)
+        exif = img.getexif()
+        exif[0x0112] = 6  # rotated 90° like a portrait phone shot
+        path = os.path.join(directory, f"photo_{i}.jpg")
+        img.save(path, format="JPEG", quality=92, exif=exif)
+        paths.append(path)
+    return paths
+
+
+def main(args):
+    from PIL import Image
+    from agents.imageAgent import ImageAnalysisAgent
+    from components.utils.imageUtil import estimate_image_tokens
+
+    workdir = None
+    if args.images:
+        paths = ImageAnalysisAgent.list_images(None, args.images)
+    else:
+        workdir = tempfile.mkdtemp(prefix="image_prep_bench_")
+        paths = make_photos(workdir, args.count)
+
+    agent = ImageAnalysisAgent()
+    rows = []
+    originals = [Image.open(p).size for p in paths]
+    rows.append(("original", "-", sum(os.path.getsize(p) for p in paths) / len(paths),
+                 sum(estimate_image_tokens(w, h) for w, h in originals) / len(paths), 0.0))
+    for long_edge in args.long_edges:
+        for quality in args.qualities:
+            start = time.perf_counter()
+            prepared = agent.prepare_images(paths, long_edge, quality)
+            elapsed = (time.perf_counter() - start) * 1000 / len(paths)
+            reports = [report for _, report in prepared]
+            rows.append((long_edge, quality, sum(r["bytes"] for r in reports) / len(reports),
+                         sum(r["tokens"] for r in reports) / len(reports), elapsed))
+
+    if workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\n{len(paths)} images")
+    print(f"{'long edge':>10}{'quality':>9}{'KB/image':>10}{'tokens/image':>14}{'prep ms/image':>15}")
+    for long_edge, quality, size, tokens, ms in rows:
+        print(f"{long_edge:>10}{quality:>9}{size / 1024:>10.0f}{tokens:>14.0f}{ms:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default=None, help="folder of photos (default: synthetic 12MP photos)")
+    parser.add_argument("--count", type=int, default=8)
+    parser.add_argument("--long-edges", type=int, nargs="+", default=[512, 768, 1024, 1536])
+    parser.add_argument("--qualities", type=int, nargs="+", default=[70, 85])
+    main(parser.parse_args())
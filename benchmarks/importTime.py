@@ -0,0 +1,124 @@
+"""
+Import-time profile of the Streamlit entry point (`python -X importtime`).
+
+Importing main.py is everything the login page needs before it can paint,
+so its cumulative import time is tracked against LOGIN_PAGE_BUDGET_MS.
+Modules in DEFERRED_MODULES belong to a single page or to the agent stack
+and must not be imported on that path at all.
+
+Usage:
+    python benchmarks/importTime.py [--top 15] [--budget-ms 1500]
+
+Exits non-zero when the budget is exceeded or a deferred module leaks in.
+"""
+import os
+import re
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOGIN_PAGE_BUDGET_MS = 1500
+
+# streamlit itself imports plotly.graph_objects, so only plotly.express
+# (used by the dashboard) is deferred from the plotly family.
+DEFERRED_MODULES = (
+    "cv2",
+    "plotly.express",
+    "pandas",
+    "langchain",
+    "langchain_community",
+    "langchain_google_genai",
+    "qdrant_client",
+    "agno",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def profile_imports(target="main"):
+    """
+    Run `import <target>` under -X importtime and return parsed entries.
+
+    Importing main.py runs init_db() on ./property_manager.db, so it runs in
+    a scratch directory on a copy of the database instead of migrating the
+    repository's one.
+    """
+    workdir = tempfile.mkdtemp(prefix="import_time_")
+    try:
+        db_path = os.path.join(ROOT, "property_manager.db")
+        if os.path.exists(db_path):
+            shutil.copy(db_path, workdir)
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=workdir,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")]))},
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    if proc.returncode != 0 and not entries:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    return entries
+
+
+def summarize(entries, top):
+    top_level = [e for e in entries if e["depth"] == 0]
+    total_ms = sum(e["cumulative_us"] for e in top_level) / 1000
+
+    by_package = defaultdict(int)
+    for e in entries:
+        by_package[e["module"].split(".")[0]] += e["self_us"]
+
+    print(f"Total import time for main.py: {total_ms:.1f} ms ({len(entries)} modules)\n")
+    print(f"Top {top} packages by self time:")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {package:<32}{self_us / 1000:>10.1f} ms")
+
+    print(f"\nTop {top} top-level imports by cumulative time:")
+    for e in sorted(top_level, key=lambda e: e["cumulative_us"], reverse=True)[:top]:
+        print(f"  {e['module']:<32}{e['cumulative_us'] / 1000:>10.1f} ms")
+
+    loaded = {e["module"] for e in entries}
+    leaked = [
+        m for m in DEFERRED_MODULES
+        if any(name == m or name.startswith(m + ".") for name in loaded)
+    ]
+    return total_ms, leaked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=LOGIN_PAGE_BUDGET_MS)
+    args = parser.parse_args()
+
+    total_ms, leaked = summarize(profile_imports(), args.top)
+
+    failed = False
+    print()
+    if total_ms > args.budget_ms:
+        print(f"❌ Time-to-login-page imports {total_ms:.1f} ms exceed budget of {args.budget_ms:.0f} ms")
+        failed = True
+    else:
+        print(f"✅ Time-to-login-page imports {total_ms:.1f} ms within budget of {args.budget_ms:.0f} ms")
+    if leaked:
+        print(f"❌ Deferred modules imported on the login path: {', '.join(leaked)}")
+        failed = True
+    sys.exit(1 if failed else 0)
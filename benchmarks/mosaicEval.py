@@ -0,0 +1,174 @@
+"""
+Packed (mosaic) vs unpacked vision inputs: accuracy, images, tokens, latency.
+
+Runs ImageAnalysisAgent.analyze_images and VideoAnalysisAgent.analyze_videos
+over every listing twice, once with VISION_PACKING off and once on, and
+reports per mode the images sent, estimated image tokens, Gemini input
+tokens, wall time per listing and, against labels.json, room and appliance
+precision / recall / F1 plus the mean absolute error of appliance counts.
+
+A dataset is a folder of listings laid out like the upload folders:
+
+    DATASET/<listing>/images/*.jpg
+    DATASET/<listing>/videos/*.mp4          (optional)
+    DATASET/<listing>/labels.json           {"rooms": [...], "appliances": {"fridge": 1}}
+
+Accuracy needs a labeled dataset and google_api_key. With --fake (or without
+--dataset, which generates synthetic listings) every call is answered by
+FakeGeminiModel, so only the image, token and overhead columns are meaningful.
+
+Usage:
+    python benchmarks/mosaicEval.py --dataset DIR [--grid 3] [--cell 384]
+    python benchmarks/mosaicEval.py --fake [--properties 5] [--llm-latency 0.5]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+
+def listings(dataset):
+    for name in sorted(os.listdir(dataset)):
+        path = os.path.join(dataset, name)
+        if os.path.isdir(os.path.join(path, "images")) or os.path.isdir(os.path.join(path, "videos")):
+            yield path
+
+
+def load_labels(path):
+    labels_path = os.path.join(path, "labels.json")
+    if not os.path.exists(labels_path):
+        return None
+    with open(labels_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def score(predicted, expected):
+    """(true positives, predicted, expected) counts of two name sets"""
+    return len(predicted & expected), len(predicted), len(expected)
+
+
+def f1_row(totals):
+    tp, predicted, expected = totals
+    precision = tp / predicted if predicted else 0.0
+    recall = tp / expected if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def evaluate(mode_packing, paths, image_agent, video_agent, span_attrs):
+    """Analyze every listing in one packing mode and return the mode's totals"""
+    import agents.imageAgent as image_module
+    from components.utils.profileUtil import normalize_name, normalize_appliance
+    from components.utils.traceUtil import span
+
+    image_module.VISION_PACKING = mode_packing
+    totals = {"rooms": [0, 0, 0], "appliances": [0, 0, 0], "count_errors": [], "seconds": [],
+              "images_sent": 0, "image_tokens": 0, "input_tokens": 0, "labeled": 0}
+    for path in paths:
+        start = time.perf_counter()
+        analyses = []
+        with span("mosaic_eval", listing=os.path.basename(path)):
+            if os.path.isdir(os.path.join(path, "images")):
+                analyses.append(image_agent.analyze_images(os.path.join(path, "images")))
+            videos_dir = os.path.join(path, "videos")
+            if os.path.isdir(videos_dir) and os.listdir(videos_dir):
+                videos = sorted(os.path.join(videos_dir, v) for v in os.listdir(videos_dir))
+                analyses.append(video_agent.analyze_videos(videos))
+        totals["seconds"].append(time.perf_counter() - start)
+
+        labels = load_labels(path)
+        if labels is None:
+            continue
+        totals["labeled"] += 1
+        rooms = {normalize_name(r) for a in analyses for r in a.get("rooms", [])}
+        appliances = {}
+        for a in analyses:
+            for name, count in a.get("appliances", {}).items():
+                key = normalize_appliance(name)
+                appliances[key] = max(appliances.get(key, 0), count)
+        expected_appliances = {normalize_appliance(k): v for k, v in dict(labels.get("appliances", {})).items()}
+        for key, value in zip(("rooms", "appliances"), (
+            score(rooms, {normalize_name(r) for r in labels.get("rooms", [])}),
+            score(set(appliances), set(expected_appliances)),
+        )):
+            totals[key] = [t + v for t, v in zip(totals[key], value)]
+        totals["count_errors"] += [abs(appliances[k] - expected_appliances[k]) for k in appliances if k in expected_appliances]
+
+    for attrs in span_attrs():
+        totals["images_sent"] += attrs.get("images_sent", 0)
+        totals["image_tokens"] += attrs.get("image_tokens", 0)
+        totals["input_tokens"] += attrs.get("input_tokens", 0)
+    return totals
+
+
+def main(args):
+    trace_file = os.path.join(tempfile.mkdtemp(prefix="mosaic_eval_"), "traces.jsonl")
+    os.environ["TRACE_FILE"] = trace_file
+    os.environ["TRACING_ENABLED"] = "true"
+    import agents.imageAgent as image_module
+    from agents.imageAgent import ImageAnalysisAgent
+    from agents.videoAgent import VideoAnalysisAgent
+    from components.utils.traceUtil import load_spans
+
+    image_module.MOSAIC_GRID, image_module.MOSAIC_CELL = args.grid, args.cell
+    workdir = None
+    fake = args.fake or not args.dataset
+    if args.dataset:
+        paths = list(listings(args.dataset))
+    else:
+        from benchmarks.offlineBench import build_properties
+        workdir = tempfile.mkdtemp(prefix="mosaic_eval_data_")
+        paths = [path for path, _ in build_properties(workdir, args.properties, with_video=True)]
+
+    image_agent, video_agent = ImageAnalysisAgent(), VideoAnalysisAgent()
+    if fake:
+        from benchmarks.fakes import FakeGeminiModel, CANNED_IMAGE_ANALYSIS, CANNED_VIDEO_ANALYSIS
+        image_agent.agent.model = FakeGeminiModel(latency=args.llm_latency, reply=json.dumps(CANNED_IMAGE_ANALYSIS))
+        video_agent.agent.model = FakeGeminiModel(latency=args.llm_latency, reply=json.dumps(CANNED_VIDEO_ANALYSIS))
+
+    def span_attrs():
+        """Attributes of the analyze/agent spans written since the last call"""
+        spans = load_spans(trace_file, limit=1_000_000)
+        open(trace_file, "w").close()
+        return [s.get("attrs") or {} for s in spans
+                if s["name"] in ("analyze_images", "analyze_video") or s["name"].startswith("agent.")]
+
+    results = {}
+    for mode, packing in (("unpacked", False), ("packed", True)):
+        results[mode] = evaluate(packing, paths, image_agent, video_agent, span_attrs)
+
+    if workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\n{len(paths)} listings, mosaic grid {args.grid}x{args.grid} of {args.cell}px tiles"
+          + (" (fake model: accuracy columns not meaningful)" if fake else ""))
+    print(f"{'mode':<10}{'images':>8}{'img tokens':>12}{'input tokens':>14}{'s/listing':>11}"
+          f"{'room P/R/F1':>18}{'appl. P/R/F1':>18}{'count MAE':>11}")
+    for mode, totals in results.items():
+        seconds = sum(totals["seconds"]) / max(1, len(totals["seconds"]))
+        if totals["labeled"]:
+            room = "/".join(f"{v:.2f}" for v in f1_row(totals["rooms"]))
+            appliance = "/".join(f"{v:.2f}" for v in f1_row(totals["appliances"]))
+            errors = totals["count_errors"]
+            mae = f"{sum(errors) / len(errors):.2f}" if errors else "-"
+        else:
+            room = appliance = mae = "n/a"
+        print(f"{mode:<10}{totals['images_sent']:>8}{totals['image_tokens']:>12}{totals['input_tokens']:>14}"
+              f"{seconds:>11.2f}{room:>18}{appliance:>18}{mae:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=None, help="folder of labeled listings (default: synthetic, fake model)")
+    parser.add_argument("--fake", action="store_true", help="answer every call with FakeGeminiModel")
+    parser.add_argument("--properties", type=int, default=5, help="synthetic listings when --dataset is not given")
+    parser.add_argument("--grid", type=int, default=3)
+    parser.add_argument("--cell", type=int, default=384)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    main(parser.parse_args())
@@ -0,0 +1,208 @@
+"""
+Offline ingestion / indexing / search benchmark.
+
+Runs the real MainAnalysisAgent.analyze_property, QdrantVectorStoreClient
+.add_documents and PropertySearchAgent.search with no network access:
+  * every agno Agent uses benchmarks.fakes.FakeGeminiModel (--llm-latency)
+  * embeddings come from benchmarks.fakes.HashEmbeddings (--embed-latency)
+  * Qdrant runs in qdrant-client local mode (":memory:" or --qdrant-path)
+
+For each stage it reports throughput, p50/p99 latency and peak traced
+Python memory. --out appends one JSON line per run (with the git revision)
+so results can be compared across commits.
+
+Usage:
+    python benchmarks/offlineBench.py [--properties 200] [--queries 100]
+        [--concurrency 8] [--llm-latency 0.0] [--embed-latency 0.0]
+        [--with-video] [--qdrant-path DIR] [--out bench.jsonl]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+ROOM_TYPES = ["living room", "kitchen", "bedroom", "bathroom", "study", "balcony"]
+FEATURES = ["balcony", "lift", "parking", "gym", "swimming pool", "air conditioning",
+            "power backup", "wifi", "furnished", "newly renovated", "pet friendly", "security"]
+LOCALITIES = ["Hitech City", "Gachibowli", "Madhapur", "Kondapur", "Banjara Hills", "Kukatpally"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def synthetic_description(rng, i):
+    features = rng.sample(FEATURES, 4)
+    return (
+        f"{rng.choice([1, 2, 3])}BHK apartment #{i} in {rng.choice(LOCALITIES)}, "
+        f"{rng.randint(600, 2000)} sqft, rent {rng.randint(10, 60)}k. "
+        f"Has {', '.join(features)}. Rooms: {', '.join(rng.sample(ROOM_TYPES, 3))}."
+    )
+
+
+def make_sample_video(path, seconds=4, fps=15):
+    import cv2
+    import numpy as np
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (320, 240))
+    for f in range(seconds * fps):
+        frame = np.full((240, 320, 3), (f * 4) % 255, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+
+def build_properties(workdir, n, with_video, seed=7):
+    """Write n property folders (images/, text/, optional videos/) and return (path, description) pairs"""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    sample_image = os.path.join(workdir, "sample.jpg")
+    Image.new("RGB", (640, 480), (180, 160, 140)).save(sample_image, "JPEG")
+    sample_video = None
+    if with_video:
+        sample_video = os.path.join(workdir, "sample.mp4")
+        make_sample_video(sample_video)
+
+    properties = []
+    for i in range(n):
+        prop_dir = os.path.join(workdir, f"prop_{i:05d}")
+        for sub in ("images", "text") + (("videos",) if with_video else ()):
+            os.makedirs(os.path.join(prop_dir, sub), exist_ok=True)
+        for j in range(3):
+            shutil.copy(sample_image, os.path.join(prop_dir, "images", f"img_{j}.jpg"))
+        if sample_video:
+            shutil.copy(sample_video, os.path.join(prop_dir, "videos", "walkthrough.mp4"))
+        description = synthetic_description(rng, i)
+        with open(os.path.join(prop_dir, "text", "description.txt"), "w", encoding="utf-8") as f:
+            f.write(description)
+        properties.append((prop_dir, description))
+    return properties
+
+
+def run_stage(name, fn, inputs, concurrency):
+    """Call fn on every input with a thread pool, timing each call and the whole stage"""
+    latencies = []
+
+    def timed(arg):
+        start = time.perf_counter()
+        result = fn(arg)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, inputs))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return results, {
+        "stage": name,
+        "count": len(inputs),
+        "throughput_per_s": len(inputs) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_traced_mb": peak / (1024 * 1024),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(args):
+    from agents.mainAgent import MainAnalysisAgent
+    from agents.searchAgent import PropertySearchAgent
+    from models.vectorStore import QdrantVectorStoreClient
+    from benchmarks.fakes import HashEmbeddings, install_fake_models
+
+    workdir = tempfile.mkdtemp(prefix="demonseller_bench_")
+    try:
+        properties = build_properties(workdir, args.properties, args.with_video)
+
+        main_agent = MainAnalysisAgent()
+        vector_store = QdrantVectorStoreClient(
+            url=None, api_key=None, collection="bench", google_api_key=None,
+            location=args.qdrant_path or ":memory:",
+            embeddings=HashEmbeddings(latency=args.embed_latency),
+        )
+        search_agent = PropertySearchAgent(vector_store)
+        install_fake_models(main_agent, search_agent, latency=args.llm_latency)
+
+        stats = []
+        profiles, s = run_stage(
+            "analyze_property", lambda p: main_agent.analyze_property(p[0]), properties, args.concurrency
+        )
+        stats.append(s)
+
+        documents = [
+            {"id": f"prop-{i:05d}", "property_id": f"prop-{i:05d}", "text_description": profile, "description": desc}
+            for i, ((_, desc), profile) in enumerate(zip(properties, profiles))
+        ]
+        # qdrant-client's local mode is not safe for concurrent upserts, so
+        # documents are indexed one at a time (as registration does)
+        _, s = run_stage("add_documents", lambda d: vector_store.add_documents([d]), documents, 1)
+        stats.append(s)
+
+        rng = random.Random(11)
+        queries = [
+            f"{rng.choice([1, 2, 3])}BHK in {rng.choice(LOCALITIES)} with {rng.choice(FEATURES)} and {rng.choice(FEATURES)}"
+            for _ in range(args.queries)
+        ]
+        _, s = run_stage("search", lambda q: search_agent.search(q, k=args.k), queries, args.concurrency)
+        stats.append(s)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "config": vars(args),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024),
+        "stages": stats,
+    }
+    return run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per fake Gemini call")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="seconds per fake embedding call")
+    parser.add_argument("--with-video", action="store_true", help="add a short walkthrough video per property")
+    parser.add_argument("--qdrant-path", help="on-disk local Qdrant directory instead of :memory:")
+    parser.add_argument("--out", help="append the run as one JSON line to this file")
+    args = parser.parse_args()
+
+    run = main(args)
+    print(f"{'stage':<20}{'count':>8}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for s in run["stages"]:
+        print(f"{s['stage']:<20}{s['count']:>8}{s['throughput_per_s']:>10.1f}{s['p50_ms']:>10.1f}"
+              f"{s['p99_ms']:>10.1f}{s['peak_traced_mb']:>10.1f}")
+    print(f"peak RSS: {run['peak_rss_mb']:.1f} MB")
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
@@ -0,0 +1,95 @@
+"""
+Smoke check of the rules-based profile builder (components/utils/profileUtil.py).
+
+Runs normalize_appliance over the plural, abbreviation and synonym spellings
+Gemini tends to return and format_rent over price texts that mention other
+numbers (deposits, BHK, areas), builds a profile from a merged analysis that
+names the same appliances several ways, and checks that they collapse to one
+canonical name each, and that fields with no facts are left empty rather
+than filled with placeholder text. Prints the average build_profile time.
+
+Usage:
+    python benchmarks/profileSmoke.py [--runs 1000]
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APPLIANCE_CASES = {
+    "ACs": "air conditioner",
+    "acs": "air conditioner",
+    "Split ACs": "air conditioner",
+    "A/C": "air conditioner",
+    "TVs": "tv",
+    "tvs": "tv",
+    "LED TVs": "tv",
+    "Refrigerators": "fridge",
+    "water heaters": "geyser",
+    "washers": "washing machine",
+    "boxes": "box",
+    "switches": "switch",
+    "glasses": "glass",
+    "stoves": "stove",
+    "ceiling fans": "ceiling fan",
+    "chimneys": "chimney",
+    "gas": "gas",
+}
+
+RENT_CASES = {
+    "₹25,000 per month": "₹25,000 per month",
+    "Rs. 18,500 pm": "₹18,500 per month",
+    "3 months deposit, rent 20000": "₹20,000 per month",
+    "1 BHK, 18k": "₹18,000 per month",
+    "1200 sqft, 22000 monthly": "₹22,000 per month",
+    "deposit ₹1,00,000; rent ₹25,000": "₹25,000 per month",
+    "1.2 lakh": "₹1.20 Lakh per month",
+    "₹20,000 - ₹25,000": "₹20,000 - ₹25,000",
+    "negotiable": "negotiable",
+}
+
+MERGED = {
+    "Property details": {"type": "apartment", "size": "2 BHK", "location": "Gachibowli", "price": "25k"},
+    "rooms": ["Living_Room", "bedroom", "kitchen"],
+    "appliances": {"ACs": 2, "air conditioner": 3, "TVs": 1, "Television": 1, "Refrigerators": 1},
+    "features": ["balcony", "parking"],
+}
+
+
+def main(args):
+    from components.utils.profileUtil import normalize_appliance, format_rent, build_profile
+
+    wrong = {}
+    for normalize, cases in ((normalize_appliance, APPLIANCE_CASES), (format_rent, RENT_CASES)):
+        wrong.update({value: (normalize(value), expected) for value, expected in cases.items()
+                      if normalize(value) != expected})
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        profile = build_profile(MERGED)
+    elapsed = time.perf_counter() - start
+    sparse = build_profile({"Property details": {"type": "apartment"}})
+
+    checks = {
+        "appliance spellings normalized": not any(value in APPLIANCE_CASES for value in wrong),
+        "rent read from the right amount": not any(value in RENT_CASES for value in wrong),
+        "merged appliances collapse to one name each":
+            profile["appliances"] == {"air conditioner": 3, "fridge": 1, "tv": 1},
+        "missing fields left empty": all(not sparse[key] for key in (
+            "property_location", "layout_and_condition", "location_insights", "rules_and_restrictions",
+            "contact_info", "additional_info", "rent")),
+    }
+    print(f"build_profile: {elapsed / args.runs * 1e6:.0f} µs per profile over {args.runs} runs")
+    for value, (got, expected) in wrong.items():
+        print(f"   {value!r} -> {got!r}, expected {expected!r}")
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000)
+    main(parser.parse_args())
@@ -0,0 +1,188 @@
+"""
+Memory / latency / recall trade-off of vector quantization.
+
+Generates clustered, normalised 768-d vectors (embedding-like: listings of
+the same kind sit close together) and compares the collection settings of
+models/collectionConfig.py:
+  none              float32 vectors in RAM
+  scalar            int8 copy in RAM, rescored with the originals on disk
+  binary xN         1-bit copy in RAM, N-times oversampled and rescored
+Recall@k is measured against exact float32 search; RAM is the estimated
+resident size of the vectors plus the HNSW graph (m links per node).
+
+With --url the collections are created on that Qdrant server (HNSW +
+quantization as in production; latency includes the HTTP round-trip).
+Without it the quantized search is simulated by NumPy brute force, which
+shows the recall and memory side only; those latencies are not HNSW's.
+(The embedded local mode of qdrant-client ignores quantization, so it
+cannot be used here.)
+
+Usage:
+    python benchmarks/quantizationBench.py [--points 100000] [--queries 200] [--k 10]
+        [--url http://localhost:6333 --api-key KEY] [--hnsw-m 16] [--search-ef 128]
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DIM = 768
+CONFIGS = [
+    ("none", None, False),
+    ("scalar", 1.0, False),
+    ("scalar", 2.0, True),
+    ("binary", 1.0, True),
+    ("binary", 2.0, True),
+    ("binary", 4.0, True),
+    ("binary", 8.0, True),
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_vectors(rng, n, clusters=500, spread=0.7):
+    centers = rng.standard_normal((clusters, DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + spread * rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(rng, vectors, count, noise=0.5):
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + noise * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(DIM)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def ram_mb(n, quantization, on_disk, hnsw_m):
+    """Estimated resident size: vectors kept in RAM plus the HNSW links (2m per node on layer 0)"""
+    originals = 0 if on_disk else n * DIM * 4
+    quantized = {"none": 0, "scalar": n * DIM, "binary": n * DIM // 8}[quantization]
+    graph = n * hnsw_m * 2 * 4
+    return (originals + quantized + graph) / (1024 * 1024)
+
+
+def recall(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def simulate(vectors, queries, k, quantization, oversampling, rescore):
+    """Brute-force search on the quantized vectors, optionally rescoring the oversampled top hits"""
+    if quantization == "scalar":
+        lo, hi = np.quantile(vectors, [0.005, 0.995])
+        scale = (hi - lo) / 255
+        codes = np.clip(np.round((vectors - lo) / scale), 0, 255).astype(np.uint8)
+        dequantized = codes.astype(np.float32) * scale + lo
+        approx = lambda q: dequantized @ q
+    elif quantization == "binary":
+        bits = vectors > 0
+        approx = lambda q: (bits == (q > 0)).sum(axis=1).astype(np.float32)
+    else:
+        approx = lambda q: vectors @ q
+
+    limit = int(k * (oversampling or 1))
+    found, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        scores = approx(q)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        if rescore:
+            top = top[np.argsort(-(vectors[top] @ q))]
+        else:
+            top = top[np.argsort(-scores[top])]
+        found.append(top[:k].tolist())
+        latencies.append((time.perf_counter() - start) * 1000)
+    return found, latencies
+
+
+def run_offline(args, vectors, queries, truth):
+    results = []
+    for quantization, oversampling, rescore in CONFIGS:
+        found, latencies = simulate(vectors, queries, args.k, quantization, oversampling, rescore)
+        results.append(result_row(args, quantization, oversampling, rescore, found, truth, latencies))
+    return results
+
+
+def run_server(args, vectors, queries, truth):
+    from qdrant_client import QdrantClient
+    from qdrant_client.http.models import PointStruct
+    from models.collectionConfig import collection_settings, search_settings
+
+    client = QdrantClient(url=args.url, api_key=args.api_key, timeout=120)
+    results = []
+    for quantization in ("none", "scalar", "binary"):
+        name = f"quantization_bench_{quantization}"
+        if client.collection_exists(name):
+            client.delete_collection(name)
+        client.create_collection(name, **collection_settings(
+            quantization, on_disk=quantization != "none", hnsw_m=args.hnsw_m, hnsw_ef_construct=args.hnsw_ef_construct,
+        ))
+        for start in range(0, len(vectors), 1000):
+            batch = vectors[start:start + 1000]
+            client.upsert(name, [PointStruct(id=start + i, vector=v.tolist()) for i, v in enumerate(batch)], wait=True)
+        while client.get_collection(name).status != "green":
+            time.sleep(1)
+
+        for q_mode, oversampling, rescore in CONFIGS:
+            if q_mode != quantization:
+                continue
+            params = search_settings(args.search_ef, oversampling if quantization != "none" else None,
+                                     rescore if quantization != "none" else None)
+            found, latencies = [], []
+            for q in queries:
+                start = time.perf_counter()
+                points = client.query_points(name, query=q.tolist(), limit=args.k, search_params=params).points
+                latencies.append((time.perf_counter() - start) * 1000)
+                found.append([p.id for p in points])
+            results.append(result_row(args, quantization, oversampling, rescore, found, truth, latencies))
+        client.delete_collection(name)
+    return results
+
+
+def result_row(args, quantization, oversampling, rescore, found, truth, latencies):
+    return {
+        "quantization": quantization,
+        "oversampling": oversampling,
+        "rescore": rescore,
+        "recall": recall(found, truth),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "ram_mb": ram_mb(args.points, quantization, quantization != "none", args.hnsw_m),
+    }
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    vectors = make_vectors(rng, args.points)
+    queries = make_queries(rng, vectors, args.queries)
+    truth = [np.argsort(-(vectors @ q))[:args.k].tolist() for q in queries]
+    if args.url:
+        return run_server(args, vectors, queries, truth)
+    return run_offline(args, vectors, queries, truth)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--url", default=None, help="Qdrant server to benchmark on (default: NumPy simulation)")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--hnsw-ef-construct", type=int, default=100)
+    parser.add_argument("--search-ef", type=int, default=128)
+    args = parser.parse_args()
+
+    results = main(args)
+    print(f"{'mode':<16}{'rescore':>8}{f'recall@{args.k}':>11}{'p50 ms':>9}{'p95 ms':>9}{'RAM MB':>9}")
+    for r in results:
+        label = r["quantization"] + (f" x{r['oversampling']:g}" if r["oversampling"] else "")
+        print(f"{label:<16}{str(r['rescore']):>8}{r['recall']:>11.3f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+              f"{r['ram_mb']:>9.1f}")
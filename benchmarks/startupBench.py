@@ -0,0 +1,78 @@
+"""
+Startup-time benchmark for the Streamlit entry point.
+
+Measures, in one process:
+  * cold first paint  - first run of main.py in a fresh process (imports + init)
+  * new session       - first run of a new session once the process is warm
+  * warm rerun        - rerun of an existing session
+
+With --resources it also times building the cached agents / vector store
+(needs the usual .env: url, api_key, collection, google_api_key) against
+fetching them again from the process-wide cache.
+
+Usage:
+    python benchmarks/startupBench.py [--runs 5] [--resources]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_pages(runs):
+    from streamlit.testing.v1 import AppTest
+
+    script = os.path.join(ROOT, "main.py")
+    results = {"cold first paint": [], "new session": [], "warm rerun": []}
+
+    app = AppTest.from_file(script, default_timeout=120)
+    results["cold first paint"].append(_timed(app.run))
+    for _ in range(runs):
+        results["warm rerun"].append(_timed(app.run))
+    for _ in range(runs):
+        session = AppTest.from_file(script, default_timeout=120)
+        results["new session"].append(_timed(session.run))
+    return results
+
+
+def bench_resources(runs):
+    import dotenv
+    dotenv.load_dotenv(os.path.join(ROOT, ".env"))
+    from components.utils.cachedResources import get_main_agent, get_vector_store, get_search_agent
+
+    results = {}
+    for name, getter in [("main agent", get_main_agent),
+                         ("vector store", get_vector_store),
+                         ("search agent", get_search_agent)]:
+        results[f"{name} (build)"] = [_timed(getter)]
+        results[f"{name} (cached)"] = [_timed(getter) for _ in range(runs)]
+    return results
+
+
+def report(results):
+    print(f"{'stage':<28}{'median ms':>12}{'min ms':>12}{'max ms':>12}")
+    for name, samples in results.items():
+        print(f"{name:<28}{statistics.median(samples):>12.1f}{min(samples):>12.1f}{max(samples):>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--resources", action="store_true", help="also time cached agent / vector store construction")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    results = bench_pages(args.runs)
+    if args.resources:
+        results.update(bench_resources(args.runs))
+    report(results)
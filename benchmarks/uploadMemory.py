@@ -0,0 +1,96 @@
+"""
+Peak-RSS check for streaming uploads to POST /jobs.
+
+Each size runs in a fresh subprocess that posts one video of that size
+through the ASGI app (the client streams the file from disk) and reports
+how much its peak RSS grew during the request. With chunked spooling the
+growth should stay flat as the file size increases.
+
+Usage:
+    python benchmarks/uploadMemory.py [--sizes-mb 10 100 500]
+"""
+import os
+import sys
+import json
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / (1024 * 1024)
+
+
+def measure_one(size_mb):
+    import asyncio
+    import httpx
+    import app as api
+    from components.database.dbmanager import init_db
+    from components.database.dbman import DB_NAME
+    from benchmarks.apiLoadTest import build_stand_ins
+
+    init_db(DB_NAME)
+    main_agent, vector_store, search_agent = build_stand_ins(0.0, 0.0)
+    api.app.dependency_overrides[api.get_main_agent] = lambda: main_agent
+    api.app.dependency_overrides[api.get_vector_store] = lambda: vector_store  # duplicate check
+    os.environ["MAX_VIDEO_BYTES"] = str((size_mb + 1) * 1024 * 1024)
+    api.MAX_VIDEO_BYTES = (size_mb + 1) * 1024 * 1024
+
+    video_path = os.path.join(os.getcwd(), "walkthrough.mp4")
+    with open(video_path, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            f.write(block)
+
+    async def post():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=600) as client:
+            with open(video_path, "rb") as video:
+                return await client.post(
+                    "/jobs",
+                    data={"description": "memory check"},
+                    files=[("videos", ("walkthrough.mp4", video, "video/mp4"))],
+                )
+
+    before = _peak_rss_mb()
+    response = asyncio.run(post())
+    after = _peak_rss_mb()
+    return {"size_mb": size_mb, "status": response.status_code, "peak_rss_growth_mb": after - before}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        workdir = tempfile.mkdtemp(prefix="demonseller_upload_")
+        os.environ["INGEST_DIR"] = os.path.join(workdir, "jobs")
+        os.chdir(workdir)
+        result = measure_one(args.child)
+        with open(args.result_file, "w") as f:
+            json.dump(result, f)
+        sys.exit(0)
+
+    print(f"{'upload MB':>10}{'status':>8}{'peak RSS growth MB':>22}")
+    for size in args.sizes_mb:
+        result_file = tempfile.mktemp(suffix=".json")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(size), "--result-file", result_file],
+            capture_output=True, text=True, cwd=ROOT,
+        )
+        if proc.returncode != 0 or not os.path.exists(result_file):
+            print(f"{size:>10}  failed:\n{proc.stderr[-2000:]}")
+            continue
+        with open(result_file) as f:
+            r = json.load(f)
+        os.remove(result_file)
+        print(f"{r['size_mb']:>10}{r['status']:>8}{r['peak_rss_growth_mb']:>22.1f}")
@@ -1,4 +1,6 @@
 import sqlite3
+import time
+from components.utils.metricsUtil import SQLITE_QUERY_SECONDS
 # Database Manager
 
 DB_NAME = "property_manager.db"
@@ -8,12 +10,23 @@ class DatabaseManager:
         self.conn.row_factory = sqlite3.Row
     
     def execute_query(self, query, params=None):
+        start = time.perf_counter()
         cursor = self.conn.cursor()
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
         self.conn.commit()
+        SQLITE_QUERY_SECONDS.labels(query.lstrip().split(None, 1)[0].upper()).observe(time.perf_counter() - start)
+        return cursor
+    
+    def execute_many(self, query, rows):
+        """Run one statement for every row of params in a single transaction"""
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        cursor.executemany(query, rows)
+        self.conn.commit()
+        SQLITE_QUERY_SECONDS.labels(query.lstrip().split(None, 1)[0].upper()).observe(time.perf_counter() - start)
         return cursor
     
     def fetch_one(self, query, params=None):
@@ -6,6 +6,42 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from components.utils.auth import hash_password
 
 DB_NAME = "property_manager.db"
+
+
+def _add_missing_columns(cursor, table, columns):
+    """ALTER TABLE ... ADD COLUMN for each of `columns` ({name: type}) the table does not have yet"""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
+def _allow_anonymous_searches(cursor):
+    """
+    Rebuild search_history without NOT NULL on user_id, so anonymous API
+    searches are stored with a NULL user (rows logged as user 0 become NULL)
+    """
+    user_id = next(row for row in cursor.execute("PRAGMA table_info(search_history)") if row[1] == "user_id")
+    if not user_id[3]:
+        return
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(search_history)")]
+    copied = ", ".join("NULLIF(user_id, 0)" if name == "user_id" else name for name in columns)
+    cursor.execute("ALTER TABLE search_history RENAME TO search_history_old")
+    cursor.execute('''
+    CREATE TABLE search_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        query TEXT NOT NULL,
+        results_count INTEGER NOT NULL,
+        searched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        k INTEGER, retrieve_ms REAL, rerank_ms REAL, total_ms REAL, result_ids TEXT, source TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''')
+    cursor.execute(f"INSERT INTO search_history ({', '.join(columns)}) SELECT {copied} FROM search_history_old")
+    cursor.execute("DROP TABLE search_history_old")
+
+
 def init_db(DB_NAME):
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
@@ -23,6 +59,18 @@ def init_db(DB_NAME):
     )
     ''')
     
+    # Login sessions (token in the page URL); see auth.py
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sessions (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+    
     # Properties table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS properties (
@@ -35,6 +83,8 @@ def init_db(DB_NAME):
         FOREIGN KEY (created_by) REFERENCES users(id)
     )
     ''')
+    # Hash of what was last written to the vector store (see reindexUtil.py)
+    _add_missing_columns(cursor, "properties", {"index_hash": "TEXT", "indexed_at": "TIMESTAMP"})
     
     # Property Images table
     cursor.execute('''
@@ -48,6 +98,10 @@ def init_db(DB_NAME):
     )
     ''')
     
+    # Smaller renditions for result cards and emails (see thumbnailUtil.py);
+    # image_data holds the full variant
+    _add_missing_columns(cursor, "property_images", {"card_data": "BLOB", "thumb_data": "BLOB"})
+    
     # Property Videos table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS property_videos (
@@ -60,11 +114,27 @@ def init_db(DB_NAME):
     )
     ''')
     
+    # Perceptual hashes of registered images, split into 8-bit bands for
+    # Hamming-distance lookup (see dedupeUtil.py)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS image_hashes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        property_id TEXT NOT NULL,
+        image_name TEXT NOT NULL,
+        dhash TEXT NOT NULL,
+        band0 INTEGER NOT NULL, band1 INTEGER NOT NULL, band2 INTEGER NOT NULL, band3 INTEGER NOT NULL,
+        band4 INTEGER NOT NULL, band5 INTEGER NOT NULL, band6 INTEGER NOT NULL, band7 INTEGER NOT NULL,
+        FOREIGN KEY (property_id) REFERENCES properties(property_id)
+    )
+    ''')
+    for band in range(8):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_image_hashes_band{band} ON image_hashes (band{band})")
+    
     # Search History table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS search_history (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
+        user_id INTEGER,
         query TEXT NOT NULL,
         results_count INTEGER NOT NULL,
         searched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -72,6 +142,57 @@ def init_db(DB_NAME):
     )
     ''')
     
+    # Written in batches by components/utils/searchLogUtil.py
+    _add_missing_columns(cursor, "search_history", {
+        "k": "INTEGER", "retrieve_ms": "REAL", "rerank_ms": "REAL", "total_ms": "REAL",
+        "result_ids": "TEXT", "source": "TEXT",
+    })
+    _allow_anonymous_searches(cursor)
+    
+    # Ingestion Jobs table (background property analysis)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ingestion_jobs (
+        job_id TEXT PRIMARY KEY,
+        property_id TEXT NOT NULL,
+        user_id INTEGER,
+        status TEXT NOT NULL,
+        stages_json TEXT NOT NULL,
+        property_dir TEXT NOT NULL,
+        description TEXT,
+        worker TEXT,
+        result_json TEXT,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_user ON ingestion_jobs (user_id, created_at)"
+    )
+    
+    # Email outbox: shares are queued here and delivered by a background sender (see emailUtil.py)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        payload_json TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        error TEXT,
+        next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_email_outbox_status ON email_outbox (status, next_attempt_at)"
+    )
+    
     # Check if demo users already exist
     cursor.execute("SELECT COUNT(*) FROM users WHERE username IN ('admin', 'agent1', 'agent2')")
     demo_users_exist = cursor.fetchone()[0] > 0
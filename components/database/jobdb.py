@@ -0,0 +1,141 @@
+import sys
+import os
+import uuid
+import socket
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.database.dbman import DatabaseManager, DB_NAME
+import json
+
+# Pipeline stages reported by MainAnalysisAgent.analyze_property, in order
+JOB_STAGES = ["images", "video", "text", "merge"]
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+REGISTERING = "registering"
+REGISTERED = "registered"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Identifies the process whose executor runs a job ("host:pid")
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Ingestion Job Functions
+def create_job(property_id, user_id, property_dir, description):
+    """Insert a queued job with every stage pending and return its job id"""
+    job_id = uuid.uuid4().hex
+    stages = {stage: "pending" for stage in JOB_STAGES}
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "INSERT INTO ingestion_jobs (job_id, property_id, user_id, status, stages_json, property_dir, description, worker) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (job_id, property_id, user_id, QUEUED, json.dumps(stages), property_dir, description, WORKER_ID)
+    )
+    db.close()
+    return job_id
+
+def update_job_stage(job_id, stage, stage_status):
+    """Record the status of one pipeline stage (pending/running/done/skipped/failed)"""
+    db = DatabaseManager(DB_NAME)
+    # One statement, so stages reporting concurrently cannot overwrite each other
+    db.execute_query(
+        "UPDATE ingestion_jobs SET stages_json = json_set(stages_json, '$.' || ?, ?), "
+        "updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+        (stage, stage_status, job_id)
+    )
+    db.close()
+
+def set_job_status(job_id, status, result=None, error=None):
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "UPDATE ingestion_jobs SET status = ?, result_json = COALESCE(?, result_json), error = ?, "
+        "updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+        (status, json.dumps(result) if result is not None else None, error, job_id)
+    )
+    db.close()
+
+def claim_job_for_registration(job_id):
+    """Move a completed job to registering; False if it is not completed (e.g. another caller claimed it)"""
+    db = DatabaseManager(DB_NAME)
+    cursor = db.execute_query(
+        "UPDATE ingestion_jobs SET status = ?, worker = ?, updated_at = CURRENT_TIMESTAMP "
+        "WHERE job_id = ? AND status = ?",
+        (REGISTERING, WORKER_ID, job_id, COMPLETED)
+    )
+    claimed = cursor.rowcount == 1
+    db.close()
+    return claimed
+
+def _job_to_dict(row):
+    job = dict(row)
+    job['stages'] = json.loads(job.pop('stages_json'))
+    job['result'] = json.loads(job.pop('result_json')) if job.get('result_json') else None
+    return job
+
+def get_job(job_id):
+    db = DatabaseManager(DB_NAME)
+    row = db.fetch_one("SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,))
+    db.close()
+    return _job_to_dict(row) if row else None
+
+def get_user_jobs(user_id, statuses=None, limit=20):
+    """Most recent jobs of a user, optionally restricted to some statuses"""
+    query = "SELECT * FROM ingestion_jobs WHERE user_id = ?"
+    params = [user_id]
+    if statuses:
+        query += f" AND status IN ({', '.join('?' for _ in statuses)})"
+        params.extend(statuses)
+    query += " ORDER BY created_at DESC LIMIT ?"
+    params.append(limit)
+    db = DatabaseManager(DB_NAME)
+    rows = db.fetch_all(query, tuple(params))
+    db.close()
+    return [_job_to_dict(row) for row in rows]
+
+def count_active_jobs():
+    db = DatabaseManager(DB_NAME)
+    row = db.fetch_one(
+        f"SELECT COUNT(*) AS n FROM ingestion_jobs WHERE status IN ({', '.join('?' for _ in ACTIVE_STATUSES)})",
+        ACTIVE_STATUSES
+    )
+    db.close()
+    return row['n']
+
+def _worker_is_alive(worker):
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True  # another host's worker; not ours to judge
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def fail_interrupted_jobs():
+    """
+    Mark jobs whose worker process on this host has exited as failed, and put
+    jobs it was registering back to completed so they can be registered again
+    """
+    statuses = ACTIVE_STATUSES + (REGISTERING,)
+    db = DatabaseManager(DB_NAME)
+    rows = db.fetch_all(
+        f"SELECT job_id, status, worker FROM ingestion_jobs WHERE status IN ({', '.join('?' for _ in statuses)})",
+        statuses
+    )
+    for row in rows:
+        if _worker_is_alive(row['worker']):
+            continue
+        if row['status'] == REGISTERING:
+            db.execute_query(
+                "UPDATE ingestion_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+                (COMPLETED, row['job_id'])
+            )
+        else:
+            db.execute_query(
+                "UPDATE ingestion_jobs SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?",
+                (FAILED, "Interrupted by a server restart", row['job_id'])
+            )
+    db.close()
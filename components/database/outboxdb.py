@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.database.dbman import DatabaseManager, DB_NAME
+from components.database.jobdb import WORKER_ID, _worker_is_alive
+import json
+
+# Outbox statuses
+QUEUED = "queued"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+# Email Outbox Functions
+def enqueue_email(user_id, recipient, subject, payload):
+    """Insert a queued email and return its outbox id"""
+    db = DatabaseManager(DB_NAME)
+    cursor = db.execute_query(
+        "INSERT INTO email_outbox (user_id, recipient, subject, payload_json, status) VALUES (?, ?, ?, ?, ?)",
+        (user_id, recipient, subject, json.dumps(payload), QUEUED)
+    )
+    email_id = cursor.lastrowid
+    db.close()
+    return email_id
+
+def _email_to_dict(row):
+    email = dict(row)
+    email['payload'] = json.loads(email.pop('payload_json'))
+    return email
+
+def claim_emails(limit):
+    """Mark up to `limit` due queued emails as sending by this process and return them"""
+    db = DatabaseManager(DB_NAME)
+    rows = db.fetch_all(
+        "SELECT * FROM email_outbox WHERE status = ? AND next_attempt_at <= CURRENT_TIMESTAMP ORDER BY id LIMIT ?",
+        (QUEUED, limit)
+    )
+    claimed = []
+    for row in rows:
+        # Another process's sender may have claimed it since the SELECT
+        cursor = db.execute_query(
+            "UPDATE email_outbox SET status = ?, worker = ? WHERE id = ? AND status = ?",
+            (SENDING, WORKER_ID, row['id'], QUEUED)
+        )
+        if cursor.rowcount == 1:
+            claimed.append(_email_to_dict(row))
+    db.close()
+    return claimed
+
+def mark_email_sent(email_id):
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "UPDATE email_outbox SET status = ?, attempts = attempts + 1, error = NULL, sent_at = CURRENT_TIMESTAMP "
+        "WHERE id = ?",
+        (SENT, email_id)
+    )
+    db.close()
+
+def mark_email_failed(email_id, error, retry_in=None):
+    """Record a failed attempt; requeue it `retry_in` seconds from now, or give up when None"""
+    db = DatabaseManager(DB_NAME)
+    if retry_in is None:
+        db.execute_query(
+            "UPDATE email_outbox SET status = ?, attempts = attempts + 1, error = ? WHERE id = ?",
+            (FAILED, error, email_id)
+        )
+    else:
+        db.execute_query(
+            "UPDATE email_outbox SET status = ?, attempts = attempts + 1, error = ?, "
+            "next_attempt_at = datetime('now', ?) WHERE id = ?",
+            (QUEUED, error, f"+{int(retry_in)} seconds", email_id)
+        )
+    db.close()
+
+def requeue_interrupted_emails():
+    """Put emails left in sending by an exited process on this host back in the queue"""
+    db = DatabaseManager(DB_NAME)
+    rows = db.fetch_all("SELECT id, worker FROM email_outbox WHERE status = ?", (SENDING,))
+    for row in rows:
+        if not _worker_is_alive(row['worker']):
+            db.execute_query("UPDATE email_outbox SET status = ? WHERE id = ?", (QUEUED, row['id']))
+    db.close()
+
+def get_user_emails(user_id, limit=5):
+    """Most recent outbox entries of a user"""
+    db = DatabaseManager(DB_NAME)
+    rows = db.fetch_all(
+        "SELECT * FROM email_outbox WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+        (user_id, limit)
+    )
+    db.close()
+    return [_email_to_dict(row) for row in rows]
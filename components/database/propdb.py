@@ -14,11 +14,50 @@ def save_property_to_db(property_id, description, analysis_json, created_by):
     )
     db.close()
 
-def save_image_to_db(property_id, image_name, image_data):
+def update_property_analysis(property_id, analysis_json):
     db = DatabaseManager(DB_NAME)
     db.execute_query(
-        "INSERT INTO property_images (property_id, image_name, image_data) VALUES (?, ?, ?)",
-        (property_id, image_name, image_data)
+        "UPDATE properties SET analysis_json = ? WHERE property_id = ?",
+        (json.dumps(analysis_json), property_id)
+    )
+    db.close()
+
+def save_image_to_db(property_id, image_name, image_data, card_data=None, thumb_data=None):
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "INSERT INTO property_images (property_id, image_name, image_data, card_data, thumb_data) VALUES (?, ?, ?, ?, ?)",
+        (property_id, image_name, image_data, card_data, thumb_data)
+    )
+    db.close()
+
+# Image variant -> property_images column
+VARIANT_COLUMNS = {"full": "image_data", "card": "card_data", "thumb": "thumb_data"}
+
+def get_property_image_variants(property_id, variant="card"):
+    """A property's images as (image_name, image_data) rows of one variant, falling back to the full image"""
+    column = VARIANT_COLUMNS[variant]
+    db = DatabaseManager(DB_NAME)
+    images = db.fetch_all(
+        f"SELECT id, image_name, COALESCE({column}, image_data) AS image_data FROM property_images "
+        "WHERE property_id = ? ORDER BY id",
+        (property_id,)
+    )
+    db.close()
+    return images
+
+def get_images_without_variants():
+    db = DatabaseManager(DB_NAME)
+    images = db.fetch_all(
+        "SELECT id, property_id, image_name, image_data FROM property_images WHERE card_data IS NULL OR thumb_data IS NULL"
+    )
+    db.close()
+    return images
+
+def save_image_variants(image_id, card_data, thumb_data):
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "UPDATE property_images SET card_data = ?, thumb_data = ? WHERE id = ?",
+        (card_data, thumb_data, image_id)
     )
     db.close()
 
@@ -54,12 +93,54 @@ def get_all_properties():
     db.close()
     return properties
 
-def log_search(user_id, query, results_count):
+def get_properties_for_index():
+    db = DatabaseManager(DB_NAME)
+    properties = db.fetch_all(
+        "SELECT property_id, description, analysis_json, created_at, index_hash FROM properties ORDER BY created_at"
+    )
+    db.close()
+    return properties
+
+def set_property_index_hash(property_id, index_hash):
     db = DatabaseManager(DB_NAME)
     db.execute_query(
-        "INSERT INTO search_history (user_id, query, results_count) VALUES (?, ?, ?)",
-        (user_id, query, results_count)
+        "UPDATE properties SET index_hash = ?, indexed_at = CURRENT_TIMESTAMP WHERE property_id = ?",
+        (index_hash, property_id)
     )
     db.close()
-    
 
+def save_image_hash(property_id, image_name, dhash_hex, bands):
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "INSERT INTO image_hashes (property_id, image_name, dhash, band0, band1, band2, band3, band4, band5, band6, band7) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (property_id, image_name, dhash_hex, *bands)
+    )
+    db.close()
+
+def find_image_hash_candidates(bands):
+    """Stored image hashes sharing at least one band with `bands`"""
+    db = DatabaseManager(DB_NAME)
+    where = " OR ".join(f"band{i} = ?" for i in range(len(bands)))
+    rows = db.fetch_all(f"SELECT property_id, image_name, dhash FROM image_hashes WHERE {where}", tuple(bands))
+    db.close()
+    return rows
+
+def get_unhashed_property_images():
+    db = DatabaseManager(DB_NAME)
+    images = db.fetch_all(
+        "SELECT property_id, image_name, image_data FROM property_images pi WHERE NOT EXISTS "
+        "(SELECT 1 FROM image_hashes ih WHERE ih.property_id = pi.property_id AND ih.image_name = pi.image_name)"
+    )
+    db.close()
+    return images
+
+def save_search_history(rows):
+    """Insert (user_id, query, results_count, k, retrieve_ms, rerank_ms, total_ms, result_ids, source, searched_at) rows in one transaction"""
+    db = DatabaseManager(DB_NAME)
+    db.execute_many(
+        "INSERT INTO search_history (user_id, query, results_count, k, retrieve_ms, rerank_ms, total_ms, "
+        "result_ids, source, searched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    db.close()
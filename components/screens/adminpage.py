@@ -1,12 +1,14 @@
 import os 
 import sys 
 import streamlit as st
-import pandas as pd 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from components.database.dbman import DatabaseManager, DB_NAME
 from components.utils.auth import create_user
+from components.utils.traceUtil import load_spans, summarize_spans, TRACE_FILE
 def admin_panel_page():
     """Admin-specific functionality"""
+    import pandas as pd
+
     st.header("Admin Panel")
     st.subheader("User Management")
     
@@ -37,4 +39,22 @@ def admin_panel_page():
                     else:
                         st.error("Username already exists")
                 else:
-                    st.error("Please fill all fields")
\ No newline at end of file
+                    st.error("Please fill all fields")
+    st.subheader("Pipeline Timings")
+    spans = load_spans()
+    if not spans:
+        st.info(f"No traces recorded yet ({TRACE_FILE})")
+    else:
+        st.caption(f"Last {len(spans)} spans from {TRACE_FILE}")
+        st.dataframe(pd.DataFrame(summarize_spans(spans)), hide_index=True)
+        with st.expander("Recent traces"):
+            roots = [s for s in spans if not s.get("parent_id")][-20:]
+            for root in reversed(roots):
+                st.markdown(f"**{root['name']}** · {root['duration_ms']:.0f} ms · {root['started_at']}")
+                children = [s for s in spans if s.get("trace_id") == root["trace_id"] and s is not root]
+                if children:
+                    st.dataframe(
+                        pd.DataFrame([{"span": c["name"], "duration_ms": c["duration_ms"], "status": c["status"], **c.get("attrs", {})}
+                                      for c in children]),
+                        hide_index=True,
+                    )
@@ -2,13 +2,13 @@ import streamlit as st
 import os
 import sys
 import json
-import streamlit as st
-import pandas as pd
-import plotly.express as px
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from components.database.propdb import get_all_properties
 # Dashboard Page
 def dashboard_page():
+    import pandas as pd
+    import plotly.express as px
+
     st.header("📊 Property Dashboard")
     
     # Get all properties
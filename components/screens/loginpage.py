@@ -3,7 +3,7 @@ import os
 import sys 
 import time 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from components.utils.auth import authenticate_user, create_user 
+from components.utils.auth import authenticate_user, create_user, create_session
 
 # Login Page
 def login_page():
@@ -31,6 +31,9 @@ def login_page():
                     if user:
                         st.session_state.user = user
                         st.session_state.authenticated = True
+                        st.session_state.token = create_session(user)
+                        st.session_state.login_time = time.time()
+                        st.query_params["token"] = st.session_state.token  # survives a browser refresh
                         st.success(f"Welcome back, {user['full_name']}!")
                         time.sleep(1)
                         st.rerun()
@@ -4,8 +4,31 @@ import sys
 import json
 import io
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from components.database.propdb import get_property_from_db, get_property_images, get_property_videos
+from components.database.propdb import get_property_from_db, get_property_image_variants, get_property_videos
 from components.utils.emailUtil import share_property_results
+from components.database.outboxdb import get_user_emails
+from components.utils.searchLogUtil import log_search
+from components.utils.profileUtil import display_fields, SUMMARY_KEYS
+
+def _load_results(results):
+    """Attach the database row, images and videos to each search result"""
+    processed_results = []
+    for result in results:
+        property_id = result.get('property_id', 'unknown')
+        property_data = get_property_from_db(property_id)
+        processed_results.append({
+            'property_id': property_id,
+            'score': result.get('score', 0.0),
+            'matched_features': result.get('matched_features', []),
+            'missing_features': result.get('missing_features', []),
+            'feature_match_percentage': result.get('feature_match_percentage', 0),
+            'property_data': dict(property_data) if property_data else None,
+            'images': get_property_image_variants(property_id, "card"),
+            'videos': get_property_videos(property_id)
+        })
+    return processed_results
+
+
 # Property Search Page
 def search_properties_page(search_agent):
     st.header("🔍 Search Properties")
@@ -33,33 +56,11 @@ def search_properties_page(search_agent):
         else:
             with st.spinner("🔍 Searching properties..."):
                 try:
-                    results = search_agent.search(query.strip(), k=max_results)
-                    processed_results = []
-                    
-                    for result in results:
-                        property_id = result.get('property_id', 'unknown')
-                        score = result.get('score', 0.0)
-                        matched_features = result.get('matched_features', [])
-                        missing_features = result.get('missing_features', [])
-                        feature_match_percentage = result.get('feature_match_percentage', 0)
-                        
-                        # Get property from database
-                        property_data = get_property_from_db(property_id)
-                        images = get_property_images(property_id)
-                        videos = get_property_videos(property_id)
-                        
-                        processed_result = {
-                            'property_id': property_id,
-                            'score': score,
-                            'matched_features': matched_features,
-                            'missing_features': missing_features,
-                            'feature_match_percentage': feature_match_percentage,
-                            'property_data': dict(property_data) if property_data else None,
-                            'images': images,
-                            'videos': videos
-                        }
-                        
-                        processed_results.append(processed_result)
+                    timings = {}
+                    results = search_agent.search(query.strip(), k=max_results, timings=timings)
+                    user = st.session_state.get('user')
+                    log_search(user['id'] if user else None, query.strip(), results, k=max_results, timings=timings)
+                    processed_results = _load_results(results)
                     
                     st.session_state.search_results = processed_results
                     st.session_state.search_query = query
@@ -87,10 +88,20 @@ def search_properties_page(search_agent):
         
         if st.session_state.email_sent and st.session_state.email_status:
             if st.session_state.email_status['success']:
-                st.success(f"✅ **Email sent successfully!**")
-                st.success(f"📧 Property details have been shared with **{st.session_state.email_status['recipient']}**")
+                st.success(f"📧 Email to **{st.session_state.email_status['recipient']}** queued; it is sent in the background")
             else:
-                st.error("❌ **Failed to send email**")
+                st.error("❌ **Failed to queue email**")
+        
+        user = st.session_state.get('user')
+        recent_emails = get_user_emails(user['id']) if user else []
+        if recent_emails:
+            with st.expander("📬 Recently shared"):
+                status_icons = {"queued": "⏳", "sending": "📤", "sent": "✅", "failed": "❌"}
+                for email in recent_emails:
+                    line = f"{status_icons.get(email['status'], '•')} {email['recipient']} — {email['subject']} ({email['status']})"
+                    if email['status'] != "sent" and email.get('error'):
+                        line += f": {email['error']}"
+                    st.write(line)
         
         share_col1, share_col2, share_col3 = st.columns([2, 2, 1])
         
@@ -121,13 +132,13 @@ def search_properties_page(search_agent):
                 selected_indices = [property_options.index(prop) for prop in selected_properties]
                 selected_results = [results[i] for i in selected_indices]
                 
-                with st.spinner("📤 Sending email..."):
-                    share_success = share_property_results(
-                        query=query,
-                        results=selected_results,
-                        recipient_email=recipient_email,
-                        include_images=include_images
-                    )
+                share_success = share_property_results(
+                    query=query,
+                    results=selected_results,
+                    recipient_email=recipient_email,
+                    include_images=include_images,
+                    user_id=st.session_state.user['id'] if st.session_state.get('user') else None
+                )
                 
                 if share_success:
                     st.session_state.email_sent = True
@@ -141,7 +152,7 @@ def search_properties_page(search_agent):
                     st.session_state.email_sent = True
                     st.session_state.email_status = {
                         'success': False,
-                        'error': 'Failed to send email'
+                        'error': 'Failed to queue email'
                     }
                 
                 st.rerun()
@@ -172,6 +183,18 @@ def search_properties_page(search_agent):
                     st.metric("Images", len(images))
                     st.metric("Videos", len(videos))
                 
+                if st.button("🔁 More like this", key=f"similar_{i}_{property_id}"):
+                    with st.spinner("🔁 Finding similar properties..."):
+                        try:
+                            similar = search_agent.find_similar(property_id, k=max_results)
+                            st.session_state.search_results = _load_results(similar)
+                            st.session_state.search_query = f"Properties similar to {property_id}"
+                            st.session_state.email_sent = False
+                            st.session_state.email_status = None
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ Error finding similar properties: {str(e)}")
+                
                 # Feature matching section
                 if matched_features or missing_features:
                     st.subheader("🎯 Feature Analysis")
@@ -215,8 +238,7 @@ def search_properties_page(search_agent):
                         st.json(json.loads(property_data['analysis_json']))
                     else:
                         analysis_data = json.loads(property_data['analysis_json'])
-                        summary_keys = ['property_type', 'location', 'price', 'features', 'amenities', 'condition']
-                        summary_data = {k: v for k, v in analysis_data.items() if k in summary_keys and v}
+                        summary_data = display_fields(analysis_data, SUMMARY_KEYS) if analysis_data else {}
                         if summary_data:
                             st.write("**📋 Key Features:**")
                             st.json(summary_data)
@@ -1,31 +1,64 @@
-import streamlit as st 
-import os 
-import sys 
-import datetime
-import tempfile
-import shutil   
-import json 
-import io 
-from PIL import Image
+import streamlit as st
+import os
+import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from components.utils.folderUtil import clean_and_parse, generate_unique_property_id
-from components.database.propdb import save_property_to_db,save_image_to_db,save_video_to_db
-
-# Image Processing
-def resize_image(image_data, max_size=(800, 800)):
-    img = Image.open(io.BytesIO(image_data))
-    img.thumbnail(max_size)
-    buffered = io.BytesIO()
-    img.save(buffered, format="JPEG")
-    return buffered.getvalue()
+from components.utils.folderUtil import generate_unique_property_id
+from components.utils.dedupeUtil import find_duplicates, describe_duplicate
+from components.utils.jobUtil import (
+    submit_analysis_job, create_job_directory, remove_job_directory, register_completed_job, job_progress,
+)
+from components.database.jobdb import (
+    get_job, get_user_jobs, JOB_STAGES, QUEUED, RUNNING, COMPLETED, FAILED, REGISTERING, REGISTERED,
+)
+
+STAGE_ICONS = {"pending": "⏳", "running": "🔄", "done": "✅", "skipped": "➖", "failed": "❌"}
+
+def render_job_stages(job):
+    st.progress(job_progress(job), text=f"Status: {job['status']}")
+    cols = st.columns(len(JOB_STAGES))
+    for col, stage in zip(cols, JOB_STAGES):
+        status = job['stages'].get(stage, "pending")
+        col.write(f"{STAGE_ICONS.get(status, '')} **{stage.title()}**: {status}")
+
+@st.fragment(run_every=2)
+def job_status_panel(job_id):
+    """Poll an active job; trigger a full rerun once it finishes"""
+    job = get_job(job_id)
+    if not job:
+        return
+    render_job_stages(job)
+    if job['status'] not in (QUEUED, RUNNING):
+        st.rerun()
+
+def _flag_duplicates(images, description, vector_store):
+    """Run the near-duplicate check on the uploads; True (and remember the matches) if any were found"""
+    try:
+        duplicates = find_duplicates([image.getvalue() for image in images], description, vector_store)
+    except Exception as e:
+        print(f"⚠️  Duplicate check failed: {e}")
+        duplicates = []
+    st.session_state.duplicates = duplicates
+    return bool(duplicates)
+
 def register_property_page(main_agent, vector_store):
     st.header("📝 Register New Property")
     description = st.text_area("Property Description", height=200, placeholder="Enter detailed property description...")
     images = st.file_uploader("Upload Images", type=["jpg", "png", "jpeg", "gif", "bmp"], accept_multiple_files=True)
     # video = st.file_uploader("Upload Video", type=["mp4", "mov", "avi", "mkv", "webm"], accept_multiple_files=False)
 
+    # Resume an analysis started before a refresh or in another tab
+    if not st.session_state.get('job_id'):
+        open_jobs = get_user_jobs(st.session_state.user['id'], statuses=(QUEUED, RUNNING, COMPLETED))
+        if open_jobs:
+            labels = {job['job_id']: f"{job['property_id'][:8]}... ({job['status']}, {job['created_at']})" for job in open_jobs}
+            with st.expander(f"📂 Your open analyses ({len(open_jobs)})"):
+                selected_job = st.selectbox("Resume analysis", list(labels), format_func=labels.get)
+                if st.button("Resume"):
+                    st.session_state.job_id = selected_job
+                    st.rerun()
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         if st.button("Analyze Property"):
             if not description.strip():
@@ -34,125 +67,94 @@ def register_property_page(main_agent, vector_store):
                 st.error("Please upload at least one image.")
             # elif not video:
             #     st.error("Please upload a video.")
+            elif not st.session_state.get('force_duplicate') and _flag_duplicates(images, description, vector_store):
+                st.error("Possible duplicate listing; review the matches below before analyzing it.")
             else:
-                with st.spinner("Analyzing property..."):
-                    try:
-                        # Generate unique property ID at the start
-                        property_id = generate_unique_property_id()
-                        st.session_state.property_id = property_id
-                        
-                        # Create temporary directory for processing
-                        temp_dir = tempfile.mkdtemp()
-                        
-                        # Create property structure
-                        prop_dir = os.path.join(temp_dir, "property")
-                        img_dir = os.path.join(prop_dir, "images")
-                        # vid_dir = os.path.join(prop_dir, "videos")
-                        text_dir = os.path.join(prop_dir, "text")
-                        
-                        # Create directories
-                        for directory in [img_dir, text_dir]:
-                            os.makedirs(directory, exist_ok=True)
-                        
-                        # Save uploaded files
-                        for image in images:
-                            image_path = os.path.join(img_dir, image.name)
-                            with open(image_path, "wb") as f:
-                                f.write(image.getbuffer())
-                        
-                        # Save description
-                        desc_file = os.path.join(text_dir, "description.txt")
-                        with open(desc_file, "w", encoding='utf-8') as f:
-                            f.write(description)
-                        
-                        # Analyze property
-                        raw_profile = main_agent.analyze_property(prop_dir)
-                        profile = clean_and_parse(raw_profile)
-                        
-                        # Add property ID to profile
-                        profile['property_id'] = property_id
-                        profile['created_at'] = datetime.datetime.now().isoformat()
-                        
-                        # Store results in session state
-                        st.session_state.analysis_result = profile
-                        st.session_state.temp_files = {
-                            'prop_dir': prop_dir,
-                            'img_dir': img_dir,
-                            # 'vid_dir': vid_dir,
-                            'text_dir': text_dir,
-                            'temp_dir': temp_dir,
-                            'images': images  # Keep reference to uploaded images for DB storage
-                        }
-                        
-                        st.success(f"Property analysis completed! Property ID: {property_id}")
-                        
-                    except Exception as e:
-                        st.error(f"Error during analysis: {e}")
-                        if 'temp_dir' in locals():
-                            shutil.rmtree(temp_dir, ignore_errors=True)
+                try:
+                    # Generate unique property ID at the start
+                    property_id = generate_unique_property_id()
+
+                    # Create property structure the background job will analyze
+                    prop_dir = create_job_directory(property_id)
+                    img_dir = os.path.join(prop_dir, "images")
+                    text_dir = os.path.join(prop_dir, "text")
+
+                    # Save uploaded files
+                    for image in images:
+                        image_path = os.path.join(img_dir, image.name)
+                        with open(image_path, "wb") as f:
+                            f.write(image.getbuffer())
+
+                    # Save description
+                    desc_file = os.path.join(text_dir, "description.txt")
+                    with open(desc_file, "w", encoding='utf-8') as f:
+                        f.write(description)
+
+                    # Queue analysis; the page only polls its status from here on
+                    st.session_state.job_id = submit_analysis_job(
+                        main_agent, property_id, prop_dir,
+                        user_id=st.session_state.user['id'],
+                        description=description
+                    )
+                    st.session_state.property_id = property_id
+                    st.session_state.analysis_result = None
+                    st.session_state.duplicates = None
+                    st.success(f"Analysis queued. Property ID: {property_id}")
+
+                except Exception as e:
+                    st.error(f"Error starting analysis: {e}")
+
+    if st.session_state.get('duplicates'):
+        st.warning("⚠️ This listing looks like an already registered property:")
+        for duplicate in st.session_state.duplicates:
+            st.write(f"• {describe_duplicate(duplicate)}")
+        st.checkbox("Analyze anyway (not a duplicate)", key="force_duplicate")
+
+    job = get_job(st.session_state.job_id) if st.session_state.get('job_id') else None
+    if not job:
+        return
+
+    st.session_state.property_id = job['property_id']
+    if job['status'] in (QUEUED, RUNNING):
+        st.subheader("⚙️ Analysis in progress")
+        job_status_panel(job['job_id'])
+        return
+    if job['status'] == FAILED:
+        render_job_stages(job)
+        st.error(f"Error during analysis: {job['error']}")
+        if st.button("Dismiss"):
+            remove_job_directory(job)
+            st.session_state.job_id = None
+            st.rerun()
+        return
+    if job['status'] == REGISTERING:
+        st.info("⏳ This property is being registered (from another tab or the API)")
+        return
+    if job['status'] == REGISTERED:
+        st.session_state.job_id = None
+        return
+
+    st.session_state.analysis_result = job['result']
 
     # Display analysis results
-    if 'analysis_result' in st.session_state and st.session_state.analysis_result and 'property_id' in st.session_state and st.session_state.property_id:
+    if st.session_state.analysis_result and st.session_state.property_id:
         st.subheader("📊 Analysis Result")
         st.write(f"**Property ID:** {st.session_state.property_id}")
         st.json(st.session_state.analysis_result)
-        
+
         with col2:
             if st.button("✅ Register Property"):
                 try:
                     with st.spinner("Registering property..."):
-                        property_id = st.session_state.property_id
-                        temp_files = st.session_state.temp_files
-                        
-                        # Save property to database
-                        save_property_to_db(
-                            property_id=property_id,
-                            description=description,
-                            analysis_json=st.session_state.analysis_result,
-                            created_by=st.session_state.user['id']
+                        property_id = register_completed_job(
+                            job, vector_store, created_by=st.session_state.user['id'], main_agent=main_agent
                         )
-                        
-                        # Save images to database
-                        for image in temp_files['images']:
-                            image_data = image.read()
-                            compressed_image = resize_image(image_data)
-                            save_image_to_db(property_id, image.name, compressed_image)
-                        
-                        # # Save video to database if exists
-                        # if 'video' in temp_files and temp_files['video']:
-                        #     video_data = temp_files['video'].read()
-                        #     save_video_to_db(property_id, temp_files['video'].name, video_data)
-                        
-                        # Add to vector store
-                        document = {
-                            "id": property_id,
-                            "property_id": property_id,
-                            "text_description": json.dumps(st.session_state.analysis_result, ensure_ascii=False),
-                            "description": description,
-                            "created_at": datetime.datetime.now().isoformat()
-                        }
-                        
-                        vector_store.add_documents([document])
-                        
-                        try:
-                            vector_store.qdrant_client.flush(collection_name="sample", wait=True)
-                        except Exception:
-                            pass
-                        
                         st.success(f"✅ Property registered successfully! ID: {property_id}")
-                        
-                        # Clean up temp files
-                        try:
-                            shutil.rmtree(temp_files['temp_dir'])
-                        except Exception:
-                            pass
-                        
+
                         # Reset session state
                         st.session_state.analysis_result = None
-                        st.session_state.temp_files = None
+                        st.session_state.job_id = None
                         st.session_state.property_id = None
-                
+
                 except Exception as e:
                     st.error(f"Registration failed: {e}")
-                    if 'temp_files' in st.session_state and st.session_state.temp_files:
-                        shutil.rmtree(st.session_state.temp_files['temp_dir'], ignore_errors=True)
\ No newline at end of file
@@ -4,9 +4,13 @@ import hashlib
 
 import sys
 import os 
+import time
+import secrets
 import sqlite3
+import threading
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from components.database.dbman import DatabaseManager, DB_NAME
+from components.utils.metricsUtil import CACHE_LOOKUPS
 import json 
 # from agents.mainAgent import MainAnalysisAgent
 # from agents.searchAgent import PropertySearchAgent
@@ -16,20 +20,85 @@ import json
 # from components.utils.folderUtil import clean_and_parse, generate_unique_property_id
 # from components.database.dbmanager import init_db
 
-TOKEN_FILE = "tokens.json"
 SESSION_TIMEOUT = 3600
+# Validated sessions are cached per process for up to this many seconds, so a
+# logout in another worker process takes at most this long to be seen here
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "30"))
+# Expired sessions are deleted at most this often
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "300"))
+USER_COLUMNS = "u.id, u.username, u.full_name, u.email, u.role, u.created_at"
+
+_session_cache = {}  # token -> (user, expires_at, cached_until)
+_session_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def create_session(user):
+    """Start a session for an authenticated user and return its token"""
+    token = secrets.token_urlsafe(32)
+    db = DatabaseManager(DB_NAME)
+    db.execute_query(
+        "INSERT INTO sessions (token, user_id, expires_at) VALUES (?, ?, ?)",
+        (token, user['id'], time.time() + SESSION_TIMEOUT)
+    )
+    db.close()
+    return token
+
+def get_session(token):
+    """(user, expires_at) of a live session, or None; cached for SESSION_CACHE_TTL seconds"""
+    now = time.time()
+    _sweep_expired_sessions(now)
+    with _session_lock:
+        cached = _session_cache.get(token)
+    if cached and now < cached[2]:
+        CACHE_LOOKUPS.labels("sessions", "hit").inc()
+        return cached[0], cached[1]
+    CACHE_LOOKUPS.labels("sessions", "miss").inc()
+
+    db = DatabaseManager(DB_NAME)
+    row = db.fetch_one(
+        f"SELECT {USER_COLUMNS}, s.expires_at FROM sessions s JOIN users u ON u.id = s.user_id "
+        "WHERE s.token = ? AND s.expires_at > ?",
+        (token, now)
+    )
+    db.close()
+    with _session_lock:
+        if row is None:
+            _session_cache.pop(token, None)
+            return None
+        user = dict(row)
+        expires_at = user.pop('expires_at')
+        _session_cache[token] = (user, expires_at, min(now + SESSION_CACHE_TTL, expires_at))
+    return user, expires_at
+
 def logout_user(token):
     """Remove token from active sessions"""
+    with _session_lock:
+        _session_cache.pop(token, None)
+    if not token:
+        return
     try:
-        if os.path.exists(TOKEN_FILE):
-            with open(TOKEN_FILE, "r") as f:
-                token_map = json.load(f)
-            if token in token_map:
-                del token_map[token]
-                with open(TOKEN_FILE, "w") as f:
-                    json.dump(token_map, f)
+        db = DatabaseManager(DB_NAME)
+        db.execute_query("DELETE FROM sessions WHERE token = ?", (token,))
+        db.close()
     except Exception as e:
         print("Logout error:", e)
+
+def _sweep_expired_sessions(now):
+    global _last_sweep
+    with _session_lock:
+        if now - _last_sweep < SESSION_SWEEP_SECONDS:
+            return
+        _last_sweep = now
+        for token in [t for t, (_, expires_at, _) in _session_cache.items() if expires_at <= now]:
+            del _session_cache[token]
+    try:
+        db = DatabaseManager(DB_NAME)
+        db.execute_query("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        db.close()
+    except Exception as e:
+        print("Session sweep error:", e)
+
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 # Initialize Database
@@ -0,0 +1,52 @@
+import os
+import sys
+import streamlit as st
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.database.dbmanager import init_db
+from components.utils.resourceUtil import (
+    build_main_agent,
+    build_vector_store,
+    build_search_agent,
+    vector_store_is_healthy,
+)
+
+# Process-wide resources shared by every Streamlit session and rerun.
+# Each one is built on first use, so pages that never need the agents
+# or the vector store (login, dashboard, admin) never pay for them.
+
+
+@st.cache_resource(show_spinner=False)
+def init_database(db_name):
+    """Create tables and demo users once per process"""
+    init_db(db_name)
+    return db_name
+
+
+@st.cache_resource(show_spinner=False)
+def get_email_sender():
+    """
+    Start this process's email outbox sender at startup, so emails queued or
+    due for a retry before a restart are delivered without waiting for a share
+    """
+    from components.utils.emailUtil import start_email_sender
+    return start_email_sender()
+
+
+@st.cache_resource(show_spinner="Loading analysis agents...")
+def get_main_agent():
+    return build_main_agent()
+
+
+@st.cache_resource(show_spinner="Connecting to vector store...", validate=vector_store_is_healthy)
+def get_vector_store():
+    return build_vector_store()
+
+
+def _uses_current_vector_store(search_agent):
+    """Rebuild the search agent whenever the vector store was replaced"""
+    return search_agent.vector_store is get_vector_store()
+
+
+@st.cache_resource(show_spinner="Loading search agent...", validate=_uses_current_vector_store)
+def get_search_agent():
+    return build_search_agent(get_vector_store())
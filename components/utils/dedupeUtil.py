@@ -0,0 +1,150 @@
+"""
+Near-duplicate listing detection, run before a property is analyzed.
+
+Brokers re-upload the same flat with recompressed or resized photos and a
+lightly edited description. Two signals are checked against registered
+properties before any Gemini call is made:
+  images      - 64-bit dHash per photo; a stored hash within
+                DEDUPE_MAX_HAMMING bits of an upload is a match. Hashes are
+                split into 8 bands of 8 bits, so any hash within 7 bits
+                shares a band and is found by an indexed lookup.
+  description - embedding similarity of the description with the indexed
+                description chunks, at or above DEDUPE_TEXT_THRESHOLD.
+
+Usage (hash images registered before this check existed):
+    python -m components.utils.dedupeUtil --backfill
+"""
+import os
+import sys
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from components.database.propdb import save_image_hash, find_image_hash_candidates, get_unhashed_property_images
+from components.utils.imageUtil import dhash
+from components.utils.traceUtil import span
+from components.utils.metricsUtil import DEDUPE_CHECKS
+
+BANDS = 8
+DEDUPE_MAX_HAMMING = int(os.getenv("DEDUPE_MAX_HAMMING", "6"))
+DEDUPE_TEXT_THRESHOLD = float(os.getenv("DEDUPE_TEXT_THRESHOLD", "0.95"))
+# Share of a new listing's images that must match one property to flag it
+DEDUPE_IMAGE_SHARE = float(os.getenv("DEDUPE_IMAGE_SHARE", "0.5"))
+
+
+def hash_bands(value):
+    """The 8-bit bands of a 64-bit hash, most significant first"""
+    return [(value >> (8 * (BANDS - 1 - i))) & 0xFF for i in range(BANDS)]
+
+
+def record_image_hash(property_id, image_name, image_data):
+    """Store the dHash of a registered image"""
+    value = dhash(image_data)
+    save_image_hash(property_id, image_name, f"{value:016x}", hash_bands(value))
+
+
+def image_matches(image_data, max_distance=DEDUPE_MAX_HAMMING):
+    """
+    Registered images within max_distance bits of this one (bytes or a file
+    path): [(property_id, image_name, distance)]
+    """
+    value = dhash(image_data)
+    matches = []
+    for row in find_image_hash_candidates(hash_bands(value)):
+        distance = bin(value ^ int(row['dhash'], 16)).count("1")
+        if distance <= max_distance:
+            matches.append((row['property_id'], row['image_name'], distance))
+    return matches
+
+
+def find_duplicates(images, description, vector_store=None):
+    """
+    Registered properties that look like the listing being uploaded.
+
+    Args:
+        images: Raw bytes or file path of each uploaded image; paths are
+            opened one at a time, so large uploads are never all in memory
+        description: The listing's free-text description
+        vector_store: QdrantVectorStoreClient for the description check
+            (skipped when None or the description is empty)
+
+    Returns:
+        [{"property_id", "reasons", "matched_images", "min_distance", "text_score"}],
+        most likely duplicate first
+    """
+    with span("dedupe", images=len(images)) as s:
+        found = {}
+
+        per_property = {}
+        for index, image_data in enumerate(images):
+            try:
+                matches = image_matches(image_data)
+            except Exception as e:
+                print(f"⚠️  Could not hash image {index}: {e}")
+                continue
+            for property_id, _, distance in matches:
+                best = per_property.setdefault(property_id, {})
+                best[index] = min(distance, best.get(index, distance))
+        for property_id, matched in per_property.items():
+            if images and len(matched) / len(images) >= DEDUPE_IMAGE_SHARE:
+                found[property_id] = {
+                    "property_id": property_id,
+                    "reasons": ["images"],
+                    "matched_images": len(matched),
+                    "min_distance": min(matched.values()),
+                    "text_score": None,
+                }
+
+        if vector_store is not None and description.strip():
+            filters = {"section": ["description", "full"]}
+            for hit in vector_store.similarity_search(f"description: {description.strip()}", 3, filters):
+                if hit["score"] < DEDUPE_TEXT_THRESHOLD:
+                    continue
+                entry = found.setdefault(hit["property_id"], {
+                    "property_id": hit["property_id"],
+                    "reasons": [],
+                    "matched_images": 0,
+                    "min_distance": None,
+                    "text_score": None,
+                })
+                entry["reasons"].append("description")
+                entry["text_score"] = round(hit["score"], 4)
+
+        duplicates = sorted(found.values(), key=lambda d: (-len(d["reasons"]), -d["matched_images"]))
+        s.set(duplicates=len(duplicates))
+        DEDUPE_CHECKS.labels("duplicate" if duplicates else "unique").inc()
+        return duplicates
+
+
+def describe_duplicate(duplicate):
+    """One-line human-readable summary of a find_duplicates() entry"""
+    parts = []
+    if "images" in duplicate["reasons"]:
+        parts.append(f"{duplicate['matched_images']} matching image(s), closest {duplicate['min_distance']} bits apart")
+    if "description" in duplicate["reasons"]:
+        parts.append(f"description similarity {duplicate['text_score']:.2f}")
+    return f"{duplicate['property_id']}: " + "; ".join(parts)
+
+
+def backfill_image_hashes():
+    """Hash registered images that have no stored hash yet; returns how many were added"""
+    added = 0
+    for row in get_unhashed_property_images():
+        try:
+            record_image_hash(row['property_id'], row['image_name'], row['image_data'])
+            added += 1
+        except Exception as e:
+            print(f"⚠️  Could not hash {row['property_id']}/{row['image_name']}: {e}")
+    return added
+
+
+if __name__ == "__main__":
+    from components.database.dbmanager import init_db, DB_NAME
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backfill", action="store_true", help="hash registered images that have no stored hash")
+    args = parser.parse_args()
+
+    init_db(DB_NAME)
+    if args.backfill:
+        print(f"✅ Hashed {backfill_image_hashes()} images")
+    else:
+        parser.print_help()
@@ -0,0 +1,114 @@
+"""
+Streaming text extraction for broker documents.
+
+Each extractor yields a document one page (PDF), paragraph (DOCX) or block
+(plain text) at a time, so the text of a 200-page brochure is never held in
+memory as a whole; pack_chunks() groups the stream into prompt-sized chunks.
+pypdf still keeps an index of every page and object of a PDF, so PDFs are
+read up to MAX_PDF_PAGES pages.
+
+Supported: .txt/.md (any encoding errors replaced), .pdf (pypdf), .docx
+(read straight from the zip's XML). Legacy .doc files cannot be read and
+raise UnsupportedDocument.
+"""
+import os
+import sys
+import zipfile
+from pathlib import Path
+from xml.etree.ElementTree import iterparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+CHARS_PER_TOKEN = 4
+TEXT_BLOCK_CHARS = 16 * 1024
+# pypdf caches every object it parses; drop the cache this often to bound memory
+PDF_CACHE_PAGES = 20
+# Pages read from one PDF; TEXT_MAX_CHUNKS chunks hold about this much text anyway
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "500"))
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class UnsupportedDocument(ValueError):
+    """A text upload whose format cannot be extracted"""
+
+
+def estimate_tokens(text):
+    """Rough Gemini token estimate (~4 characters per token)"""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def iter_text_file(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(TEXT_BLOCK_CHARS)
+            if not block:
+                return
+            yield block
+
+
+def iter_pdf_pages(path):
+    from pypdf import PdfReader  # only PDF uploads need pypdf
+    from pypdf.generic import NullObject
+
+    # An open file is read as needed; a path would be read into memory whole
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        pages = len(reader.pages)
+        if pages > MAX_PDF_PAGES:
+            print(f"⚠️  {Path(path).name} has {pages} pages, only the first {MAX_PDF_PAGES} are read")
+        for number in range(min(pages, MAX_PDF_PAGES)):
+            yield reader.pages[number].extract_text() or ""
+            # Drop the parsed page so it is freed with the object cache
+            reader.flattened_pages[number] = NullObject()
+            if (number + 1) % PDF_CACHE_PAGES == 0:
+                reader.resolved_objects.clear()
+
+
+def iter_docx_paragraphs(path):
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+        for _, element in iterparse(xml):
+            if element.tag == f"{WORD_NAMESPACE}p":
+                text = "".join(node.text or "" for node in element.iter(f"{WORD_NAMESPACE}t"))
+                if text:
+                    yield text + "\n"
+                element.clear()
+
+
+EXTRACTORS = {
+    ".txt": iter_text_file,
+    ".md": iter_text_file,
+    ".pdf": iter_pdf_pages,
+    ".docx": iter_docx_paragraphs,
+}
+
+
+def iter_document(path):
+    """The text of a document, yielded a page/paragraph/block at a time"""
+    extractor = EXTRACTORS.get(Path(path).suffix.lower())
+    if extractor is None:
+        raise UnsupportedDocument(f"Cannot extract text from {Path(path).name}")
+    return extractor(str(path))
+
+
+def pack_chunks(documents, token_budget):
+    """
+    Pack the text of [(name, pieces)] into chunks of at most token_budget
+    tokens, each a list of (name, text) parts. Pieces longer than a chunk are
+    split; several short documents can share one chunk.
+    """
+    limit = max(1, token_budget * CHARS_PER_TOKEN)
+    chunk, size = [], 0
+    for name, pieces in documents:
+        for piece in pieces:
+            while piece:
+                room = limit - size
+                part, piece = piece[:room], piece[room:]
+                if chunk and chunk[-1][0] == name:
+                    chunk[-1] = (name, chunk[-1][1] + part)
+                else:
+                    chunk.append((name, part))
+                size += len(part)
+                if size >= limit:
+                    yield chunk
+                    chunk, size = [], 0
+    if chunk:
+        yield chunk
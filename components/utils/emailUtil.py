@@ -1,181 +1,269 @@
-def share_property_results(query, results, recipient_email, include_images=True):
+import os
+import sys
+import html
+import json
+import time
+import smtplib
+import threading
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.image import MIMEImage
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from components.database.outboxdb import (
+    enqueue_email, claim_emails, mark_email_sent, mark_email_failed, requeue_interrupted_emails,
+)
+from components.database.propdb import get_property_from_db, get_property_image_variants
+from components.utils.traceUtil import span
+from components.utils.metricsUtil import EMAILS
+from components.utils.profileUtil import display_fields, SUMMARY_KEYS
+
+# Shared search results are written to the email_outbox table and delivered
+# by one background sender thread per process, so the share button returns
+# at once. Each batch reuses one authenticated SMTP connection, and the
+# stored thumbs are embedded as inline (cid:) images.
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_SENDER = os.getenv("SMTP_SENDER") or SMTP_USERNAME
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "3"))
+# How often the sender looks for retries that have become due
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "15"))
+# Thumbnails embedded per property
+EMAIL_IMAGES_PER_PROPERTY = 3
+
+EMAIL_STYLE = """
+    body { font-family: Arial, sans-serif; margin: 20px; }
+    .header { background-color: #f0f2f6; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
+    .property { border: 1px solid #ddd; margin: 20px 0; padding: 20px; border-radius: 10px; }
+    .property-header { background-color: #e8f4fd; padding: 15px; border-radius: 5px; margin-bottom: 15px; }
+    .features { margin: 10px 0; }
+    .matched { color: #28a745; }
+    .missing { color: #dc3545; }
+    .metrics { display: flex; justify-content: space-around; margin: 15px 0; }
+    .metric { text-align: center; }
+    .images { margin: 15px 0; }
+    img { max-width: 200px; margin: 5px; border-radius: 5px; }
+"""
+
+_sender = None
+_sender_lock = threading.Lock()
+_wake = threading.Event()
+
+
+def share_property_results(query, results, recipient_email, include_images=True, user_id=None):
     """
-    Function to share property search results via email
-    
+    Queue property search results for delivery by email.
+
     Args:
         query (str): Original search query
-        results (list): List of property results to share
+        results (list): Property results to share (search results with a property_id)
         recipient_email (str): Email address to send the results to
-        include_images (bool): Whether to include images in the email
-    
+        include_images (bool): Whether to embed property thumbnails
+        user_id (int): User who shared them
+
     Returns:
-        bool: True if sharing was successful, False otherwise
+        int: Outbox id of the queued email, or None if it could not be queued
     """
+    payload = {
+        "query": query,
+        "include_images": include_images,
+        "results": [
+            {
+                "property_id": result['property_id'],
+                "score": result.get('score', 0.0),
+                "matched_features": result.get('matched_features', []),
+                "missing_features": result.get('missing_features', []),
+                "feature_match_percentage": result.get('feature_match_percentage', 0),
+            }
+            for result in results
+        ],
+    }
     try:
-        import smtplib
-        from email.mime.multipart import MIMEMultipart
-        from email.mime.text import MIMEText
-        from email.mime.image import MIMEImage
-        import os
-        from datetime import datetime
-        
-        # Email configuration (you'll need to set these up based on your email service)
-        # You should store these in environment variables or config file
-        SMTP_SERVER = "smtp.gmail.com"  # Change based on your email provider
-        SMTP_PORT = 587
-        SENDER_EMAIL = "jayanthunofficial@gmail.com"  # Your app's email
-        SENDER_PASSWORD = "qxhx qwhd aobk xgqf"  # App password or OAuth token
-        
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = recipient_email
-        msg['Subject'] = f"Property Search Results: {query}"
-        
-        # Create HTML email content
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .header {{ background-color: #f0f2f6; padding: 20px; border-radius: 10px; margin-bottom: 20px; }}
-                .property {{ border: 1px solid #ddd; margin: 20px 0; padding: 20px; border-radius: 10px; }}
-                .property-header {{ background-color: #e8f4fd; padding: 15px; border-radius: 5px; margin-bottom: 15px; }}
-                .features {{ margin: 10px 0; }}
-                .matched {{ color: #28a745; }}
-                .missing {{ color: #dc3545; }}
-                .metrics {{ display: flex; justify-content: space-around; margin: 15px 0; }}
-                .metric {{ text-align: center; }}
-                .images {{ margin: 15px 0; }}
-                img {{ max-width: 200px; margin: 5px; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h2>🏠 Property Search Results</h2>
-                <p><strong>Search Query:</strong> {query}</p>
-                <p><strong>Results Found:</strong> {len(results)} properties</p>
-                <p><strong>Generated on:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            </div>
-        """
-        
-        # Add each property to the email
-        for i, result in enumerate(results, 1):
-            property_id = result['property_id']
-            score = result['score']
-            matched_features = result['matched_features']
-            missing_features = result['missing_features']
-            feature_match_percentage = result['feature_match_percentage']
-            folder_info = result['folder_info']
-            
-            html_content += f"""
-            <div class="property">
-                <div class="property-header">
-                    <h3>Property {i}: {property_id[:12]}...</h3>
-                    <div class="metrics">
-                        <div class="metric">
-                            <strong>Match Score</strong><br>
-                            {score:.3f}
-                        </div>
-                        <div class="metric">
-                            <strong>Feature Match</strong><br>
-                            {feature_match_percentage}%
-                        </div>
-                        <div class="metric">
-                            <strong>Images</strong><br>
-                            {len(folder_info.get('images', []))}
-                        </div>
-                    </div>
-                </div>
-                
-                <p><strong>Full Property ID:</strong> {property_id}</p>
-            """
-            
-            # Add property description if available
-            if folder_info.get('profile_data') and 'description' in folder_info['profile_data']:
-                html_content += f"""
-                <h4>📝 Description:</h4>
-                <p>{folder_info['profile_data']['description']}</p>
-                """
-            
-            # Add matched features
-            if matched_features:
-                html_content += f"""
-                <div class="features">
-                    <h4 class="matched">✅ Matched Features:</h4>
-                    <ul class="matched">
-                """
-                for feature in matched_features:
-                    html_content += f"<li>{feature}</li>"
-                html_content += "</ul></div>"
-            
-            # Add missing features
-            if missing_features:
-                html_content += f"""
-                <div class="features">
-                    <h4 class="missing">❌ Missing Features:</h4>
-                    <ul class="missing">
-                """
-                for feature in missing_features:
-                    html_content += f"<li>{feature}</li>"
-                html_content += "</ul></div>"
-            
-            # Add key property features if available
-            if folder_info.get('profile_data'):
-                analysis_data = folder_info['profile_data']
-                if isinstance(analysis_data, dict):
-                    summary_keys = ['property_type', 'location', 'price', 'features', 'amenities', 'condition']
-                    summary_data = {k: v for k, v in analysis_data.items() if k in summary_keys and v}
-                    if summary_data:
-                        html_content += "<h4>📋 Key Features:</h4><ul>"
-                        for key, value in summary_data.items():
-                            html_content += f"<li><strong>{key.replace('_', ' ').title()}:</strong> {value}</li>"
-                        html_content += "</ul>"
-            
-            html_content += "</div>"
-        
-        html_content += """
-            <div class="header" style="margin-top: 30px;">
-                <p><em>This email was generated automatically from your property search application.</em></p>
-                <p>If you have any questions about these properties, please contact the sender.</p>
+        email_id = enqueue_email(user_id, recipient_email, f"Property Search Results: {query}", payload)
+    except Exception as e:
+        print(f"Error queueing property results email: {e}")
+        return None
+    start_email_sender()
+    _wake.set()
+    return email_id
+
+
+def _property_html(index, result, images):
+    """HTML block of one shared property; `images` are the cid names of its thumbnails"""
+    property_id = result['property_id']
+    property_row = get_property_from_db(property_id)
+    profile = json.loads(property_row['analysis_json']) if property_row else {}
+    title = profile.get('property_name') or f"{property_id[:12]}..."
+
+    block = f"""
+    <div class="property">
+        <div class="property-header">
+            <h3>Property {index}: {html.escape(title)}</h3>
+            <div class="metrics">
+                <div class="metric"><strong>Match Score</strong><br>{result['score']:.3f}</div>
+                <div class="metric"><strong>Feature Match</strong><br>{result['feature_match_percentage']}%</div>
+                <div class="metric"><strong>Images</strong><br>{len(images)}</div>
             </div>
-        </body>
-        </html>
-        """
-        
-        # Attach HTML content
-        html_part = MIMEText(html_content, 'html')
-        msg.attach(html_part)
-        
-        # Attach images if requested and available
-        if include_images:
-            image_count = 0
-            for result in results:
-                folder_info = result['folder_info']
-                if folder_info.get('image_paths'):
-                    for img_path in folder_info['image_paths'][:3]:  # Limit to 3 images per property
-                        try:
-                            if os.path.exists(img_path):
-                                with open(img_path, 'rb') as f:
-                                    img_data = f.read()
-                                image = MIMEImage(img_data)
-                                image.add_header('Content-Disposition', f'attachment; filename=property_{result["property_id"][:8]}_{image_count}.jpg')
-                                msg.attach(image)
-                                image_count += 1
-                        except Exception as e:
-                            print(f"Error attaching image {img_path}: {e}")
-                            continue
-        
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+        </div>
+        <p><strong>Full Property ID:</strong> {property_id}</p>
+    """
+    summary = profile.get('property_summary') or (property_row['description'] if property_row else "")
+    if summary:
+        block += f"<h4>📝 Description:</h4><p>{html.escape(summary)}</p>"
+    if images:
+        block += '<div class="images">' + "".join(f'<img src="cid:{cid}">' for cid in images) + "</div>"
+    for css, heading, features in (
+        ("matched", "✅ Matched Features:", result['matched_features']),
+        ("missing", "❌ Missing Features:", result['missing_features']),
+    ):
+        if features:
+            items = "".join(f"<li>{html.escape(str(feature))}</li>" for feature in features)
+            block += f'<div class="features"><h4 class="{css}">{heading}</h4><ul class="{css}">{items}</ul></div>'
+    summary_data = display_fields(profile, SUMMARY_KEYS) if profile else {}
+    if summary_data:
+        block += "<h4>📋 Key Features:</h4><ul>"
+        for key, value in summary_data.items():
+            value = ", ".join(map(str, value)) if isinstance(value, list) else value
+            block += f"<li><strong>{key.replace('_', ' ').title()}:</strong> {html.escape(str(value))}</li>"
+        block += "</ul>"
+    return block + "</div>"
+
+
+def build_email(email):
+    """MIME message for an outbox row: HTML body with the properties' thumbs as inline cid: images"""
+    payload = email['payload']
+    msg = MIMEMultipart('related')
+    msg['From'] = SMTP_SENDER
+    msg['To'] = email['recipient']
+    msg['Subject'] = email['subject']
+
+    body = f"""
+    <html>
+    <head><style>{EMAIL_STYLE}</style></head>
+    <body>
+        <div class="header">
+            <h2>🏠 Property Search Results</h2>
+            <p><strong>Search Query:</strong> {html.escape(payload['query'])}</p>
+            <p><strong>Results Found:</strong> {len(payload['results'])} properties</p>
+            <p><strong>Generated on:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        </div>
+    """
+    inline_images = []
+    for i, result in enumerate(payload['results'], 1):
+        cids = []
+        if payload.get('include_images'):
+            thumbs = get_property_image_variants(result['property_id'], "thumb")[:EMAIL_IMAGES_PER_PROPERTY]
+            for j, img in enumerate(thumbs):
+                cid = f"property{i}-image{j}"
+                image = MIMEImage(img['image_data'], _subtype='jpeg')
+                image.add_header('Content-ID', f"<{cid}>")
+                image.add_header('Content-Disposition', 'inline', filename=f"property_{i}_{j}.jpg")
+                inline_images.append(image)
+                cids.append(cid)
+        body += _property_html(i, result, cids)
+    body += """
+        <div class="header" style="margin-top: 30px;">
+            <p><em>This email was generated automatically from your property search application.</em></p>
+            <p>If you have any questions about these properties, please contact the sender.</p>
+        </div>
+    </body>
+    </html>
+    """
+    msg.attach(MIMEText(body, 'html'))
+    for image in inline_images:
+        msg.attach(image)
+    return msg
+
+
+def connect_smtp():
+    """Open an SMTP connection, upgraded with STARTTLS and logged in when configured"""
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    try:
+        if SMTP_STARTTLS:
             server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            text = msg.as_string()
-            server.sendmail(SENDER_EMAIL, recipient_email, text)
-        
-        return True
-        
-    except Exception as e:
-        print(f"Error sharing property results: {e}")
-        # You might want to log this error or show it to the user
-        return False
\ No newline at end of file
+        if SMTP_USERNAME:
+            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _is_permanent(error):
+    """5xx replies (unknown mailbox, rejected sender) will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def _record_failure(email, error, permanent=False):
+    if not permanent and email['attempts'] + 1 < EMAIL_MAX_ATTEMPTS:
+        mark_email_failed(email['id'], error, retry_in=60 * (email['attempts'] + 1))
+        EMAILS.labels("retried").inc()
+    else:
+        mark_email_failed(email['id'], error)
+        EMAILS.labels("failed").inc()
+    print(f"⚠️  Email {email['id']} to {email['recipient']} failed: {error}")
+
+
+def send_pending_emails(batch_size=EMAIL_BATCH_SIZE):
+    """Deliver up to batch_size due emails over one SMTP connection; returns how many were claimed"""
+    emails = claim_emails(batch_size)
+    if not emails:
+        return 0
+    with span("email.send_batch", emails=len(emails)) as s:
+        server = None
+        for index, email in enumerate(emails):
+            if server is None:
+                try:
+                    server = connect_smtp()
+                except Exception as e:
+                    for pending in emails[index:]:
+                        _record_failure(pending, f"SMTP connection failed: {e}")
+                    break
+            try:
+                server.send_message(build_email(email), from_addr=SMTP_SENDER, to_addrs=[email['recipient']])
+            except Exception as e:
+                _record_failure(email, str(e), permanent=_is_permanent(e))
+                if isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+                    server = None  # reconnect for the next email
+                continue
+            mark_email_sent(email['id'])
+            EMAILS.labels("sent").inc()
+            s.incr("sent")
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
+    return len(emails)
+
+
+def _sender_loop():
+    while True:
+        _wake.wait(EMAIL_POLL_SECONDS)
+        _wake.clear()
+        try:
+            # A full batch means more may be waiting
+            while send_pending_emails() == EMAIL_BATCH_SIZE:
+                pass
+        except Exception as e:
+            print(f"⚠️  Email sender error: {e}")
+            time.sleep(EMAIL_POLL_SECONDS)
+
+
+def start_email_sender():
+    """Start this process's background email sender, once; it first delivers whatever is already due"""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            requeue_interrupted_emails()
+            _sender = threading.Thread(target=_sender_loop, name="email-sender", daemon=True)
+            _sender.start()
+            _wake.set()
+        return _sender
@@ -0,0 +1,113 @@
+import io
+import math
+
+# Image Processing
+def resize_image(image_data, max_size=(800, 800)):
+    from PIL import Image
+    img = Image.open(io.BytesIO(image_data))
+    img.thumbnail(max_size)
+    buffered = io.BytesIO()
+    img.save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+def prepare_image(image_data, long_edge=1024, quality=85):
+    """
+    Model-ready copy of an upload: EXIF orientation applied, downsized so
+    its longer side is at most long_edge, re-encoded as JPEG at quality.
+    Returns (jpeg bytes, width, height).
+    """
+    from PIL import Image, ImageOps
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(image_data)))
+    img.thumbnail((long_edge, long_edge), Image.LANCZOS)
+    buffered = io.BytesIO()
+    img.convert("RGB").save(buffered, format="JPEG", quality=quality, optimize=True)
+    return buffered.getvalue(), img.width, img.height
+
+# Stored renditions of a registered image: (name, longest side in px, format).
+# Thumbs stay JPEG because many mail clients cannot show WebP.
+IMAGE_VARIANTS = (("full", 800, "JPEG"), ("card", 480, "WEBP"), ("thumb", 240, "JPEG"))
+
+def make_variants(image_data, variants=IMAGE_VARIANTS, quality=82):
+    """
+    Decode an image once and encode every (name, long edge, format) variant,
+    largest first, each downscaled from the one before. Returns {name: bytes}.
+    """
+    from PIL import Image, ImageOps
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(image_data))).convert("RGB")
+    encoded = {}
+    for name, long_edge, image_format in sorted(variants, key=lambda v: -v[1]):
+        img.thumbnail((long_edge, long_edge), Image.LANCZOS)
+        buffered = io.BytesIO()
+        options = {"optimize": True} if image_format == "JPEG" else {"method": 4}
+        img.save(buffered, format=image_format, quality=quality, **options)
+        encoded[name] = buffered.getvalue()
+    return encoded
+
+def estimate_image_tokens(width, height):
+    """Gemini input tokens of an image: 258 up to 384px, else 258 per 768px tile"""
+    if width <= 384 and height <= 384:
+        return 258
+    return 258 * math.ceil(width / 768) * math.ceil(height / 768)
+
+def image_size(image_data):
+    """(width, height) of encoded image bytes, read from the header"""
+    from PIL import Image
+    return Image.open(io.BytesIO(image_data)).size
+
+def pack_mosaics(images, labels, grid=3, cell=384, quality=85):
+    """
+    Tile encoded images into labeled grid x grid mosaics with NumPy/OpenCV.
+    Each image is scaled down to fit a cell x cell tile, centred on black,
+    and its label drawn in the tile's top-left corner. Returns
+    [(jpeg bytes, labels of the tiles in that mosaic)].
+    """
+    import cv2
+    import numpy as np
+
+    per_mosaic = grid * grid
+    mosaics = []
+    for start in range(0, len(images), per_mosaic):
+        batch_labels = labels[start:start + per_mosaic]
+        tiles = [_mosaic_tile(data, label, cell) for data, label in zip(images[start:start + per_mosaic], batch_labels)]
+        columns = min(grid, len(tiles))
+        tiles += [np.zeros((cell, cell, 3), np.uint8)] * (-len(tiles) % columns)
+        rows = [np.hstack(tiles[i:i + columns]) for i in range(0, len(tiles), columns)]
+        ok, buffer = cv2.imencode(".jpg", np.vstack(rows), [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Could not encode mosaic")
+        mosaics.append((buffer.tobytes(), list(batch_labels)))
+    return mosaics
+
+def _mosaic_tile(image_data, label, cell):
+    import cv2
+    import numpy as np
+
+    img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Could not decode image for tile {label}")
+    height, width = img.shape[:2]
+    scale = min(1.0, cell / max(height, width))
+    if scale < 1.0:
+        img = cv2.resize(img, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+    tile = np.zeros((cell, cell, 3), np.uint8)
+    top, left = (cell - img.shape[0]) // 2, (cell - img.shape[1]) // 2
+    tile[top:top + img.shape[0], left:left + img.shape[1]] = img
+    (text_width, text_height), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+    cv2.rectangle(tile, (0, 0), (text_width + 8, text_height + baseline + 8), (0, 0, 0), -1)
+    cv2.putText(tile, label, (4, text_height + 4), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+    return tile
+
+def dhash(image_data, hash_size=8):
+    """64-bit difference hash of an image's bytes or file (robust to resizing and recompression)"""
+    from PIL import Image, ImageOps
+    source = io.BytesIO(image_data) if isinstance(image_data, (bytes, bytearray)) else image_data
+    with Image.open(source) as opened:
+        img = ImageOps.exif_transpose(opened)
+        pixels = list(img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
@@ -0,0 +1,180 @@
+import os
+import sys
+import json
+import shutil
+import datetime
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.database.jobdb import (
+    create_job, update_job_stage, set_job_status, fail_interrupted_jobs, claim_job_for_registration,
+    RUNNING, COMPLETED, FAILED, REGISTERED,
+)
+from components.database.propdb import (
+    save_property_to_db, save_image_to_db, get_property_from_db, update_property_analysis,
+)
+from components.utils.thumbnailUtil import build_variants
+from components.utils.traceUtil import span
+from components.utils.reindexUtil import index_property
+from components.utils.dedupeUtil import record_image_hash
+from components.utils.metricsUtil import INGEST_QUEUED, INGEST_RUNNING
+
+# Background ingestion: analysis runs on a process-wide worker pool and
+# reports per-stage progress to the ingestion_jobs table, so the page that
+# submitted it only polls and a browser refresh does not lose the work.
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+JOBS_DIR = os.getenv("INGEST_DIR", os.path.join(tempfile.gettempdir(), "demonseller_jobs"))
+# Rewrite the rules-built profile prose with Gemini after registration
+PROFILE_POLISH = os.getenv("PROFILE_POLISH", "false").lower() == "true"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class JobNotRegistrable(Exception):
+    """The job is not completed, or another caller is already registering it"""
+
+
+def get_executor():
+    """Return the shared ingestion executor, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            fail_interrupted_jobs()
+            _executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+            INGEST_QUEUED.set_function(_executor._work_queue.qsize)
+            # threading runs its exit hooks newest first, so this one runs before
+            # concurrent.futures stops the analysis agents' own pools
+            threading._register_atexit(_drain_executor)
+        return _executor
+
+
+def _drain_executor():
+    """
+    At interpreter exit, let running jobs finish while their inner pools still
+    accept work, and cancel queued ones. Those stay queued in the table and are
+    reported by fail_interrupted_jobs on the next start, rather than failing
+    with "cannot schedule new futures after interpreter shutdown".
+    """
+    _executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_job_directory(property_id):
+    """Create the on-disk property layout (images/, videos/, text/) a job analyzes"""
+    prop_dir = os.path.join(JOBS_DIR, property_id, "property")
+    for sub in ("images", "videos", "text"):
+        os.makedirs(os.path.join(prop_dir, sub), exist_ok=True)
+    return prop_dir
+
+
+def remove_job_directory(job):
+    shutil.rmtree(os.path.dirname(job['property_dir']), ignore_errors=True)
+
+
+@INGEST_RUNNING.track_inprogress()
+def _run_analysis_job(job_id, main_agent, property_id, property_dir):
+    stages = {}
+
+    def progress(stage, status):
+        stages[stage] = status
+        update_job_stage(job_id, stage, status)
+
+    set_job_status(job_id, RUNNING)
+    try:
+        with span("ingestion_job", job_id=job_id, property_id=property_id):
+            profile = main_agent.analyze_property(property_dir, progress=progress)
+        profile['property_id'] = property_id
+        profile['created_at'] = datetime.datetime.now().isoformat()
+        set_job_status(job_id, COMPLETED, result=profile)
+    except Exception as e:
+        print(f"Ingestion job {job_id} failed: {e}")
+        for stage, status in stages.items():
+            if status == "running":
+                update_job_stage(job_id, stage, "failed")
+        set_job_status(job_id, FAILED, error=str(e))
+
+
+def submit_analysis_job(main_agent, property_id, property_dir, user_id, description):
+    """Queue analysis of a prepared property directory and return the job id"""
+    job_id = create_job(property_id, user_id, property_dir, description)
+    get_executor().submit(_run_analysis_job, job_id, main_agent, property_id, property_dir)
+    return job_id
+
+
+def register_completed_job(job, vector_store, created_by, main_agent=None):
+    """
+    Persist a completed job's profile and images, index it and clean up its
+    files. With main_agent and PROFILE_POLISH set, the profile prose is
+    rewritten in the background afterwards.
+
+    The job is claimed first, so concurrent calls (two API requests, or the
+    API and the app) register it once; the others raise JobNotRegistrable.
+    """
+    if not claim_job_for_registration(job['job_id']):
+        raise JobNotRegistrable(f"Job {job['job_id']} is not {COMPLETED} or is already being registered")
+    try:
+        with span("register", job_id=job['job_id'], property_id=job['property_id']):
+            property_id = _register_completed_job(job, vector_store, created_by)
+    except Exception:
+        set_job_status(job['job_id'], COMPLETED)  # release the claim so registration can be retried
+        raise
+    if main_agent is not None and PROFILE_POLISH:
+        get_executor().submit(polish_registered_property, main_agent, vector_store, property_id)
+    return property_id
+
+
+def polish_registered_property(main_agent, vector_store, property_id):
+    """Rewrite a registered property's profile prose with the LLM and re-index the changed sections"""
+    try:
+        with span("polish_job", property_id=property_id):
+            profile = json.loads(get_property_from_db(property_id)['analysis_json'])
+            polished = main_agent.polish_profile(profile)
+            if polished != profile:
+                update_property_analysis(property_id, polished)
+                index_property(vector_store, property_id)
+    except Exception as e:
+        # The rules-built profile is already registered; polishing is best effort
+        print(f"⚠️  Profile polish for {property_id} failed: {e}")
+
+
+def _register_completed_job(job, vector_store, created_by):
+    property_id = job['property_id']
+    profile = job['result']
+    img_dir = os.path.join(job['property_dir'], "images")
+
+    # Save property to database
+    with span("db.save_property"):
+        save_property_to_db(
+            property_id=property_id,
+            description=job['description'],
+            analysis_json=profile,
+            created_by=created_by
+        )
+
+    # Save images to database
+    with span("db.save_images") as s:
+        image_names = [name for name in sorted(os.listdir(img_dir)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+        all_variants = build_variants([os.path.join(img_dir, name) for name in image_names])
+        for image_name, variants in zip(image_names, all_variants):
+            if variants is None:
+                continue
+            save_image_to_db(property_id, image_name, variants["full"], variants["card"], variants["thumb"])
+            # dHash survives resizing, so the full variant hashes like the upload
+            record_image_hash(property_id, image_name, variants["full"])
+            s.incr("images")
+
+    # Add to vector store
+    index_property(vector_store, property_id)
+
+    set_job_status(job['job_id'], REGISTERED)
+    remove_job_directory(job)
+    return property_id
+
+
+def job_progress(job):
+    """Fraction of pipeline stages that have finished (done, skipped or failed)"""
+    stages = job['stages']
+    finished = sum(1 for status in stages.values() if status not in ("pending", "running"))
+    return finished / len(stages) if stages else 0.0
@@ -0,0 +1,77 @@
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+# Process-wide Prometheus metrics, served by GET /metrics in app.py.
+# Updating a metric is a lock plus an add, so these are safe to touch on
+# the hot path; anything that needs I/O is computed at scrape time instead.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SQLITE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+STAGE_SECONDS = Histogram(
+    "demonseller_stage_duration_seconds",
+    "Duration of traced pipeline stages (search, qdrant.search, agent.<name>, extract_frames...)",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+LLM_CALLS = Counter(
+    "demonseller_llm_calls_total",
+    "Gemini calls by agent and outcome (ok, error, rate_limited)",
+    ["agent", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "demonseller_llm_tokens_total",
+    "Gemini tokens by agent and direction (input, output)",
+    ["agent", "direction"],
+)
+STRUCTURED_OUTPUTS = Counter(
+    "demonseller_structured_outputs_total",
+    "Schema-validated agent replies by agent and outcome (ok, repaired, failed)",
+    ["agent", "outcome"],
+)
+CACHE_LOOKUPS = Counter(
+    "demonseller_cache_lookups_total",
+    "Cache lookups by cache and result (hit, miss)",
+    ["cache", "result"],
+)
+QDRANT_RETRIES = Counter(
+    "demonseller_qdrant_retries_total",
+    "Qdrant retries by operation (connect, add, search)",
+    ["operation"],
+)
+SQLITE_QUERY_SECONDS = Histogram(
+    "demonseller_sqlite_query_duration_seconds",
+    "SQLite statement duration (including commit) by statement type",
+    ["statement"], buckets=SQLITE_BUCKETS,
+)
+INGEST_QUEUED = Gauge(
+    "demonseller_ingestion_queue_depth",
+    "Ingestion jobs waiting for a worker",
+)
+INGEST_RUNNING = Gauge(
+    "demonseller_ingestion_jobs_running",
+    "Ingestion jobs currently being analyzed",
+)
+EMAILS = Counter(
+    "demonseller_emails_total",
+    "Outbox deliveries by outcome (sent, retried, failed)",
+    ["outcome"],
+)
+DEDUPE_CHECKS = Counter(
+    "demonseller_dedupe_checks_total",
+    "Pre-analysis near-duplicate checks by result (duplicate, unique)",
+    ["result"],
+)
+HTTP_SECONDS = Histogram(
+    "demonseller_http_request_duration_seconds",
+    "API request duration by route and status",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+
+
+def is_rate_limit_error(error):
+    """True for Gemini/Qdrant quota and 429 errors"""
+    text = str(error).upper()
+    return any(token in text for token in ("429", "RATE_LIMIT", "RESOURCE_EXHAUSTED", "QUOTA"))
+
+
+def render_metrics():
+    """Current metrics in the Prometheus text exposition format: (body, content type)"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,207 @@
+"""
+Rules-based property profile builder.
+
+Turns the dict produced by MainAnalysisAgent.merge_analyses into the
+PropertyProfile fields (models/schemas.py) without another Gemini
+call: names are normalized (lower case, spaces, singular appliance names,
+common synonyms), and the name, summary, rent and prose fields are
+composed from the merged facts. The optional LLM prose pass
+(MainAnalysisAgent.polish_profile, PROFILE_POLISH) runs after registration.
+"""
+import os
+import re
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from models.schemas import PropertyProfile
+
+APPLIANCE_SYNONYMS = {
+    "ac": "air conditioner",
+    "a/c": "air conditioner",
+    "split ac": "air conditioner",
+    "window ac": "air conditioner",
+    "refrigerator": "fridge",
+    "television": "tv",
+    "led tv": "tv",
+    "washer": "washing machine",
+    "water heater": "geyser",
+    "cooktop": "stove",
+}
+
+# Every name the synonym table knows, so "acs" and "tvs" can lose their "s"
+KNOWN_APPLIANCES = set(APPLIANCE_SYNONYMS) | set(APPLIANCE_SYNONYMS.values())
+# Plural of an upper-case abbreviation: "ACs", "TVs", "A/Cs"
+_ABBREVIATION_PLURAL = re.compile(r"\b([A-Z][A-Z/]*[A-Z])s\b")
+
+# Shown in the UI and emails for empty profile fields. The profile itself
+# leaves them empty, so boilerplate never reaches the search index.
+NOT_AVAILABLE = "Not available"
+PLACEHOLDERS = {"rent": "Not specified", "contact_info": "Contact details not provided"}
+# Profile fields listed under "Key Features" on the search page and in emails
+SUMMARY_KEYS = ["property_location", "rent", "key_features", "amenities", "layout_and_condition"]
+
+
+def normalize_name(value):
+    """ "Living_Room " -> "living room" """
+    return re.sub(r"[\s_]+", " ", str(value)).strip().lower()
+
+
+def _singular(word):
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    # "boxes", "switches", "dishes", "glasses" (but "stoves", "houses" only lose the "s")
+    if word.endswith(("xes", "ches", "shes", "sses", "zzes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def normalize_appliance(value):
+    """Canonical appliance name: normalized, last word singular, synonyms folded before and after"""
+    name = normalize_name(_ABBREVIATION_PLURAL.sub(r"\1", str(value)))
+    if name in APPLIANCE_SYNONYMS:
+        return APPLIANCE_SYNONYMS[name]
+    words = name.split(" ")
+    words[-1] = _singular(words[-1])
+    name = " ".join(words)
+    if name.endswith("s") and name[:-1] in KNOWN_APPLIANCES:
+        name = name[:-1]  # short plurals _singular leaves alone: "acs", "split acs"
+    return APPLIANCE_SYNONYMS.get(name, name)
+
+
+def unique_names(values, normalize=normalize_name):
+    """Normalized values with duplicates and blanks removed, sorted (merge_analyses collects them in sets)"""
+    return sorted({normalize(value) for value in values or []} - {""})
+
+
+def bedroom_count(details, rooms):
+    """BHK from the size/type text ("2 BHK"), else the number of bedrooms listed"""
+    for text in (details.get("size"), details.get("type")):
+        match = re.search(r"(\d+)\s*-?\s*bhk", str(text or ""), re.IGNORECASE)
+        if match:
+            return int(match.group(1))
+    return sum(1 for room in rooms if "bedroom" in room) or None
+
+
+# A number with an optional multiplier: "25,000", "18k", "1.2 lakh"
+_AMOUNT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakhs?|lacs?|l)?\b", re.IGNORECASE)
+# Context that marks a number as the rent...
+_CURRENCY_BEFORE = re.compile(r"(₹|\brs\.?|\binr)\s*$", re.IGNORECASE)
+_RENT_BEFORE = re.compile(r"\brent\b[^\d,;]{0,20}$", re.IGNORECASE)
+_MONTH_AFTER = re.compile(r"^\s*(/\s*(month|mo)\b|per\s+month|a\s+month|monthly|p\.?\s?m\b)", re.IGNORECASE)
+# ...or as something else: a count or area ("3 months", "1 BHK"), or a
+# deposit ("deposit ₹50,000", "1 lakh deposit" unless it says "rent 20000 deposit ...")
+_NOT_MONEY_AFTER = re.compile(
+    r"^\s*(?:(?:bhk|bed\w*|bath\w*|months?|years?|yrs?|sq\w*|square|floors?|km|mins?)\b|%)", re.IGNORECASE
+)
+_DEPOSIT_BEFORE = re.compile(r"\b(deposit|advance|maintenance)\b[^\d,;]{0,20}$", re.IGNORECASE)
+_DEPOSIT_AFTER = re.compile(r"^\s*(deposit|advance|maintenance)\b", re.IGNORECASE)
+
+
+def format_rent(value):
+    """
+    Monthly rent as "₹25,000 per month" ("20k", "1.2 lakh" understood).
+
+    Amounts next to ₹/Rs/INR, "rent" or "per month" win; otherwise the one
+    amount of at least ₹1,000 that is not a deposit, BHK or area. The raw
+    text is returned when no amount or more than one is left, and "" when
+    there is no rent at all.
+    """
+    text = str(value or "").strip()
+    if not text:
+        return ""
+    anchored, plausible = set(), set()
+    for match in _AMOUNT.finditer(text):
+        before, after = text[:match.start()], text[match.end():]
+        rent_before = _RENT_BEFORE.search(before)
+        if _NOT_MONEY_AFTER.match(after) or _DEPOSIT_BEFORE.search(before) \
+                or (_DEPOSIT_AFTER.match(after) and not rent_before):
+            continue
+        amount = float(match.group(1).replace(",", ""))
+        unit = (match.group(2) or "").lower()
+        if unit in ("k", "thousand"):
+            amount *= 1000
+        elif unit:
+            amount *= 100000
+        if rent_before or _CURRENCY_BEFORE.search(before) or _MONTH_AFTER.match(after):
+            anchored.add(amount)
+        elif amount >= 1000:
+            plausible.add(amount)
+    amounts = anchored or plausible
+    if len(amounts) != 1:
+        return text
+    amount = amounts.pop()
+    if amount >= 100000:
+        return f"₹{amount / 100000:.2f} Lakh per month"
+    return f"₹{amount:,.0f} per month"
+
+
+def _sentence(text):
+    text = str(text or "").strip()
+    if text and text[-1] not in ".!?":
+        text += "."
+    return text[:1].upper() + text[1:]
+
+
+def display_fields(profile, keys):
+    """{key: value} of a profile for display, with a placeholder for empty fields"""
+    return {key: profile.get(key) or PLACEHOLDERS.get(key, NOT_AVAILABLE) for key in keys}
+
+
+def build_profile(merged):
+    """
+    The property profile (PropertyProfile.to_dict()) of a merge_analyses() result.
+    Fields with nothing to say are left empty.
+    """
+    details = {normalize_name(k): v for k, v in (merged.get("Property details") or {}).items() if v}
+    rooms = unique_names(merged.get("rooms"))
+    appliances = {}
+    for name, count in (merged.get("appliances") or {}).items():
+        key = normalize_appliance(name)
+        appliances[key] = max(appliances.get(key, 0), int(count or 0))
+    features = unique_names(merged.get("features"))
+    amenities = unique_names(merged.get("Available amenities and facilities"))
+    landmarks = unique_names(merged.get("location_details"), normalize=lambda v: str(v).strip())
+
+    property_type = str(details.get("type") or "property").strip()
+    location = str(details.get("location") or "").strip()
+    bedrooms = bedroom_count(details, rooms)
+    rent = format_rent(details.get("price") or details.get("rent"))
+
+    name = f"{bedrooms}BHK {property_type.title()}" if bedrooms else property_type.title()
+    if location:
+        name += f" in {location}"
+
+    summary = [_sentence(
+        " ".join(p for p in [
+            f"{bedrooms}BHK" if bedrooms else "",
+            property_type,
+            f"of {details['size']}" if details.get("size") and "bhk" not in str(details["size"]).lower() else "",
+            f"in {location}" if location else "",
+        ] if p)
+    )]
+    highlights = features[:3] + [a for a in amenities if a not in features][:2]
+    if highlights:
+        summary.append(_sentence("Highlights: " + ", ".join(highlights)))
+    if rent:
+        summary.append(_sentence(f"Rent {rent}"))
+
+    layout = " ".join(_sentence(merged.get(key)) for key in ("layout", "condition", "space_quality") if merged.get(key))
+    additional = sorted({str(v).strip() for v in merged.get("Additional relevant information") or []} - {""})
+
+    profile = PropertyProfile(
+        property_name=name,
+        property_location=location,
+        property_summary=" ".join(summary),
+        rooms=rooms,
+        appliances=appliances,
+        key_features=features,
+        amenities=amenities,
+        layout_and_condition=layout,
+        location_insights=_sentence("Nearby: " + ", ".join(landmarks)) if landmarks else "",
+        rules_and_restrictions=str(merged.get("Property rules and restrictions") or ""),
+        contact_info=str(merged.get("Contact information for inquiries") or ""),
+        additional_info="; ".join(additional),
+        rent=rent,
+    )
+    return profile.to_dict()
@@ -0,0 +1,91 @@
+"""
+Incremental re-indexing of registered properties.
+
+Each property's vector store document is built from its properties row and
+hashed (together with the chunking mode); the hash is stored in
+properties.index_hash once the document is written. `reindex` re-embeds
+only the properties whose hash differs, i.e. whose analysis or description
+changed since the last sync, plus any that were never indexed. Point ids are
+deterministic, so a re-indexed property replaces its points.
+
+Usage:
+    python -m components.utils.reindexUtil [--all] [--dry-run]
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from components.database.propdb import get_property_from_db, get_properties_for_index, set_property_index_hash
+from components.utils.traceUtil import span
+
+
+def property_document(row):
+    """The vector store document of a properties row"""
+    return {
+        "id": row["property_id"],
+        "property_id": row["property_id"],
+        "text_description": json.dumps(json.loads(row["analysis_json"]), ensure_ascii=False),
+        "description": row["description"],
+        "created_at": row["created_at"],
+    }
+
+
+def index_hash(document, chunking):
+    """sha256 of a document and the chunking mode it is indexed with"""
+    payload = json.dumps({"chunking": chunking, "document": document}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def index_property(vector_store, property_id):
+    """Write one registered property to the vector store and record its index hash"""
+    row = get_property_from_db(property_id)
+    document = property_document(row)
+    vector_store.add_documents([document])
+    set_property_index_hash(property_id, index_hash(document, vector_store.chunking))
+
+
+def reindex(vector_store, force=False, dry_run=False):
+    """
+    Re-embed properties whose index hash is missing or out of date (every
+    property with force=True). Returns {"checked", "reindexed", "failed"}.
+    """
+    stats = {"checked": 0, "reindexed": 0, "failed": 0}
+    with span("reindex", force=force, dry_run=dry_run) as s:
+        for row in get_properties_for_index():
+            stats["checked"] += 1
+            document = property_document(row)
+            new_hash = index_hash(document, vector_store.chunking)
+            if not force and row["index_hash"] == new_hash:
+                continue
+            if dry_run:
+                print(f"🔁 Would re-index {row['property_id']}")
+                stats["reindexed"] += 1
+                continue
+            try:
+                vector_store.add_documents([document])
+                set_property_index_hash(row["property_id"], new_hash)
+                stats["reindexed"] += 1
+                print(f"🔁 Re-indexed {row['property_id']}")
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ Could not re-index {row['property_id']}: {e}")
+        s.set(**stats)
+    return stats
+
+
+if __name__ == "__main__":
+    import dotenv
+    from components.database.dbmanager import init_db, DB_NAME
+    from components.utils.resourceUtil import build_vector_store
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="re-embed every property, changed or not")
+    parser.add_argument("--dry-run", action="store_true", help="only list the properties that would be re-indexed")
+    args = parser.parse_args()
+
+    dotenv.load_dotenv()
+    init_db(DB_NAME)
+    stats = reindex(build_vector_store(), force=args.all, dry_run=args.dry_run)
+    print(f"✅ Checked {stats['checked']}, re-indexed {stats['reindexed']}, failed {stats['failed']}")
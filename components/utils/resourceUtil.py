@@ -0,0 +1,117 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Seconds a successful Qdrant health check is trusted before it is re-run
+HEALTH_CHECK_MAX_AGE = 30
+
+
+def _optional_env(name, cast):
+    """os.getenv(name) converted with cast, or None when unset/empty"""
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+def vector_index_options():
+    """
+    Collection and search settings for large collections (see
+    models/collectionConfig.py): VECTOR_QUANTIZATION (none, scalar, binary),
+    VECTOR_ON_DISK, HNSW_M and HNSW_EF_CONSTRUCT apply when the collection is
+    created; SEARCH_HNSW_EF, SEARCH_OVERSAMPLING and SEARCH_RESCORE per query.
+    """
+    return {
+        "quantization": os.getenv("VECTOR_QUANTIZATION", "none"),
+        "on_disk": os.getenv("VECTOR_ON_DISK", "false").lower() == "true",
+        "hnsw_m": _optional_env("HNSW_M", int),
+        "hnsw_ef_construct": _optional_env("HNSW_EF_CONSTRUCT", int),
+        "search_ef": _optional_env("SEARCH_HNSW_EF", int),
+        "oversampling": _optional_env("SEARCH_OVERSAMPLING", float),
+        "rescore": _optional_env("SEARCH_RESCORE", lambda v: v.lower() == "true"),
+    }
+
+
+def build_main_agent():
+    """Create the multi-modal analysis agent (image, video, text and merge agents)"""
+    from agents import MainAnalysisAgent
+    return MainAnalysisAgent()
+
+
+def build_vector_store():
+    """
+    Create the Qdrant vector store client from environment configuration.
+
+    VECTOR_BACKEND picks auto (default), cloud, local or memory;
+    VECTOR_LOCAL_PATH is the local index directory and QDRANT_CONNECT_TIMEOUT
+    how long auto waits for the cloud before falling back to it.
+    """
+    from models import QdrantVectorStoreClient
+    return QdrantVectorStoreClient(
+        url=os.getenv("url"),
+        api_key=os.getenv("api_key"),
+        collection=os.getenv("collection"),
+        google_api_key=os.getenv("google_api_key"),
+        backend=os.getenv("VECTOR_BACKEND", "auto"),
+        location=os.getenv("VECTOR_LOCAL_PATH"),
+        connect_timeout=float(os.getenv("QDRANT_CONNECT_TIMEOUT", "5")),
+        chunking=os.getenv("VECTOR_CHUNKING", "sections"),
+        aggregate=os.getenv("VECTOR_AGGREGATE", "max"),
+        **vector_index_options(),
+    )
+
+
+def resync_local_index():
+    """Push the local index to the Qdrant server configured by `url`/`api_key`"""
+    from models import QdrantVectorStoreClient
+    local = QdrantVectorStoreClient(
+        url=None,
+        api_key=None,
+        collection=os.getenv("collection"),
+        google_api_key=os.getenv("google_api_key"),
+        backend="local",
+        location=os.getenv("VECTOR_LOCAL_PATH"),
+        **vector_index_options(),
+    )
+    return local.resync_to_cloud(os.getenv("url"), os.getenv("api_key"))
+
+
+def build_async_vector_store(vector_store):
+    """
+    Create the pooled async client for a cloud-backed vector store, or None
+    for the embedded backends (their directory is already held open by
+    vector_store). QDRANT_HTTP2, QDRANT_PREFER_GRPC, QDRANT_MAX_CONNECTIONS
+    and QDRANT_KEEPALIVE_EXPIRY tune the shared connection.
+    """
+    if getattr(vector_store, "backend", None) != "cloud":
+        return None
+    from models import AsyncQdrantVectorStoreClient
+    return AsyncQdrantVectorStoreClient(
+        url=vector_store.url,
+        api_key=vector_store.api_key,
+        collection=vector_store.collection,
+        google_api_key=os.getenv("google_api_key"),
+        prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
+        http2=os.getenv("QDRANT_HTTP2", "true").lower() == "true",
+        max_connections=int(os.getenv("QDRANT_MAX_CONNECTIONS", "100")),
+        keepalive_expiry=float(os.getenv("QDRANT_KEEPALIVE_EXPIRY", "30")),
+        chunking=vector_store.chunking,
+        aggregate=vector_store.aggregate,
+        **vector_index_options(),
+    )
+
+
+def build_search_agent(vector_store, async_vector_store=None):
+    """Create the search agent on top of existing vector store clients"""
+    from agents import PropertySearchAgent
+    return PropertySearchAgent(vector_store, async_vector_store)
+
+
+def vector_store_is_healthy(vector_store):
+    """
+    Re-validate a shared vector store, reusing recent successful checks. An
+    unhealthy one is closed before it is replaced, so the rebuild can open
+    the local index directory it held.
+    """
+    if vector_store.health_check(max_age=HEALTH_CHECK_MAX_AGE):
+        return True
+    vector_store.close()
+    return False
@@ -0,0 +1,103 @@
+"""
+Buffered search history logging.
+
+log_search() only appends a row to an in-process buffer, so a search never
+waits on an SQLite commit. A background thread writes the buffer to
+search_history in one transaction once SEARCH_LOG_BATCH rows are waiting
+or SEARCH_LOG_FLUSH_SECONDS after the oldest one arrived, and
+flush_search_log() runs at interpreter exit. Rows that fail to write are
+kept for the next flush, up to SEARCH_LOG_MAX_PENDING.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import datetime
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from components.database.propdb import save_search_history
+
+SEARCH_LOG_BATCH = int(os.getenv("SEARCH_LOG_BATCH", "50"))
+SEARCH_LOG_FLUSH_SECONDS = float(os.getenv("SEARCH_LOG_FLUSH_SECONDS", "2"))
+SEARCH_LOG_MAX_PENDING = int(os.getenv("SEARCH_LOG_MAX_PENDING", "10000"))
+
+
+class SearchLogBuffer:
+    def __init__(self, batch_size=SEARCH_LOG_BATCH, flush_seconds=SEARCH_LOG_FLUSH_SECONDS,
+                 max_pending=SEARCH_LOG_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._rows = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def add(self, row):
+        with self._condition:
+            self._rows.append(row)
+            if len(self._rows) > self.max_pending:
+                dropped = len(self._rows) - self.max_pending
+                del self._rows[:dropped]
+                print(f"⚠️  Search log backlog full, dropped {dropped} oldest row(s)")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="search-log", daemon=True)
+                self._thread.start()
+            if len(self._rows) >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._rows:
+                    self._condition.wait()
+                if len(self._rows) < self.batch_size:
+                    self._condition.wait(self.flush_seconds)
+            if not self.flush():
+                time.sleep(self.flush_seconds)  # the write failed; back off before retrying
+
+    def flush(self):
+        """Write every buffered row in one transaction; returns how many were written"""
+        with self._flush_lock:
+            with self._condition:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                save_search_history(rows)
+            except Exception as e:
+                print(f"⚠️  Could not write {len(rows)} search log row(s): {e}")
+                with self._condition:
+                    self._rows[:0] = rows[-self.max_pending:]
+                return 0
+            return len(rows)
+
+
+_buffer = SearchLogBuffer()
+atexit.register(_buffer.flush)
+
+
+def log_search(user_id, query, results, k=None, timings=None, source="app"):
+    """
+    Buffer a search_history row: the query, k, per-stage latency and the
+    returned property ids. user_id is None for anonymous searches.
+    """
+    timings = timings or {}
+    _buffer.add((
+        user_id,
+        query,
+        len(results),
+        k,
+        timings.get("retrieve_ms"),
+        timings.get("rerank_ms"),
+        timings.get("total_ms"),
+        json.dumps([result.get("property_id") for result in results]),
+        source,
+        datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+    ))
+
+
+def flush_search_log():
+    """Write buffered search history now (shutdown hooks, tests)"""
+    return _buffer.flush()
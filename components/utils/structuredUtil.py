@@ -0,0 +1,68 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from models.schemas import parse_structured, StructuredOutputError
+from components.utils.traceUtil import span, run_agent, arun_agent
+from components.utils.metricsUtil import STRUCTURED_OUTPUTS
+
+# Schema-constrained agent calls. The agent is created with
+# response_model=schema, so Gemini already returns schema-shaped JSON; a
+# reply that still fails validation gets exactly one text-only repair call
+# (no images are re-sent) before the call is reported as failed.
+
+
+def _repair_prompt(content, error, schema):
+    return (
+        f"Your previous reply did not match the required {schema.__name__} JSON schema.\n"
+        f"Validation error: {error}\n"
+        "Return the same information as a single JSON object that matches the schema, with no other text.\n"
+        f"Previous reply:\n{content}"
+    )
+
+
+def _outcome(s, name, outcome):
+    STRUCTURED_OUTPUTS.labels(name, outcome).inc()
+    s.set(outcome=outcome)
+    if outcome != "ok":
+        s.incr("parse_failures")
+
+
+def run_structured(agent, message, schema, **kwargs):
+    """
+    run_agent() and validate the reply against `schema`, with one bounded
+    repair retry. Returns the schema instance; raises StructuredOutputError.
+    """
+    name = getattr(agent, "name", None) or "run"
+    with span(f"structured.{name}", schema=schema.__name__) as s:
+        response = run_agent(agent, message, **kwargs)
+        result, error = parse_structured(response.content, schema)
+        if result is not None:
+            _outcome(s, name, "ok")
+            return result
+        print(f"⚠️  {name} reply did not match {schema.__name__}, asking for a repair: {error}")
+        response = run_agent(agent, _repair_prompt(response.content, error, schema))
+        result, error = parse_structured(response.content, schema)
+        if result is not None:
+            _outcome(s, name, "repaired")
+            return result
+        _outcome(s, name, "failed")
+        raise StructuredOutputError(f"{name} reply does not match {schema.__name__}: {error}")
+
+
+async def arun_structured(agent, message, schema, **kwargs):
+    """Awaitable run_structured(), using agent.arun()"""
+    name = getattr(agent, "name", None) or "run"
+    with span(f"structured.{name}", schema=schema.__name__) as s:
+        response = await arun_agent(agent, message, **kwargs)
+        result, error = parse_structured(response.content, schema)
+        if result is not None:
+            _outcome(s, name, "ok")
+            return result
+        print(f"⚠️  {name} reply did not match {schema.__name__}, asking for a repair: {error}")
+        response = await arun_agent(agent, _repair_prompt(response.content, error, schema))
+        result, error = parse_structured(response.content, schema)
+        if result is not None:
+            _outcome(s, name, "repaired")
+            return result
+        _outcome(s, name, "failed")
+        raise StructuredOutputError(f"{name} reply does not match {schema.__name__}: {error}")
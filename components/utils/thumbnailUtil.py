@@ -0,0 +1,66 @@
+"""
+Image variants generated once, when a property is registered.
+
+Every registered photo is decoded once and stored in three renditions
+(IMAGE_VARIANTS in imageUtil.py): "full" in property_images.image_data,
+a WebP "card" for the search result grid and a JPEG "thumb" for emails.
+Readers ask get_property_image_variants() for the smallest one that fits.
+
+Usage (generate variants for images registered before they existed):
+    python -m components.utils.thumbnailUtil --backfill
+"""
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from components.database.propdb import get_images_without_variants, save_image_variants
+from components.utils.imageUtil import make_variants
+
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", "4"))
+
+
+def _variants_of(path):
+    try:
+        with open(path, "rb") as f:
+            return make_variants(f.read())
+    except Exception as e:
+        print(f"⚠️  Skipping unreadable image {path}: {e}")
+        return None
+
+
+def build_variants(image_paths):
+    """make_variants() for each image file on a worker pool; None for unreadable images"""
+    with ThreadPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants") as pool:
+        return list(pool.map(_variants_of, image_paths))
+
+
+def backfill_image_variants():
+    """Generate card/thumb variants from the stored full image; returns how many images were updated"""
+    rows = get_images_without_variants()
+
+    def backfill(row):
+        try:
+            variants = make_variants(row['image_data'])
+            save_image_variants(row['id'], variants['card'], variants['thumb'])
+            return 1
+        except Exception as e:
+            print(f"⚠️  Could not build variants for {row['property_id']}/{row['image_name']}: {e}")
+            return 0
+
+    with ThreadPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variants") as pool:
+        return sum(pool.map(backfill, rows))
+
+
+if __name__ == "__main__":
+    from components.database.dbmanager import init_db, DB_NAME
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backfill", action="store_true", help="build variants for images that have none")
+    args = parser.parse_args()
+
+    init_db(DB_NAME)
+    if args.backfill:
+        print(f"✅ Built variants for {backfill_image_variants()} images")
+    else:
+        parser.print_help()
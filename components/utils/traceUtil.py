@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from components.utils.metricsUtil import STAGE_SECONDS, LLM_CALLS, LLM_TOKENS, is_rate_limit_error
+
+# Lightweight tracing for the ingestion and search pipeline. Every span
+# records its duration plus whatever counters the caller sets (tokens,
+# images, retries) and is appended as one JSON line to TRACE_FILE. Spans
+# opened inside another span in the same thread or asyncio task become its
+# children, so one ingestion job reads as a tree: analyze_property > analyze_video > extract_frames.
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+
+_current = ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name, parent=None, **attrs):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = dict(attrs)
+
+    def set(self, **attrs):
+        """Set (or overwrite) span attributes"""
+        self.attrs.update(attrs)
+
+    def incr(self, key, amount=1):
+        """Add to a numeric span attribute, e.g. retries or tokens"""
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+
+def current_span():
+    """The innermost open span in this thread or asyncio task, or None"""
+    return _current.get()
+
+
+def _export(record):
+    line = json.dumps(record, default=str)
+    with _write_lock:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block as a span; yields the Span so callers can add attributes"""
+    s = Span(name, current_span(), **attrs)
+    token = _current.set(s)
+    started_at = datetime.datetime.now().isoformat()
+    start = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield s
+    except BaseException as e:
+        status, error = "error", str(e)[:500]
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+        STAGE_SECONDS.labels(name).observe(duration_ms / 1000)
+        if TRACING_ENABLED:
+            try:
+                _export({
+                    "trace_id": s.trace_id,
+                    "span_id": s.span_id,
+                    "parent_id": s.parent_id,
+                    "name": name,
+                    "started_at": started_at,
+                    "duration_ms": round(duration_ms, 3),
+                    "status": status,
+                    "error": error,
+                    "attrs": s.attrs,
+                })
+            except OSError as e:
+                print(f"Could not write trace span {name}: {e}")
+
+
+def traced(name):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _metric_total(metrics, key):
+    value = (metrics or {}).get(key, 0)
+    if isinstance(value, (list, tuple)):
+        return sum(v for v in value if isinstance(v, (int, float)))
+    return value if isinstance(value, (int, float)) else 0
+
+
+def run_agent(agent, message, **kwargs):
+    """
+    agent.run() inside an "agent.<name>" span carrying the prompt/response
+    token counts from the run's metrics.
+    """
+    name = getattr(agent, "name", None) or "run"
+    with span(f"agent.{name}") as s:
+        try:
+            response = agent.run(message, **kwargs)
+        except Exception as e:
+            LLM_CALLS.labels(name, "rate_limited" if is_rate_limit_error(e) else "error").inc()
+            raise
+        LLM_CALLS.labels(name, "ok").inc()
+        _record_usage(s, name, response, kwargs)
+        return response
+
+
+async def arun_agent(agent, message, **kwargs):
+    """Awaitable run_agent(), using agent.arun()"""
+    name = getattr(agent, "name", None) or "run"
+    with span(f"agent.{name}") as s:
+        try:
+            response = await agent.arun(message, **kwargs)
+        except Exception as e:
+            LLM_CALLS.labels(name, "rate_limited" if is_rate_limit_error(e) else "error").inc()
+            raise
+        LLM_CALLS.labels(name, "ok").inc()
+        _record_usage(s, name, response, kwargs)
+        return response
+
+
+def _record_usage(s, name, response, kwargs):
+    metrics = getattr(response, "metrics", None)
+    s.set(
+        input_tokens=_metric_total(metrics, "input_tokens"),
+        output_tokens=_metric_total(metrics, "output_tokens"),
+    )
+    LLM_TOKENS.labels(name, "input").inc(s.attrs["input_tokens"])
+    LLM_TOKENS.labels(name, "output").inc(s.attrs["output_tokens"])
+    if kwargs.get("images"):
+        s.set(images=len(kwargs["images"]))
+
+
+def load_spans(path=None, limit=5000):
+    """Read the most recent `limit` spans from the JSONL sink"""
+    path = path or TRACE_FILE
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()[-limit:]
+    spans = []
+    for line in lines:
+        try:
+            spans.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return spans
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize_spans(spans):
+    """Per span name: count, errors, p50/p95/max duration, token, retry and parse-failure totals"""
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+    summary = []
+    for name, group in sorted(by_name.items()):
+        durations = sorted(s["duration_ms"] for s in group)
+        attrs = [s.get("attrs") or {} for s in group]
+        summary.append({
+            "span": name,
+            "count": len(group),
+            "errors": sum(1 for s in group if s.get("status") == "error"),
+            "p50_ms": round(_percentile(durations, 50), 1),
+            "p95_ms": round(_percentile(durations, 95), 1),
+            "max_ms": round(durations[-1], 1),
+            "input_tokens": sum(a.get("input_tokens", 0) for a in attrs),
+            "output_tokens": sum(a.get("output_tokens", 0) for a in attrs),
+            "retries": sum(a.get("retries", 0) for a in attrs),
+            "parse_failures": sum(a.get("parse_failures", 0) for a in attrs),
+        })
+    return summary
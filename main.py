@@ -1,39 +1,26 @@
 import sys
 import os
-import json
 import dotenv
 import streamlit as st
 import time 
 from streamlit_option_menu import option_menu
-import pandas as pd
 dotenv.load_dotenv()
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agents.mainAgent import MainAnalysisAgent
-from agents.searchAgent import PropertySearchAgent
-from models.vectorStore import QdrantVectorStoreClient 
 from components.css.css import CSS
-from components.database.dbmanager import init_db
-from components.utils.auth import logout_user , TOKEN_FILE 
-from components.screens.registerpage import register_property_page
-from components.screens.proppage import search_properties_page
-from components.screens.dashboard import dashboard_page
-from  components.screens.adminpage import admin_panel_page
+from components.utils.cachedResources import (
+    init_database, get_email_sender, get_main_agent, get_vector_store, get_search_agent,
+)
+from components.utils.auth import logout_user, get_session, SESSION_TIMEOUT
 from components.screens.loginpage import login_page 
+# Other pages are imported when first routed to, so the login page
+# never waits on pandas / plotly / the agent stack.
 
 DB_NAME = "property_manager.db"
-init_db(DB_NAME)
-
+init_database(DB_NAME)
+get_email_sender()
 
-
-# Initialize Agents & Vector Store
-main_agent = MainAnalysisAgent()
-vector_store = QdrantVectorStoreClient(
-    url=os.getenv("url"),
-    api_key=os.getenv("api_key"),
-    collection=os.getenv("collection"),
-    google_api_key=os.getenv("google_api_key"),
-)
-search_agent = PropertySearchAgent(vector_store)
+# Agents & Vector Store are process-wide cached resources, built lazily
+# by the pages that need them (see components/utils/cachedResources.py)
 
 # Streamlit Config & Styles
 st.set_page_config(page_title="Flat Seller System", page_icon="🏠", layout="wide")
@@ -48,6 +35,8 @@ if 'analysis_result' not in st.session_state:
     st.session_state.analysis_result = None
 if 'property_id' not in st.session_state:
     st.session_state.property_id = None
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None
 if 'search_results' not in st.session_state:
     st.session_state.search_results = None
 if 'search_query' not in st.session_state:
@@ -74,29 +63,23 @@ def main():
     # If not authenticated but has valid token, restore session
     if not st.session_state.get("authenticated") and token:
         try:
-            with open(TOKEN_FILE, "r") as f:
-                token_map = json.load(f)
-            if token in token_map:
-                user_data = token_map[token]
-                # Check if token is expired
-                if time.time() < user_data.get("expires_at", 0):
-                    st.session_state.user = user_data
-                    st.session_state.authenticated = True
-                    st.session_state.token = token
-                    st.session_state.login_time = time.time()
-                    st.rerun()
-                else:
-                    # Token expired, remove it
-                    del token_map[token]
-                    with open(TOKEN_FILE, "w") as f:
-                        json.dump(token_map, f)
+            session = get_session(token)
+            if session:
+                user_data, expires_at = session
+                st.session_state.user = user_data
+                st.session_state.authenticated = True
+                st.session_state.token = token
+                st.session_state.login_time = expires_at - SESSION_TIMEOUT
+                st.rerun()
+            else:
+                del st.query_params["token"]  # expired or logged out elsewhere
         except Exception as e:
             st.error("Session recovery failed. Please log in again.")
             print("Token error:", e)
 
     # Check session timeout (1 hour)
     if st.session_state.get("authenticated") and st.session_state.get("login_time"):
-        if time.time() - st.session_state.login_time > 3600:  # 1 hour timeout
+        if time.time() - st.session_state.login_time > SESSION_TIMEOUT:
             logout_user(st.session_state.token)
             st.session_state.authenticated = False
             st.session_state.user = None
@@ -139,12 +122,16 @@ def main():
         
         # Page routing
         if selected == "🏠 Dashboard":
+            from components.screens.dashboard import dashboard_page
             dashboard_page()
         elif selected == "📝 Register Property":
-            register_property_page(main_agent,vector_store)
+            from components.screens.registerpage import register_property_page
+            register_property_page(get_main_agent(), get_vector_store())
         elif selected == "🔍 Search Properties":
-            search_properties_page(search_agent)
+            from components.screens.proppage import search_properties_page
+            search_properties_page(get_search_agent())
         elif selected == "⚙️ Admin" and st.session_state.user['role'] == 'admin':
+            from components.screens.adminpage import admin_panel_page
             st.header("Admin Panel")
             admin_panel_page()  # You would create this function
 
@@ -0,0 +1,22 @@
+"""
+Model and vector store objects are resolved on first attribute access, so
+importing the package does not pull in langchain, qdrant_client or agno.
+"""
+import importlib
+
+_LAZY_EXPORTS = {
+    "model": "models.gemini",
+    "QdrantVectorStoreClient": "models.vectorStore",
+    "AsyncQdrantVectorStoreClient": "models.asyncVectorStore",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,230 @@
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import PointStruct, PayloadSchemaType, FilterSelector
+from qdrant_client.http.exceptions import ResponseHandlingException
+from langchain.schema import Document
+import os
+import sys
+import time
+import asyncio
+import httpx
+from typing import Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.vectorStore import (
+    TracedEmbeddings, build_documents, changed_documents, stale_points_filter, metadata_filter, to_search_result,
+)
+from models.chunking import chunks_to_fetch, group_by_property
+from models.collectionConfig import collection_settings, search_settings
+from components.utils.traceUtil import span
+from components.utils.metricsUtil import QDRANT_RETRIES, CACHE_LOOKUPS
+
+
+class AsyncQdrantVectorStoreClient:
+    """
+    Awaitable counterpart of QdrantVectorStoreClient for the API and batch
+    pipelines. One AsyncQdrantClient (one pooled HTTP/2 or gRPC connection)
+    is reused for every call, so many searches and upserts can be in flight
+    on a single event loop.
+
+    Points are written in the same layout as the LangChain wrapper
+    (page_content / metadata payload), so both clients share a collection.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        collection: str,
+        google_api_key: str,
+        prefer_grpc: bool = False,
+        timeout: int = 60,
+        http2: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        location: Optional[str] = None,
+        embeddings=None,
+        chunking: str = "sections",
+        aggregate: str = "max",
+        quantization: str = "none",
+        on_disk: bool = False,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        search_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None
+    ):
+        """
+        Args:
+            url: Qdrant Cloud URL
+            api_key: Qdrant Cloud API key
+            collection: Collection name
+            google_api_key: Google API key for embeddings
+            prefer_grpc: Use one gRPC channel instead of REST
+            timeout: Request timeout in seconds
+            http2: Multiplex REST requests over one HTTP/2 connection
+            max_connections: Upper bound on pooled REST connections
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            location: ":memory:" for qdrant-client's in-process mode
+            embeddings: LangChain Embeddings to use instead of Gemini
+                text-embedding-004
+            chunking: "sections" or "single" (see models/chunking.py)
+            aggregate: "max" or "weighted" per-property score
+            quantization, on_disk, hnsw_m, hnsw_ef_construct: settings of a
+                new collection (see models/collectionConfig.py)
+            search_ef, oversampling, rescore: per-query search settings
+        """
+        self.collection = collection
+        self.chunking = chunking
+        self.aggregate = aggregate
+        self.collection_settings = collection_settings(quantization, on_disk, hnsw_m, hnsw_ef_construct)
+        self.search_params = search_settings(search_ef, oversampling, rescore)
+        self.backend = "memory" if location == ":memory:" else "cloud"
+        self._last_healthy_at = float("-inf")
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
+
+        if location == ":memory:":
+            self.client = AsyncQdrantClient(location=":memory:")
+        else:
+            self.client = AsyncQdrantClient(
+                url=url.replace(":6333", "") if url else url,
+                api_key=api_key,
+                prefer_grpc=prefer_grpc,
+                timeout=timeout,
+                http2=http2 and not prefer_grpc,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+            )
+
+        self.embeddings = TracedEmbeddings(embeddings or GoogleGenerativeAIEmbeddings(
+            model="models/text-embedding-004",
+            google_api_key=google_api_key
+        ))
+
+    async def _ensure_ready(self):
+        """Create the collection on first use"""
+        if self._ready:
+            return
+        async with self._ready_lock:
+            if self._ready:
+                return
+            if not await self.client.collection_exists(self.collection):
+                print(f"📝 Creating collection: {self.collection}")
+                await self.client.create_collection(collection_name=self.collection, **self.collection_settings)
+            if self.backend == "cloud":
+                await self.client.create_payload_index(
+                    collection_name=self.collection,
+                    field_name="metadata.property_id",
+                    field_schema=PayloadSchemaType.KEYWORD,
+                )
+            self._ready = True
+            self._last_healthy_at = time.monotonic()
+
+    async def add_documents(self, items: list[dict]) -> list[str]:
+        """
+        Embed and upsert property dicts, retrying on rate limits. Like the
+        sync client, unchanged chunks are skipped and stale ones deleted.
+        """
+        if not items:
+            return []
+        await self._ensure_ready()
+        docs = build_documents(items, self.chunking)
+        ids = [d.metadata["point_id"] for d in docs]
+        with span("qdrant.add_documents", documents=len(docs)) as s:
+            existing = await self.client.retrieve(collection_name=self.collection, ids=ids, with_payload=True)
+            changed = changed_documents(docs, existing)
+            s.set(upserted=len(changed), unchanged=len(docs) - len(changed))
+            if changed:
+                vectors = await self.embeddings.aembed_documents([d.page_content for d in changed])
+                points = [
+                    PointStruct(
+                        id=doc.metadata["point_id"],
+                        vector=vector,
+                        payload={"page_content": doc.page_content, "metadata": doc.metadata},
+                    )
+                    for vector, doc in zip(vectors, changed)
+                ]
+                await self._retry_upsert(points, trace=s)
+            await self.client.delete(
+                collection_name=self.collection,
+                points_selector=FilterSelector(filter=stale_points_filter(docs)),
+            )
+            return ids
+
+    async def _retry_upsert(self, points: list[PointStruct], max_retries: int = 5, trace=None):
+        retries = 0
+        while True:
+            try:
+                await self.client.upsert(collection_name=self.collection, points=points)
+                return
+            except Exception as e:
+                err = str(e).upper()
+                retryable = isinstance(e, ResponseHandlingException) or any(
+                    tok in err for tok in ["429", "RATE_LIMIT", "QUOTA", "OVERLOADED", "TIMEOUT"]
+                )
+                if not retryable or retries >= max_retries:
+                    raise RuntimeError(f"Unable to add documents: {e}")
+                wait = 2**retries + 2
+                print(f"⏳ Upsert failed ({e}), waiting {wait} seconds...")
+                await asyncio.sleep(wait)
+                retries += 1
+                QDRANT_RETRIES.labels("add").inc()
+                if trace:
+                    trace.incr("retries")
+
+    async def similarity_search(self, query: str, k: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Embed the query and return the top-k properties (chunk hits grouped by property_id)"""
+        await self._ensure_ready()
+        with span("qdrant.search", k=k) as s:
+            vector = await self.embeddings.aembed_query(query)
+            max_search_retries = 3
+            for attempt in range(max_search_retries):
+                try:
+                    response = await self.client.query_points(
+                        collection_name=self.collection,
+                        query=vector,
+                        limit=chunks_to_fetch(k, self.chunking),
+                        query_filter=metadata_filter(filters),
+                        search_params=self.search_params,
+                        with_payload=True,
+                    )
+                    break
+                except (ResponseHandlingException, TimeoutError) as e:
+                    if attempt == max_search_retries - 1:
+                        raise RuntimeError(f"Search failed after {max_search_retries} attempts: {e}")
+                    wait_time = (attempt + 1) * 2
+                    print(f"⏳ Search failed, retrying in {wait_time} seconds...")
+                    await asyncio.sleep(wait_time)
+                    s.incr("retries")
+                    QDRANT_RETRIES.labels("search").inc()
+        results = []
+        for point in response.points:
+            payload = point.payload or {}
+            doc = Document(page_content=payload.get("page_content", ""), metadata=payload.get("metadata") or {})
+            results.append(to_search_result(doc, point.score))
+        return group_by_property(results, k, self.aggregate)
+
+    async def health_check(self, max_age: float = 0) -> bool:
+        """Check the connection, reusing a successful check younger than max_age seconds"""
+        if max_age and time.monotonic() - self._last_healthy_at < max_age:
+            CACHE_LOOKUPS.labels("vector_store_health", "hit").inc()
+            return True
+        if max_age:
+            CACHE_LOOKUPS.labels("vector_store_health", "miss").inc()
+        try:
+            await self.client.get_collections()
+            self._last_healthy_at = time.monotonic()
+            return True
+        except Exception as e:
+            print(f"❌ Health check failed: {e}")
+            self._last_healthy_at = float("-inf")
+            return False
+
+    async def close(self):
+        """Close the pooled connection"""
+        await self.client.close()
@@ -0,0 +1,118 @@
+"""
+Section-aware chunking of property documents and per-property collapsing
+of chunk-level search hits.
+
+A registered property is indexed as one chunk per section (details,
+amenities, location, rules, description) so each embedding covers one
+topic instead of the whole profile, plus a compact overview chunk of the
+most-queried facts so queries that span sections still have one close
+match. Searches fetch several chunks per wanted property and fold them
+back into one result per property_id (benchmarks/chunkRecall.py).
+"""
+import json
+
+# Profile keys (see PropertyProfile in models/schemas.py) that make up each section
+SECTIONS = {
+    "overview": ["property_name", "property_location", "rent", "key_features", "amenities", "rules_and_restrictions"],
+    "details": ["property_name", "property_summary", "rent", "rooms", "appliances", "layout_and_condition"],
+    "amenities": ["key_features", "amenities"],
+    "location": ["property_location", "location_insights"],
+    "rules": ["rules_and_restrictions", "contact_info"],
+    "description": ["description", "additional_info"],
+}
+
+# Relative weight of each section in the "weighted" aggregate
+SECTION_WEIGHTS = {"overview": 1.0, "details": 1.0, "amenities": 1.0, "location": 0.8, "rules": 0.6, "description": 0.6}
+
+CHUNKING_MODES = ("sections", "single")
+AGGREGATES = ("max", "weighted")
+
+
+def _format_value(value):
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v}" for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+def _profile_of(item):
+    """The analysis profile stored under text_description, as a dict (or None)"""
+    profile = item.get("text_description")
+    if isinstance(profile, str):
+        try:
+            profile = json.loads(profile)
+        except json.JSONDecodeError:
+            return None
+    return profile if isinstance(profile, dict) else None
+
+
+def flatten_item(item):
+    """The whole item as "key: value" lines (the single-chunk layout)"""
+    return "\n".join(f"{k}: {v}" for k, v in item.items()).strip()
+
+
+def chunk_property(item, mode="sections"):
+    """
+    Split a property item into [(section, text), ...].
+
+    Items without a parseable profile, and mode="single", produce one
+    "full" chunk holding the flattened item.
+    """
+    profile = _profile_of(item) if mode == "sections" else None
+    if profile is None:
+        text = flatten_item(item)
+        return [("full", text)] if text else []
+
+    fields = dict(profile)
+    if item.get("description"):
+        fields["description"] = item["description"]
+    title = fields.get("property_name") or item.get("property_id") or ""
+
+    chunks = []
+    for section, keys in SECTIONS.items():
+        lines = [f"{key}: {_format_value(fields[key])}" for key in keys if fields.get(key)]
+        if lines:
+            chunks.append((section, f"{title} ({section})\n" + "\n".join(lines)))
+    return chunks or [("full", flatten_item(item))]
+
+
+def chunks_to_fetch(k, mode="sections"):
+    """How many chunk hits to request so that about k distinct properties come back"""
+    return k * len(SECTIONS) if mode == "sections" else k
+
+
+def group_by_property(results, k, aggregate="max"):
+    """
+    Collapse chunk-level search results into the top-k properties.
+
+    aggregate="max" scores a property by its best chunk; "weighted" sums
+    SECTION_WEIGHTS-weighted chunk scores (normalised by the total weight),
+    so properties matching in several sections rank higher. Each property's
+    content is its matched chunks, best first.
+    """
+    by_property = {}
+    for r in results:
+        pid = r.get("property_id") or r.get("id")
+        by_property.setdefault(pid, []).append(r)
+
+    total_weight = sum(SECTION_WEIGHTS.values())
+    grouped = []
+    for pid, hits in by_property.items():
+        hits.sort(key=lambda h: h["score"], reverse=True)
+        if aggregate == "weighted":
+            score = sum(
+                SECTION_WEIGHTS.get(h["metadata"].get("section"), 1.0) * h["score"] for h in hits
+            ) / total_weight
+        else:
+            score = hits[0]["score"]
+        grouped.append({
+            "id": pid,
+            "property_id": pid,
+            "score": score,
+            "metadata": hits[0]["metadata"],
+            "sections": [h["metadata"].get("section", "full") for h in hits],
+            "content": "\n\n".join(h["content"] for h in hits),
+        })
+    grouped.sort(key=lambda g: g["score"], reverse=True)
+    return grouped[:k]
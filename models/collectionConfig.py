@@ -0,0 +1,70 @@
+"""
+Storage and search settings for large property collections.
+
+At hundreds of thousands of listings the float32 768-d vectors dominate
+memory (~3 KB each). Quantization keeps a compressed copy in RAM for the
+HNSW search while the originals can move to disk:
+  scalar - int8 per dimension, 4x smaller, near-lossless
+  binary - 1 bit per dimension, 32x smaller, needs oversampling + rescoring
+With rescoring, the top `limit * oversampling` candidates found on the
+quantized vectors are re-ranked with the original vectors. Trade-offs are
+measured by benchmarks/quantizationBench.py.
+
+These settings only take effect when a collection is created on a Qdrant
+server; the embedded local/memory backends use exact search and ignore them.
+"""
+from typing import Optional
+from qdrant_client.http.models import (
+    Distance, VectorParams, HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig,
+    ScalarType, BinaryQuantization, BinaryQuantizationConfig, SearchParams, QuantizationSearchParams,
+)
+
+VECTOR_SIZE = 768
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def collection_settings(
+    quantization: str = "none",
+    on_disk: bool = False,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+) -> dict:
+    """
+    Keyword arguments for client.create_collection().
+
+    on_disk stores the original vectors and the payloads on disk (the
+    quantized vectors, when enabled, stay in RAM); hnsw_m/hnsw_ef_construct
+    override Qdrant's graph defaults (16 / 100).
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"quantization must be one of {QUANTIZATION_MODES}")
+    settings = {
+        "vectors_config": VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE, on_disk=on_disk or None),
+    }
+    if on_disk:
+        settings["on_disk_payload"] = True
+    if hnsw_m is not None or hnsw_ef_construct is not None:
+        settings["hnsw_config"] = HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+    if quantization == "scalar":
+        settings["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif quantization == "binary":
+        settings["quantization_config"] = BinaryQuantization(
+            binary=BinaryQuantizationConfig(always_ram=True)
+        )
+    return settings
+
+
+def search_settings(
+    hnsw_ef: Optional[int] = None,
+    oversampling: Optional[float] = None,
+    rescore: Optional[bool] = None,
+) -> Optional[SearchParams]:
+    """SearchParams for a query (None keeps the server defaults)"""
+    quantization = None
+    if oversampling is not None or rescore is not None:
+        quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if hnsw_ef is None and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
@@ -0,0 +1,209 @@
+"""
+Response schemas for every Gemini call.
+
+Agents pass these as agno `response_model`, so Gemini returns JSON that is
+constrained to the schema instead of prose that has to be cleaned up.
+Appliance counts are a list of {name, count} pairs because Gemini response
+schemas cannot express free-form maps; to_analysis()/to_dict() turn them
+back into the {"fridge": 1} dicts the rest of the pipeline uses.
+"""
+import re
+import json
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+
+def _union(lists):
+    merged = []
+    for values in lists:
+        for value in values:
+            if value not in merged:
+                merged.append(value)
+    return merged
+
+
+def _first(values):
+    return next((value for value in values if value), "")
+
+
+class ApplianceCount(BaseModel):
+    name: str
+    count: int = Field(default=1, ge=0)
+
+
+class _WithAppliances(BaseModel):
+    appliances: List[ApplianceCount] = []
+
+    @field_validator("appliances", mode="before")
+    @classmethod
+    def _from_mapping(cls, value):
+        """Also accept the {"fridge": 1} form"""
+        if isinstance(value, dict):
+            return [{"name": k, "count": v} for k, v in value.items()]
+        return value or []
+
+    def appliance_counts(self) -> Dict[str, int]:
+        counts = {}
+        for item in self.appliances:
+            counts[item.name] = counts.get(item.name, 0) + item.count
+        return counts
+
+
+class ImageAnalysis(_WithAppliances):
+    rooms: List[str] = []
+    features: List[str] = []
+
+    def to_analysis(self) -> dict:
+        return {"rooms": self.rooms, "appliances": self.appliance_counts(), "features": self.features}
+
+
+class VideoAnalysis(_WithAppliances):
+    rooms: List[str] = []
+    layout: str = ""
+    condition: str = ""
+    features: List[str] = []
+    space_quality: str = ""
+
+    def to_analysis(self) -> dict:
+        return {
+            "rooms": self.rooms,
+            "appliances": self.appliance_counts(),
+            "layout": self.layout,
+            "condition": self.condition,
+            "features": self.features,
+            "space_quality": self.space_quality,
+        }
+
+
+class PropertyDetails(BaseModel):
+    type: str = ""
+    size: str = ""
+    location: str = ""
+    price: str = ""
+
+
+class TextAnalysis(_WithAppliances):
+    rooms: List[str] = []
+    features: List[str] = []
+    property_details: PropertyDetails = PropertyDetails()
+    amenities: List[str] = []
+    rules_and_restrictions: str = ""
+    additional_info: List[str] = []
+    nearby_landmarks: List[str] = []
+    contact_info: str = ""
+    rent: str = ""
+
+    @classmethod
+    def merge(cls, parts: List["TextAnalysis"]) -> "TextAnalysis":
+        """
+        Combine analyses of chunks of the same listing: lists are unioned,
+        appliance counts take the largest mention, single values the first
+        chunk that has one (rules, which can be spread out, are joined).
+        """
+        counts = {}
+        for part in parts:
+            for name, count in part.appliance_counts().items():
+                counts[name] = max(count, counts.get(name, 0))
+        details = {
+            key: _first(getattr(part.property_details, key) for part in parts)
+            for key in PropertyDetails.model_fields
+        }
+        return cls(
+            rooms=_union(part.rooms for part in parts),
+            appliances=counts,
+            features=_union(part.features for part in parts),
+            property_details=PropertyDetails(**details),
+            amenities=_union(part.amenities for part in parts),
+            rules_and_restrictions=" ".join(_union([part.rules_and_restrictions] for part in parts if part.rules_and_restrictions)),
+            additional_info=_union(part.additional_info for part in parts),
+            nearby_landmarks=_union(part.nearby_landmarks for part in parts),
+            contact_info=_first(part.contact_info for part in parts),
+            rent=_first(part.rent for part in parts),
+        )
+
+    def to_analysis(self) -> dict:
+        """The keys merge_analyses() reads"""
+        details = {k: v for k, v in self.property_details.model_dump().items() if v}
+        if self.rent and "price" not in details:
+            details["price"] = self.rent
+        return {
+            "rooms": self.rooms,
+            "appliances": self.appliance_counts(),
+            "features": self.features,
+            "Property details": details,
+            "Available amenities and facilities": self.amenities,
+            "Property rules and restrictions": self.rules_and_restrictions or None,
+            "Additional relevant information": self.additional_info,
+            "Nearby landmarks": self.nearby_landmarks,
+            "Contact information for inquiries": self.contact_info or None,
+        }
+
+
+class PropertyProfile(_WithAppliances):
+    property_name: str = ""
+    property_location: str = ""
+    property_summary: str = ""
+    rooms: List[str] = []
+    key_features: List[str] = []
+    amenities: List[str] = []
+    layout_and_condition: str = ""
+    location_insights: str = ""
+    rules_and_restrictions: str = ""
+    contact_info: str = ""
+    additional_info: str = ""
+    rent: str = ""
+
+    def to_dict(self) -> dict:
+        profile = self.model_dump()
+        profile["appliances"] = self.appliance_counts()
+        return profile
+
+
+class ProfilePolish(BaseModel):
+    """Prose fields rewritten by the optional enrichment pass"""
+    property_name: str = ""
+    property_summary: str = ""
+    layout_and_condition: str = ""
+    location_insights: str = ""
+
+
+class SearchMatch(BaseModel):
+    property_id: str
+    score: float = 0.0
+    matched_features: List[str] = []
+    missing_features: List[str] = []
+    feature_match_percentage: float = 0
+
+
+class SearchRanking(BaseModel):
+    matches: List[SearchMatch] = []
+    message: Optional[str] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _from_list(cls, value):
+        """Also accept a bare JSON array of matches"""
+        return {"matches": value} if isinstance(value, list) else value
+
+
+class StructuredOutputError(ValueError):
+    """A reply that still does not match its schema after the repair retry"""
+
+
+def parse_structured(content, schema: Type[BaseModel]) -> Tuple[Optional[BaseModel], Optional[str]]:
+    """
+    Validate an agent reply (schema instance, dict or JSON text, optionally
+    in a code fence) against `schema`. Returns (instance, None) or (None, error).
+    """
+    if isinstance(content, schema):
+        return content, None
+    try:
+        if isinstance(content, BaseModel):
+            return schema.model_validate(content.model_dump()), None
+        if isinstance(content, (dict, list)):
+            return schema.model_validate(content), None
+        text = re.sub(r"```(?:json)?", "", str(content or "")).strip()
+        return schema.model_validate(json.loads(text)), None
+    except (ValidationError, ValueError) as e:
+        return None, str(e)[:1000]
@@ -1,15 +1,154 @@
 from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
 from langchain_community.vectorstores import Qdrant
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import (
+    PointStruct, PayloadSchemaType,
+    Filter, FieldCondition, MatchAny, MatchValue, HasIdCondition, FilterSelector,
+    RecommendQuery, RecommendInput, RecommendStrategy,
+)
 from qdrant_client.http.exceptions import ResponseHandlingException
 import json 
+import hashlib
 import uuid
 import time
 import ssl
-import httpx
+import threading
+import sys
+import os
 from datetime import datetime
+from typing import Optional
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from components.utils.traceUtil import span
+from components.utils.metricsUtil import QDRANT_RETRIES, CACHE_LOOKUPS
+from models.chunking import chunk_property, chunks_to_fetch, group_by_property, CHUNKING_MODES, AGGREGATES
+from models.collectionConfig import collection_settings, search_settings
+
+
+class TracedEmbeddings(Embeddings):
+    """Wraps an Embeddings so every embedding call is recorded as a span"""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with span("embed_documents", texts=len(texts), chars=sum(len(t) for t in texts)):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with span("embed_query", chars=len(text)):
+            return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        with span("embed_documents", texts=len(texts), chars=sum(len(t) for t in texts)):
+            return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        with span("embed_query", chars=len(text)):
+            return await self.embeddings.aembed_query(text)
+
+# Where the index lives:
+#   cloud  - Qdrant server at `url`, with connection retries
+#   local  - qdrant-client embedded mode persisted under `location`
+#   memory - embedded mode held in memory (tests, benchmarks)
+#   auto   - one fast attempt at the cloud, falling back to local
+VECTOR_BACKENDS = ("auto", "cloud", "local", "memory")
+DEFAULT_LOCAL_PATH = "qdrant_local"
+
+# qdrant-client locks an on-disk index directory for the client that opened
+# it, so a second QdrantClient(path=...) fails even in the same process. Every
+# QdrantVectorStoreClient of a process shares one embedded client per
+# directory: {abspath: [client, users]}. Another process cannot open it at all.
+_local_clients = {}
+_local_clients_lock = threading.Lock()
+
+# Point ids are uuid5(property_id:section), so indexing a property again
+# overwrites its points instead of adding duplicates
+POINT_NAMESPACE = uuid.UUID("6f1c0c1e-3b8a-5d2e-9a43-d3e0a1b7c5f2")
+
+
+def point_id(property_id: str, section: str) -> str:
+    """Deterministic Qdrant point id of one property chunk"""
+    return str(uuid.uuid5(POINT_NAMESPACE, f"{property_id}:{section}"))
+
+
+def content_hash(text: str) -> str:
+    """sha256 of a chunk's text, stored in its payload to skip unchanged chunks"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_documents(items: list[dict], chunking: str = "sections") -> list[Document]:
+    """Split property dicts into the Documents stored in the collection (see models/chunking.py)"""
+    docs: list[Document] = []
+    upload_time = datetime.utcnow().isoformat()
+    for item in items:
+        prop_id = item.get("id") or str(uuid.uuid4())
+        for chunk_id, (section, text) in enumerate(chunk_property(item, chunking)):
+            docs.append(Document(
+                page_content=text,
+                metadata={
+                    "id": f"{prop_id}_{chunk_id}",
+                    "point_id": point_id(prop_id, section),
+                    "property_id": prop_id,
+                    "chunk_id": chunk_id,
+                    "section": section,
+                    "content_hash": content_hash(text),
+                    "upload_time": upload_time,
+                }
+            ))
+    return docs
+
+
+def changed_documents(docs: list[Document], existing: list) -> list[Document]:
+    """The docs whose point is missing or stored with a different content_hash"""
+    stored = {
+        str(p.id): ((p.payload or {}).get("metadata") or {}).get("content_hash") for p in existing
+    }
+    return [d for d in docs if stored.get(d.metadata["point_id"]) != d.metadata["content_hash"]]
+
+
+def stale_points_filter(docs: list[Document]) -> Filter:
+    """Points of the docs' properties that are not one of the docs (e.g. a section that is now empty)"""
+    return Filter(
+        must=[FieldCondition(
+            key="metadata.property_id",
+            match=MatchAny(any=sorted({d.metadata["property_id"] for d in docs})),
+        )],
+        must_not=[HasIdCondition(has_id=[d.metadata["point_id"] for d in docs])],
+    )
+
+
+def to_search_result(doc: Document, score: float) -> dict:
+    """Shape a scored Document as a search candidate"""
+    return {
+        "id": doc.metadata.get("id"),
+        "property_id": doc.metadata.get("property_id"),
+        "score": score,
+        "metadata": doc.metadata,
+        "content": doc.page_content
+    }
+
+
+def metadata_filter(filters: Optional[dict] = None, exclude_property: Optional[str] = None) -> Optional[Filter]:
+    """
+    Filter on chunk metadata: {"section": "amenities"} or {"section": [...]}
+    must match; exclude_property drops that property's own chunks.
+    """
+    must = [
+        FieldCondition(
+            key=f"metadata.{key}",
+            match=MatchAny(any=list(value)) if isinstance(value, (list, tuple, set)) else MatchValue(value=value),
+        )
+        for key, value in (filters or {}).items()
+    ]
+    must_not = []
+    if exclude_property:
+        must_not.append(FieldCondition(key="metadata.property_id", match=MatchValue(value=exclude_property)))
+    if not must and not must_not:
+        return None
+    return Filter(must=must or None, must_not=must_not or None)
+
 
 class QdrantVectorStoreClient:
     def __init__(
@@ -20,7 +159,20 @@ class QdrantVectorStoreClient:
         google_api_key: str,
         prefer_grpc: bool = False,
         timeout: int = 60,
-        max_retries: int = 3
+        max_retries: int = 3,
+        location: Optional[str] = None,
+        embeddings=None,
+        backend: Optional[str] = None,
+        connect_timeout: float = 5,
+        chunking: str = "sections",
+        aggregate: str = "max",
+        quantization: str = "none",
+        on_disk: bool = False,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        search_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None
     ):
         """
         Enhanced initialization with SSL timeout handling
@@ -33,29 +185,65 @@ class QdrantVectorStoreClient:
             prefer_grpc: Use gRPC instead of HTTP
             timeout: Connection timeout in seconds
             max_retries: Maximum connection retry attempts
+            location: ":memory:" or a directory for qdrant-client's local mode
+                instead of a server (no network, no retries)
+            embeddings: LangChain Embeddings to use instead of Gemini
+                text-embedding-004
+            backend: One of VECTOR_BACKENDS; defaults to "cloud", or to the
+                local/memory backend when `location` is given
+            connect_timeout: Seconds the "auto" backend waits for the cloud
+                before falling back to the local index
+            chunking: "sections" (one chunk per profile section) or "single"
+                (one chunk per property) for new documents
+            aggregate: How chunk hits are folded into a property score,
+                "max" or "weighted"
+            quantization: "none", "scalar" or "binary" for a new collection
+                (see models/collectionConfig.py)
+            on_disk: Keep original vectors and payloads of a new collection on disk
+            hnsw_m: HNSW graph degree of a new collection
+            hnsw_ef_construct: HNSW build-time candidate list size
+            search_ef: HNSW search-time candidate list size
+            oversampling: Quantized candidates fetched per wanted hit before rescoring
+            rescore: Re-rank quantized candidates with the original vectors
         """
         self.url = url
         self.api_key = api_key
         self.collection = collection
         self.timeout = timeout
         self.max_retries = max_retries
+        self.location = location
+        self.connect_timeout = connect_timeout
+        if chunking not in CHUNKING_MODES or aggregate not in AGGREGATES:
+            raise ValueError(f"chunking must be one of {CHUNKING_MODES} and aggregate one of {AGGREGATES}")
+        self.chunking = chunking
+        self.aggregate = aggregate
+        self.collection_settings = collection_settings(quantization, on_disk, hnsw_m, hnsw_ef_construct)
+        self.search_params = search_settings(search_ef, oversampling, rescore)
+        if backend is None:
+            backend = "cloud" if not location else ("memory" if location == ":memory:" else "local")
+        if backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend {backend!r}; expected one of {VECTOR_BACKENDS}")
+        self.backend = backend
+        self._last_healthy_at = float("-inf")
+        self._local_path = None
         
         # Fix URL format for Qdrant Cloud
-        if ":6333" in url:
+        if url and ":6333" in url:
             # Remove port for cloud connections
             self.url = url.replace(":6333", "")
         
-        # Initialize client with retry logic
-        self.client = self._create_client_with_retry(prefer_grpc)
+        # Initialize client (self.backend becomes the backend actually in use)
+        self.client = self._create_client(prefer_grpc)
         
         # Create collection if it doesn't exist
-        self._ensure_collection_exists()
+        self._ensure_collection_exists(self.client, payload_index=self.backend == "cloud")
+        self._last_healthy_at = time.monotonic()
         
         # Initialize embeddings
-        self.embeddings = GoogleGenerativeAIEmbeddings(
+        self.embeddings = TracedEmbeddings(embeddings or GoogleGenerativeAIEmbeddings(
             model="models/text-embedding-004",
             google_api_key=google_api_key
-        )
+        ))
         
         # Create LangChain vectorstore wrapper
         self.vs = Qdrant(
@@ -64,6 +252,70 @@ class QdrantVectorStoreClient:
             embeddings=self.embeddings
         )
 
+    def _create_client(self, prefer_grpc: bool) -> QdrantClient:
+        """Create the client for the configured backend"""
+        if self.backend == "memory":
+            return QdrantClient(location=":memory:")
+        if self.backend == "local":
+            return self._create_local_client()
+        if self.backend == "cloud":
+            return self._create_client_with_retry(prefer_grpc)
+
+        # auto: a single short attempt, so startup never waits on retries
+        if self.url:
+            try:
+                client = QdrantClient(
+                    url=self.url,
+                    api_key=self.api_key,
+                    prefer_grpc=prefer_grpc,
+                    timeout=self.connect_timeout
+                )
+                client.get_collections()
+                print("✅ Connected to Qdrant Cloud")
+                self.backend = "cloud"
+                return client
+            except Exception as e:
+                print(f"⚠️  Qdrant Cloud unavailable ({e}); using the local index")
+        return self._create_local_client()
+
+    def _create_local_client(self) -> QdrantClient:
+        """Open the embedded on-disk index, or share the client this process already has open on it"""
+        self.location = self.location if self.location and self.location != ":memory:" else DEFAULT_LOCAL_PATH
+        self.backend = "local"
+        path = os.path.abspath(self.location)
+        with _local_clients_lock:
+            entry = _local_clients.get(path)
+            if entry is None:
+                try:
+                    client = QdrantClient(path=self.location)
+                except RuntimeError as e:
+                    raise RuntimeError(
+                        f"The local index at {self.location} is open in another process; only one process can "
+                        f"own it, so give each process its own VECTOR_LOCAL_PATH or use a Qdrant server ({e})"
+                    ) from e
+                print(f"📁 Using local Qdrant index at {self.location}")
+                entry = _local_clients[path] = [client, 0]
+            entry[1] += 1
+        self._local_path = path
+        return entry[0]
+
+    def close(self):
+        """
+        Release the Qdrant client. A shared on-disk index is closed, and its
+        directory unlocked, when the last client of the process releases it.
+        """
+        if self._local_path is None:
+            self.client.close()
+            return
+        with _local_clients_lock:
+            entry = _local_clients.get(self._local_path)
+            if entry is not None and entry[0] is self.client:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del _local_clients[self._local_path]
+                    self.client.close()
+        self._local_path = None
+
     def _create_client_with_retry(self, prefer_grpc: bool) -> QdrantClient:
         """Create Qdrant client with connection retry logic"""
         last_exception = None
@@ -79,19 +331,8 @@ class QdrantVectorStoreClient:
                         timeout=self.timeout
                     )
                 
-                # Method 2: Force HTTPS with custom SSL context
+                # Method 2: Force REST (gRPC may be blocked)
                 elif attempt == 1:
-                    # Create custom SSL context
-                    ssl_context = ssl.create_default_context()
-                    ssl_context.check_hostname = False
-                    ssl_context.verify_mode = ssl.CERT_NONE
-                    
-                    # Create httpx client with custom SSL
-                    httpx_client = httpx.Client(
-                        timeout=self.timeout,
-                        verify=ssl_context
-                    )
-                    
                     client = QdrantClient(
                         url=self.url,
                         api_key=self.api_key,
@@ -122,6 +363,7 @@ class QdrantVectorStoreClient:
                 last_exception = e
                 wait_time = (attempt + 1) * 2
                 print(f"❌ Connection attempt {attempt + 1} failed: {str(e)}")
+                QDRANT_RETRIES.labels("connect").inc()
                 print(f"⏳ Retrying in {wait_time} seconds...")
                 time.sleep(wait_time)
         
@@ -131,63 +373,64 @@ class QdrantVectorStoreClient:
             f"Last error: {last_exception}"
         )
 
-    def _ensure_collection_exists(self):
-        """Ensure the collection exists with retry logic"""
+    def _ensure_collection_exists(self, client: QdrantClient, payload_index: bool = True):
+        """
+        Ensure the collection exists with retry logic. payload_index adds the
+        metadata.property_id keyword index used to find a property's points
+        (idempotent; the embedded backends have no payload indexes).
+        """
         try:
-            existing = [c.name for c in self.client.get_collections().collections]
+            existing = [c.name for c in client.get_collections().collections]
             if self.collection not in existing:
                 print(f"📝 Creating collection: {self.collection}")
-                self.client.create_collection(
-                    collection_name=self.collection,
-                    vectors_config=VectorParams(size=768, distance=Distance.COSINE),
-                )
+                client.create_collection(collection_name=self.collection, **self.collection_settings)
                 print(f"✅ Collection '{self.collection}' created successfully")
             else:
                 print(f"✅ Collection '{self.collection}' already exists")
+            if payload_index:
+                client.create_payload_index(
+                    collection_name=self.collection,
+                    field_name="metadata.property_id",
+                    field_schema=PayloadSchemaType.KEYWORD,
+                )
         except Exception as e:
             print(f"❌ Error managing collection: {e}")
             raise
 
     def add_documents(self, items: list[dict]) -> list[str]:
-        """Add documents with retry logic for rate limiting"""
+        """
+        Upsert property dicts with retry logic for rate limiting. Only chunks
+        whose content_hash changed are re-embedded, and points of a property
+        that its new chunks no longer cover are deleted. Returns the point ids.
+        """
         if not items:
             return []
 
-        docs: list[Document] = []
-        for item in items:
-            prop_id = item.get("id") or str(uuid.uuid4())
-            
-            # Flatten item into text
-            raw_lines = []
-            for k, v in item.items():
-                if isinstance(v, (str, int, float)):
-                    raw_lines.append(f"{k}: {v}")
-                else:
-                    raw_lines.append(f"{k}: {v}")
-            
-            raw_text = "\n".join(raw_lines).strip()
-            if not raw_text:
-                continue
-
-            doc = Document(
-                page_content=raw_text,
-                metadata={
-                    "id": f"{prop_id}_0",
-                    "property_id": prop_id,
-                    "chunk_id": 0,
-                    "upload_time": datetime.utcnow().isoformat(),
-                }
+        docs = build_documents(items, self.chunking)
+        with span("qdrant.add_documents", documents=len(docs)) as s:
+            existing = self.client.retrieve(
+                collection_name=self.collection,
+                ids=[d.metadata["point_id"] for d in docs],
+                with_payload=True,
             )
-            docs.append(doc)
-
-        return self._retry_add(docs)
+            changed = changed_documents(docs, existing)
+            s.set(upserted=len(changed), unchanged=len(docs) - len(changed))
+            if changed:
+                self._retry_add(changed, trace=s)
+            else:
+                print(f"✅ {len(docs)} documents unchanged")
+            self.client.delete(
+                collection_name=self.collection,
+                points_selector=FilterSelector(filter=stale_points_filter(docs)),
+            )
+            return [d.metadata["point_id"] for d in docs]
 
-    def _retry_add(self, documents: list[Document], max_retries: int = 5) -> list[str]:
-        """Enhanced retry logic for adding documents"""
+    def _retry_add(self, documents: list[Document], max_retries: int = 5, trace=None) -> list[str]:
+        """Enhanced retry logic for adding documents (retries are counted on `trace`)"""
         retries = 0
         while True:
             try:
-                inserted_ids = self.vs.add_documents(documents)
+                inserted_ids = self.vs.add_documents(documents, ids=[d.metadata["point_id"] for d in documents])
                 print(f"✅ Successfully added {len(documents)} documents")
                 return inserted_ids
             except ResponseHandlingException as e:
@@ -196,6 +439,9 @@ class QdrantVectorStoreClient:
                     print(f"⏳ Rate limited, waiting {wait} seconds...")
                     time.sleep(wait)
                     retries += 1
+                    QDRANT_RETRIES.labels("add").inc()
+                    if trace:
+                        trace.incr("retries")
                     continue
                 raise RuntimeError(f"Unable to add documents after {max_retries} retries: {e}")
             except Exception as e:
@@ -206,40 +452,120 @@ class QdrantVectorStoreClient:
                         print(f"⏳ Error detected, waiting {wait} seconds...")
                         time.sleep(wait)
                         retries += 1
+                        QDRANT_RETRIES.labels("add").inc()
+                        if trace:
+                            trace.incr("retries")
                         continue
                 raise RuntimeError(f"Unable to add documents: {e}")
 
-    def similarity_search(self, query: str, k: int = 5) -> list[dict]:
-        """Search with connection retry logic"""
+    def similarity_search(self, query: str, k: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """Top-k properties for the query (chunk hits grouped by property_id), optionally filtered by chunk metadata"""
+        with span("qdrant.search", k=k) as s:
+            hits = self._similarity_search(query, chunks_to_fetch(k, self.chunking), s, metadata_filter(filters))
+            s.set(chunks=len(hits))
+            return group_by_property(hits, k, self.aggregate)
+
+    def _similarity_search(self, query: str, k: int, s, query_filter: Optional[Filter] = None) -> list[dict]:
         max_search_retries = 3
         for attempt in range(max_search_retries):
             try:
-                results = self.vs.similarity_search_with_score(query, k=k)
-                out = []
-                for doc, score in results:
-                    out.append({
-                        "id": doc.metadata.get("id"),
-                        "property_id": doc.metadata.get("property_id"),
-                        "score": score,
-                        "metadata": doc.metadata,
-                        "content": doc.page_content
-                    })
-                return out
+                results = self.vs.similarity_search_with_score(
+                    query, k=k, filter=query_filter, search_params=self.search_params
+                )
+                return [to_search_result(doc, score) for doc, score in results]
             except (ResponseHandlingException, TimeoutError) as e:
                 if attempt < max_search_retries - 1:
                     wait_time = (attempt + 1) * 2
                     print(f"⏳ Search failed, retrying in {wait_time} seconds...")
                     time.sleep(wait_time)
+                    s.incr("retries")
+                    QDRANT_RETRIES.labels("search").inc()
                     continue
                 raise RuntimeError(f"Search failed after {max_search_retries} attempts: {e}")
 
-    def health_check(self) -> bool:
-        """Check if the connection is healthy"""
+    def find_similar(self, property_id: str, k: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """
+        Top-k other properties closest to a registered one, using its stored
+        chunk vectors as recommend examples (no embedding call). filters
+        narrows the candidate chunks (see metadata_filter).
+        """
+        with span("qdrant.find_similar", k=k) as s:
+            own, _ = self.client.scroll(
+                collection_name=self.collection,
+                scroll_filter=metadata_filter({"property_id": property_id}),
+                limit=64,
+                with_payload=False,
+            )
+            s.set(examples=len(own))
+            if not own:
+                return []
+            response = self.client.query_points(
+                collection_name=self.collection,
+                query=RecommendQuery(recommend=RecommendInput(
+                    positive=[p.id for p in own], strategy=RecommendStrategy.BEST_SCORE,
+                )),
+                query_filter=metadata_filter(filters, exclude_property=property_id),
+                limit=chunks_to_fetch(k, self.chunking),
+                search_params=self.search_params,
+                with_payload=True,
+            )
+            hits = []
+            for point in response.points:
+                payload = point.payload or {}
+                doc = Document(page_content=payload.get("page_content", ""), metadata=payload.get("metadata") or {})
+                hits.append(to_search_result(doc, point.score))
+            s.set(chunks=len(hits))
+            return group_by_property(hits, k, self.aggregate)
+
+    def resync_to_cloud(self, url: str, api_key: str, batch_size: int = 256) -> int:
+        """
+        Copy every point (ids, stored vectors and payloads) from this client's
+        collection to a Qdrant server, creating the collection there if needed.
+        Upserts are idempotent, so an interrupted resync can simply be re-run.
+        Returns the number of points copied.
+        """
+        cloud = QdrantClient(url=url, api_key=api_key, timeout=self.timeout)
+        self._ensure_collection_exists(cloud)
+        copied = 0
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                cloud.upsert(
+                    collection_name=self.collection,
+                    points=[PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in points],
+                )
+                copied += len(points)
+                print(f"⬆️  Resynced {copied} points to {url}")
+            if offset is None:
+                return copied
+
+    def health_check(self, max_age: float = 0) -> bool:
+        """
+        Check if the connection is healthy
+
+        Args:
+            max_age: Seconds a previous successful check is reused without
+                another round-trip (0 always checks)
+        """
+        if max_age and time.monotonic() - self._last_healthy_at < max_age:
+            CACHE_LOOKUPS.labels("vector_store_health", "hit").inc()
+            return True
+        if max_age:
+            CACHE_LOOKUPS.labels("vector_store_health", "miss").inc()
         try:
             collections = self.client.get_collections()
+            self._last_healthy_at = time.monotonic()
             return True
         except Exception as e:
             print(f"❌ Health check failed: {e}")
+            self._last_healthy_at = float("-inf")
             return False
 
 
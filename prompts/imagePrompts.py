@@ -4,8 +4,14 @@ Image_prompt = (
         "Given multiple photos of an apartment, reply *only* with a single JSON object "
         "with these top-level keys:\n"
         "  • rooms: list of distinct room names (e.g., \"living room\", \"kitchen\ , \"bedroom\")\n"
-        "  • appliances: an object mapping appliance names to integer counts "
-        "(e.g., fridge: 1, fan: 2, microwave: 1, bed: 1, sofa: 1, air conditioner: 3, tv: 1, washing machine: 1  , tables : 2 , chairs : 2) all the appliances which are present in the flat\n"
+        "  • appliances: a list of {\"name\", \"count\"} objects, one per appliance with its integer count "
+        "(e.g., {\"name\": \"fridge\", \"count\": 1}, {\"name\": \"fan\", \"count\": 2}, microwave: 1, bed: 1, sofa: 1, air conditioner: 3, tv: 1, washing machine: 1, table: 2, chair: 2) all the appliances which are present in the flat\n"
         "  • features: list of other notable flat features (e.g., \"balcony\", \"wooden floor\ , \"modern appliances\").\n"
         "Do not include any other keys or nested structures."
-    )
\ No newline at end of file
+    )
+Mosaic_note = (
+        "\nThe {count} {kind}s are packed into {mosaics} mosaic image(s). Each mosaic is a grid of "
+        "separate {kind}s, each labeled \"{kind} N\" in its top-left corner; black tiles are padding. "
+        "Analyze every tile as its own {kind}, not as one panorama, and count an item seen in "
+        "several tiles once unless the tiles clearly show different items.\n"
+    )
@@ -132,34 +132,36 @@ Group related features to avoid double counting:
 - **Location flexibility**: Expand search radius if all features available in nearby areas
 
 ### 7. Output Format:
-Return results as JSON array, ranked by normalized score (highest first). 
+Return a JSON object whose "matches" array holds the results, ranked by normalized score (highest first). Only use property_id values that appear in the Vector DB Results.
 
 **CRITICAL: All scores must sum to exactly 1.0**
 
 Example Output Format:
-[
-  {{
-    "property_id": "PROP_001",
-    "score": 0.45,
-    "matched_features": ["AC", "Parking", "Swimming Pool"],
-    "missing_features": ["Gym"],
-    "feature_match_percentage": 75
-  }},
-  {{
-    "property_id": "PROP_002", 
-    "score": 0.32,
-    "matched_features": ["AC", "Parking", "Gym"],
-    "missing_features": ["Swimming Pool"],
-    "feature_match_percentage": 75
-  }},
-  {{
-    "property_id": "PROP_003", 
-    "score": 0.23,
-    "matched_features": ["AC", "Gym"],
-    "missing_features": ["Parking", "Swimming Pool"],
-    "feature_match_percentage": 50
-  }}
-]
+{{
+  "matches": [
+    {{
+      "property_id": "PROP_001",
+      "score": 0.45,
+      "matched_features": ["AC", "Parking", "Swimming Pool"],
+      "missing_features": ["Gym"],
+      "feature_match_percentage": 75
+    }},
+    {{
+      "property_id": "PROP_002",
+      "score": 0.32,
+      "matched_features": ["AC", "Parking", "Gym"],
+      "missing_features": ["Swimming Pool"],
+      "feature_match_percentage": 75
+    }},
+    {{
+      "property_id": "PROP_003",
+      "score": 0.23,
+      "matched_features": ["AC", "Gym"],
+      "missing_features": ["Parking", "Swimming Pool"],
+      "feature_match_percentage": 50
+    }}
+  ]
+}}
 
 ### 8. Feature Match Percentage Calculation:
 Feature Match % = (Sum of Availability Scores / Total Features Requested) × 100
@@ -168,17 +170,8 @@ Feature Match % = (Sum of Availability Scores / Total Features Requested) × 100
 ### 9. No Results Condition:
 If **no property meets all strict primary filters** (especially **budget**) and  If no properties match minimum criteria (score threshold < 0.1):
 {{
-  "message": "No properties found matching your requirements.",
-  "suggestions": [
-    "Consider reducing the number of required features",
-    "Expand location search radius", 
-    "Adjust budget range",
-    "Try alternative feature combinations"
-  ],
-  "alternative_searches": [
-    "Properties with 3 out of 4 requested features",
-    "Similar properties in nearby locations"
-  ]
+  "matches": [],
+  "message": "No properties found matching your requirements. Consider reducing the number of required features, expanding the location or adjusting the budget."
 }}
 
 ### 10. Ranking Priority Order:
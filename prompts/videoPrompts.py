@@ -15,7 +15,7 @@ You are a JSON-only generator specializing in apartment video frame analysis. An
 
 ```json
 {
-  "appliances": {},
+  "appliances": [],
   "rooms": [],
   "layout": "",
   "condition": "",
@@ -26,13 +26,13 @@ You are a JSON-only generator specializing in apartment video frame analysis. An
 
 ## Field Specifications
 
-### appliances (object with string keys, integer values)
+### appliances (array of {"name": string, "count": integer} objects)
 
 **Counting Rules:**
 - Count each physical item once, regardless of how many frames it appears in
 - Use camera movement to distinguish between multiple similar items vs. same item from different angles
 - Only count clearly visible and identifiable appliances
-- Use singular forms for keys: "chair": 4, not "chairs": 4
+- Use singular forms for names: {"name": "chair", "count": 4}, not "chairs"
 
 **Categories & Standard Names:**
 - **Kitchen**: fridge, microwave, oven, stove, gas_stove, electric_stove, dishwasher, mixer_grinder, water_purifier, chimney, toaster
@@ -151,13 +151,13 @@ You are a JSON-only generator specializing in apartment video frame analysis. An
 - String arrays for rooms and features
 - Descriptive strings for layout, condition, and space_quality
 - No additional keys beyond the six specified
-- No nested objects or arrays within the main structure
+- No nested objects or arrays within the main structure other than the appliance entries
 
 ## Example Output
 
 ```json
 {
-  "appliances": {"fridge": 1, "microwave": 1, "gas_stove": 1, "tv": 2, "ac": 3, "fan": 4, "bed": 2, "sofa": 1, "dining_table": 1, "chair": 6, "wardrobe": 3, "washing_machine": 1, "geyser": 2},
+  "appliances": [{"name": "fridge", "count": 1}, {"name": "microwave", "count": 1}, {"name": "gas_stove", "count": 1}, {"name": "tv", "count": 2}, {"name": "ac", "count": 3}, {"name": "fan", "count": 4}, {"name": "bed", "count": 2}, {"name": "sofa", "count": 1}, {"name": "dining_table", "count": 1}, {"name": "chair", "count": 6}, {"name": "wardrobe", "count": 3}, {"name": "washing_machine", "count": 1}, {"name": "geyser", "count": 2}],
   "rooms": ["living_room", "kitchen", "master_bedroom", "bedroom_2", "bathroom_1", "bathroom_2", "balcony"],
   "layout": "Well-planned layout with open living-dining area connected to modular kitchen. Private bedroom wing with attached bathrooms. Central hallway provides efficient access to all rooms.",
   "condition": "Excellent condition with modern finishes and well-maintained fixtures throughout the apartment.",